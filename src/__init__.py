@@ -1,6 +1,23 @@
 # __init__.py
 
-from .market_data_client import MarketDataClient
-from .strangle_finder import StrangleFinder
-from .report_generator import ReportGenerator
-from .models import Strangle
+import importlib
+
+# Public names and the modules that define them.  Resolved on first access so that
+# importing the package does not pull in pandas, aiohttp or BeautifulSoup.
+_exports = {
+    'MarketDataClient': '.market_data_client',
+    'StrangleFinder': '.strangle_finder',
+    'ReportWriter': '.report_writer',
+    'Strangle': '.models',
+    'StrangleSet': '.models',
+    'ExpiryCalendar': '.expiry_calendar',
+    'Scenario': '.scenarios',
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    if name in _exports:
+        module = importlib.import_module(_exports[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,249 @@
+# backtest.py
+
+import os
+import sys
+import csv
+import time
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Adjust the Python path to ensure modules can be imported when running backtest.py directly
+src_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(src_path)
+
+from models import Strangle
+from expiry_calendar import ExpiryCalendar
+from contract_filter import ContractFilter, DEFAULT_FILTER_FILE
+from chain_decoder import TransferStats
+from request_policy import FetchLog
+from snapshot_archive import SnapshotArchive
+from strangle_finder import StrangleFinder, SearchBound
+from pair_search import PairSearchBatcher
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Query parameters the archive client honours, as the API would
+PARAM_COMPARISONS = {
+    'gt': np.greater,
+    'gte': np.greater_equal,
+    'lt': np.less,
+    'lte': np.less_equal,
+}
+
+class ArchiveClient:
+    """
+    Stands in for MarketDataClient during a backtest, serving one archived day from disk.
+
+    Chain requests apply the same expiration, strike and contract-type parameters the
+    live API would, so StrangleFinder sees what it would have seen that day.
+    """
+
+    def __init__(self, archive: SnapshotArchive, day: date):
+        self.archive = archive
+        self.day = day
+        self.fetch_log = FetchLog()
+        self.transfer_stats = TransferStats()
+        self.chain_fetches = {}
+
+    async def get_stock_prices(self, tickers: List[str], semaphore=None) -> Dict[str, float]:
+        prices = self.archive.load_prices(self.day)
+        return {ticker: prices[ticker] for ticker in tickers if ticker in prices}
+
+    async def get_options_chain(self, ticker: str, params: dict, semaphore=None, chain=None) -> Dict[str, np.ndarray]:
+        columns = self.archive.load_chain(self.day, ticker)
+        if not columns:
+            return {}
+
+        keep = np.ones(len(columns['strike_price']), dtype=bool)
+        for key, value in params.items():
+            name, _, op = key.partition('.')
+            if name not in columns:
+                continue
+            values = columns[name] if name == 'strike_price' else columns[name].astype(str)
+            if op == '':
+                keep &= values == value
+            elif op in PARAM_COMPARISONS:
+                keep &= PARAM_COMPARISONS[op](values, value)
+
+        if not keep.any():
+            return {}
+        return {name: values[keep] for name, values in columns.items()}
+
+def run_day(archive_root: str, day: date, top_n: int, max_normalized_difference: float,
+            filter_file: str = DEFAULT_FILTER_FILE) -> dict:
+    """
+    Replay one archived day through StrangleFinder, the C++ kernel and the analytics, and
+    return that day's top-ranked strangles as plain records (runs in a worker process).
+    """
+    start = time.perf_counter()
+    archive = SnapshotArchive(archive_root)
+    tickers = archive.tickers(day)
+
+    # Days already run in parallel processes, so each day's pair searches use one thread
+    calendar = ExpiryCalendar(as_of=archive.as_of(day))
+    batcher = PairSearchBatcher(num_threads=1)
+    strangle_finder = StrangleFinder(
+        ArchiveClient(archive, day), calendar=calendar,
+        contract_filter=ContractFilter.from_file(filter_file),
+        bound=SearchBound(max_normalized_difference, top_n=top_n), batcher=batcher
+    )
+
+    async def scan():
+        semaphore = asyncio.Semaphore(1)
+        await strangle_finder.prefetch_stock_prices(tickers, semaphore=semaphore)
+        await asyncio.gather(*[
+            strangle_finder.find_balanced_strangle(ticker, semaphore=semaphore) for ticker in tickers
+        ])
+
+    try:
+        asyncio.run(scan())
+    finally:
+        batcher.close()
+
+    # Rank exactly as the live report does, and keep the best N
+    strangles = strangle_finder.results
+    results = strangles.filter(strangles.normalized_difference < max_normalized_difference)
+    results.calculate_analytics()
+    results = results.filter(~np.isnan(results.probability_of_profit)).sorted()[:top_n]
+
+    selections = []
+    for rank, strangle in enumerate(results, start=1):
+        record = strangle.as_dict()
+        record.update(day=day.isoformat(), rank=rank)
+        selections.append(record)
+
+    return {
+        'day': day.isoformat(),
+        'num_tickers': len(tickers),
+        'num_strangles_considered': strangle_finder.num_strangles_considered,
+        'selections': selections,
+        'seconds': time.perf_counter() - start,
+    }
+
+def settle(selection: dict, archive: SnapshotArchive) -> dict:
+    """
+    Outcome of holding one strangle to expiry, from archived underlying prices: each leg
+    pays its intrinsic value at its own expiration.  Left open if a price is not archived.
+    """
+    ticker = selection['ticker']
+    price_call = archive.price_on(ticker, date.fromisoformat(selection['expiration_date_call']))
+    price_put = archive.price_on(ticker, date.fromisoformat(selection['expiration_date_put']))
+    cost = 100.0 * (selection['premium_call'] + selection['premium_put']) + 2 * Strangle.brokerage_fee_per_contract
+
+    outcome = dict(selection, cost=cost, price_at_call_expiry=price_call, price_at_put_expiry=price_put)
+    if price_call is None or price_put is None:
+        outcome.update(status='open', payoff=None, profit=None, return_on_cost=None)
+        return outcome
+
+    payoff = 100.0 * (max(0.0, price_call - selection['strike_price_call']) +
+                      max(0.0, selection['strike_price_put'] - price_put))
+    outcome.update(status='won' if payoff > cost else 'lost', payoff=payoff,
+                   profit=payoff - cost, return_on_cost=(payoff - cost) / cost)
+    return outcome
+
+def summarize(outcomes: List[dict]) -> str:
+    settled = [o for o in outcomes if o['status'] != 'open']
+    lines = [f"Strangles selected: {len(outcomes):,} ({len(settled):,} expired within the archive)"]
+    if not settled:
+        return '\n'.join(lines)
+
+    won = np.array([o['status'] == 'won' for o in settled])
+    returns = np.array([o['return_on_cost'] for o in settled])
+    predicted = np.array([o['probability_of_profit'] for o in settled])
+    lines.append(
+        f"Realized win rate {won.mean():.3f} against a mean predicted probability of profit {predicted.mean():.3f}; "
+        f"mean return on cost {returns.mean():+.3f} (median {np.median(returns):+.3f})"
+    )
+
+    # Did the ranking carry information?  Compare rank buckets.
+    ranks = np.array([o['rank'] for o in settled])
+    for low, high in ((1, 5), (6, 10), (11, 20), (21, None)):
+        in_bucket = (ranks >= low) & (ranks <= (high if high is not None else ranks.max()))
+        if in_bucket.any():
+            label = f"ranks {low}-{high}" if high is not None else f"ranks {low}+"
+            lines.append(
+                f"  {label:<12} {int(in_bucket.sum()):5,} trades, win rate {won[in_bucket].mean():.3f}, "
+                f"mean return {returns[in_bucket].mean():+.3f}"
+            )
+    return '\n'.join(lines)
+
+def write_outcomes(outcomes: List[dict], path: str) -> None:
+    if not outcomes:
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(outcomes[0]))
+        writer.writeheader()
+        writer.writerows(outcomes)
+
+def backtest(archive_root: str, start: Optional[date] = None, end: Optional[date] = None,
+             top_n: int = 20, max_normalized_difference: float = 0.1, workers: Optional[int] = None,
+             filter_file: str = DEFAULT_FILTER_FILE) -> List[dict]:
+    """Replay every archived day in [start, end] in parallel processes and settle the selections."""
+    archive = SnapshotArchive(archive_root)
+    days = [day for day in archive.days(start, end) if archive.tickers(day)]
+    if not days:
+        logger.info(f"No archived chains in {archive_root}")
+        return []
+
+    logger.info(f"Replaying {len(days):,} archived days from {days[0]} to {days[-1]}\n")
+    selections = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_day, archive_root, day, top_n, max_normalized_difference, filter_file)
+            for day in days
+        ]
+        for future in futures:
+            result = future.result()
+            selections.extend(result['selections'])
+            logger.info(
+                f"{result['day']}: {result['num_tickers']:,} tickers, "
+                f"{result['num_strangles_considered']:,} pairs, {len(result['selections'])} selected "
+                f"({result['seconds']:.1f} s)"
+            )
+
+    return [settle(selection, archive) for selection in selections]
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Replay archived daily snapshots and score the picks at expiry')
+    parser.add_argument('--archive', required=True, metavar='DIR',
+                        help='snapshot archive written by main.py --archive')
+    parser.add_argument('--start', type=date.fromisoformat, default=None, metavar='YYYY-MM-DD')
+    parser.add_argument('--end', type=date.fromisoformat, default=None, metavar='YYYY-MM-DD')
+    parser.add_argument('--top', type=int, default=20, metavar='N', help='strangles selected per day (default: 20)')
+    parser.add_argument('--max-normalized-difference', type=float, default=0.1)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--filters', default=DEFAULT_FILTER_FILE, metavar='FILE', help='contract filter rules')
+    parser.add_argument('--output', default=os.path.join(src_path, '..', 'html', 'backtest_outcomes.csv'),
+                        metavar='FILE', help='CSV of every selection and its outcome')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start_time = time.time()
+    outcomes = backtest(
+        args.archive, args.start, args.end, top_n=args.top,
+        max_normalized_difference=args.max_normalized_difference,
+        workers=args.workers, filter_file=args.filters
+    )
+    write_outcomes(outcomes, args.output)
+    logger.info("\n" + summarize(outcomes))
+    logger.info(f"Backtest time: {time.time() - start_time:.1f} seconds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# contract_filter.py
+
+import os
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Default rule set, next to this module
+DEFAULT_FILTER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'filters.json')
+
+# Comparison operators available to rules
+COMPARISONS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+# Query-string suffixes for rules the snapshot endpoint can apply server-side
+PUSHDOWN_SUFFIXES = {'>': '.gt', '>=': '.gte', '<': '.lt', '<=': '.lte', '==': ''}
+
+# Columns the options snapshot endpoint can filter on
+PUSHDOWN_COLUMNS = ('strike_price', 'contract_type', 'expiration_date')
+
+# Columns computed from the chain's columns, only when a rule refers to them
+DERIVED_COLUMNS: Dict[str, Callable[[dict], np.ndarray]] = {
+    'spread': lambda c: np.abs(c['ask'] - c['bid']),
+    'intrinsic_value': lambda c: np.where(
+        c['contract_type'] == 'call',
+        c['stock_price'] - c['strike_price'],
+        c['strike_price'] - c['stock_price']
+    ),
+}
+
+@dataclass
+class FilterRule:
+    """
+    One contract filter: keep rows where `column op threshold`.
+
+    The threshold is `base + value * scale`, where base and scale are optional column
+    names.  This lets limits be written in terms of the stock price or the quote
+    midpoint, e.g. premium > 0.01 * stock_price.  The `notnull` operator takes a column
+    or list of columns and keeps rows where all of them are present.
+    """
+    name: str
+    column: Union[str, List[str]]
+    op: str
+    value: Optional[Union[float, str]] = None
+    scale: Optional[str] = None
+    base: Optional[str] = None
+
+    def columns_used(self) -> List[str]:
+        names = [self.column] if isinstance(self.column, str) else list(self.column)
+        return names + [name for name in (self.scale, self.base) if name is not None]
+
+def _notnull(array: np.ndarray) -> np.ndarray:
+    if array.dtype.kind == 'f':
+        return ~np.isnan(array)
+    return array != None  # noqa: E711 (elementwise on object arrays)
+
+class ContractFilter:
+    """
+    Rule-driven contract filter, compiled once into a single vectorized predicate.
+
+    apply() evaluates the rules in order over a dict of equal-length column arrays,
+    ANDing each result into one mask in place, and stops as soon as nothing survives.
+    Rejections are attributed to the first rule a contract fails and accumulate across
+    calls, so a run can report which rules remove the most contracts.
+    """
+
+    def __init__(self, rules: List[FilterRule]):
+        self.rules = rules
+        self._predicates = [self._compile(rule) for rule in rules]
+        self.contracts_seen = 0
+        self.rejections = {rule.name: 0 for rule in rules}
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_FILTER_FILE) -> 'ContractFilter':
+        with open(path, 'r') as f:
+            config = json.load(f)
+        return cls([FilterRule(**rule) for rule in config['contract_filters']])
+
+    @staticmethod
+    def _column(columns: dict, name: str) -> np.ndarray:
+        if name not in columns:
+            columns[name] = DERIVED_COLUMNS[name](columns)
+        return columns[name]
+
+    def _compile(self, rule: FilterRule) -> Callable[[dict], np.ndarray]:
+        if rule.op == 'notnull':
+            names = [rule.column] if isinstance(rule.column, str) else list(rule.column)
+
+            def predicate(columns: dict) -> np.ndarray:
+                keep = _notnull(self._column(columns, names[0]))
+                for name in names[1:]:
+                    np.logical_and(keep, _notnull(self._column(columns, name)), out=keep)
+                return keep
+
+            return predicate
+
+        if rule.op not in COMPARISONS:
+            raise ValueError(f"Filter rule '{rule.name}': unknown operator '{rule.op}'")
+        compare = COMPARISONS[rule.op]
+        column, value, scale, base = rule.column, rule.value, rule.scale, rule.base
+
+        # Constant thresholds skip the array arithmetic entirely
+        if scale is None and base is None:
+            def predicate(columns: dict) -> np.ndarray:
+                return compare(self._column(columns, column), value)
+        else:
+            def predicate(columns: dict) -> np.ndarray:
+                threshold = value * self._column(columns, scale) if scale is not None else value
+                if base is not None:
+                    threshold = self._column(columns, base) + threshold
+                return compare(self._column(columns, column), threshold)
+
+        return predicate
+
+    def pushdown_params(self, stock_price: Optional[float], margin: float = 0.05) -> dict:
+        """
+        Query parameters that let the snapshot endpoint drop contracts these rules would reject.
+
+        Rules on a pushdown-capable column with a constant threshold, or a threshold scaled by
+        the stock price, are translated (e.g. min_strike -> strike_price.gte).  Price-scaled
+        bounds are widened by `margin` so a price move between the bulk price fetch and the
+        chain download cannot drop a contract the client-side rule would keep; the exact rule
+        is still applied locally.
+        """
+        params = {}
+        for rule in self.rules:
+            if (
+                not isinstance(rule.column, str) or rule.column not in PUSHDOWN_COLUMNS or
+                rule.op not in PUSHDOWN_SUFFIXES or rule.base is not None
+            ):
+                continue
+
+            if rule.scale is None:
+                threshold = rule.value
+            elif rule.scale == 'stock_price' and stock_price and rule.op != '==':
+                widen = (1 - margin) if rule.op in ('>', '>=') else (1 + margin)
+                threshold = round(rule.value * stock_price * widen, 4)
+            else:
+                continue
+
+            key = f"{rule.column}{PUSHDOWN_SUFFIXES[rule.op]}"
+            if key in params:
+                if rule.op == '==':
+                    continue
+                # Keep the tighter of two bounds on the same side
+                tighter = max if rule.op in ('>', '>=') else min
+                threshold = tighter(params[key], threshold)
+            params[key] = threshold
+        return params
+
+    def apply(self, columns: dict, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Boolean mask of the contracts passing every rule.  Derived columns are added to `columns`.
+        The mask is written into `out` when given (a reusable buffer of the right length).
+        """
+        num_contracts = len(next(iter(columns.values()))) if columns else 0
+        keep = out if out is not None else np.empty(num_contracts, dtype=bool)
+        keep.fill(True)
+        survivors = num_contracts
+        self.contracts_seen += num_contracts
+
+        # Missing values are NaN and simply fail their comparisons
+        with np.errstate(invalid='ignore'):
+            for rule, predicate in zip(self.rules, self._predicates):
+                if survivors == 0:
+                    break
+                np.logical_and(keep, predicate(columns), out=keep)
+                remaining = int(np.count_nonzero(keep))
+                self.rejections[rule.name] += survivors - remaining
+                survivors = remaining
+
+        return keep
+
+    def summary(self) -> str:
+        """Human-readable table of rejections per rule."""
+        lines = [f"Contracts filtered: {self.contracts_seen:,}"]
+        for rule in self.rules:
+            lines.append(f"  {rule.name:<24} rejected {self.rejections[rule.name]:,}")
+        return '\n'.join(lines)
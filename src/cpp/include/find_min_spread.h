@@ -29,4 +29,10 @@ struct StrangleCombination {
 // Function to find the best strangle with minimum normalized difference
 StrangleCombination find_min_spread(const std::vector<Option>& calls, const std::vector<Option>& puts);
 
+// Same search, restricted to combinations with normalized difference strictly below
+// max_normalized_difference.  Returns false (leaving best_combination untouched) when
+// no combination beats the bound.  Ties resolve exactly as in find_min_spread.
+bool find_min_spread_bounded(const std::vector<Option>& calls, const std::vector<Option>& puts,
+                             double max_normalized_difference, StrangleCombination& best_combination);
+
 #endif // FIND_MIN_SPREAD_H
\ No newline at end of file
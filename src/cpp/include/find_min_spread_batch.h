@@ -0,0 +1,35 @@
+// include/find_min_spread_batch.h
+
+#ifndef FIND_MIN_SPREAD_BATCH_H
+#define FIND_MIN_SPREAD_BATCH_H
+
+#include <cstddef>
+#include <cstdint>
+#include <string>
+
+// One ticker's winning pair in a batch.  The indices are positions within that ticker's
+// calls and puts, or -1 when no pair beats the ticker's bound.
+struct BatchWinner {
+    int64_t call_index;
+    int64_t put_index;
+    double strangle_costs;
+    double upper_breakeven;
+    double lower_breakeven;
+    double breakeven_difference;
+    double normalized_difference;
+};
+
+// Bounded search over many tickers at once.  Ticker t's calls are
+// call_premium/call_strike[call_offsets[t] .. call_offsets[t + 1]), likewise its puts, and
+// its bound is max_normalized_difference[t] (infinity searches every pair).  Tickers are
+// shared out over num_threads native threads (0: one per core), and each ticker gets
+// exactly the result find_min_spread_bounded would give it, ties included.
+void find_min_spread_batch(const double* call_premium, const double* call_strike, const int64_t* call_offsets,
+                           const double* put_premium, const double* put_strike, const int64_t* put_offsets,
+                           const double* max_normalized_difference, size_t num_tickers,
+                           unsigned num_threads, BatchWinner* winners);
+
+// Instruction set the batch search dispatched to on this CPU (e.g. "avx512f", "avx2")
+std::string batch_instruction_set();
+
+#endif // FIND_MIN_SPREAD_BATCH_H
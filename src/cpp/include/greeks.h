@@ -0,0 +1,46 @@
+// include/greeks.h
+
+#ifndef GREEKS_H
+#define GREEKS_H
+
+#include <cstddef>
+#include <cstdint>
+
+// Black-Scholes on the same clock as the Strangle analytics: time in seconds, over a
+// 365-day year, with a continuously compounded rate (0 by default) and no dividends.
+// American contracts are treated as European, which is close for the short-dated,
+// non-dividend cases the scan keeps.
+
+// Per-share sensitivities of one contract.  Vega is per volatility point (0.01) and
+// theta per calendar day.
+struct Greeks {
+    double delta;
+    double gamma;
+    double vega;
+    double theta;
+};
+
+double black_scholes_price(double stock_price, double strike_price, double implied_volatility,
+                           double seconds_to_expiration, bool is_call, double rate = 0.0);
+
+Greeks black_scholes_greeks(double stock_price, double strike_price, double implied_volatility,
+                            double seconds_to_expiration, bool is_call, double rate = 0.0);
+
+// Volatility at which the model price equals the premium: Newton steps safeguarded by a
+// bisection bracket, so it converges even where vega is tiny.  NaN when the premium is
+// outside the no-arbitrage bounds (at or below intrinsic value, or above the upper bound)
+// or an input is missing.
+double implied_volatility(double premium, double stock_price, double strike_price,
+                          double seconds_to_expiration, bool is_call, double rate = 0.0);
+
+// Whole-chain versions: n contracts in, n values per output out
+void black_scholes_greeks_batch(const double* stock_price, const double* strike_price,
+                                const double* implied_volatility, const double* seconds_to_expiration,
+                                const uint8_t* is_call, size_t n, double rate,
+                                double* delta, double* gamma, double* vega, double* theta);
+
+void implied_volatility_batch(const double* premium, const double* stock_price, const double* strike_price,
+                              const double* seconds_to_expiration, const uint8_t* is_call, size_t n,
+                              double rate, double* implied_volatility);
+
+#endif // GREEKS_H
@@ -1,7 +1,12 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 #include "strangle.h"
 #include "find_min_spread.h"
+#include "find_min_spread_batch.h"
+#include "greeks.h"
+#include <stdexcept>
+#include <vector>
 
 namespace py = pybind11;
 
@@ -13,6 +18,23 @@ PYBIND11_MODULE(strangle_module, m) {
         .def_static("calculate_probability_of_profit", &Strangle::calculate_probability_of_profit)
         .def_static("calculate_expected_gain", &Strangle::calculate_expected_gain);
 
+    // Vectorized analytics: broadcast over NumPy arrays (one element per strangle)
+    m.def("escape_ratio",
+          py::vectorize([](double stock_price, double upper_breakeven, double lower_breakeven) {
+              return Strangle(stock_price, upper_breakeven, lower_breakeven).calculate_escape_ratio();
+          }),
+          "Escape ratio for arrays of strangles",
+          py::arg("stock_price"), py::arg("upper_breakeven"), py::arg("lower_breakeven"));
+    m.def("probability_of_profit", py::vectorize(&Strangle::calculate_probability_of_profit),
+          "Probability of profit for arrays of strangles",
+          py::arg("stock_price"), py::arg("upper_breakeven"), py::arg("lower_breakeven"),
+          py::arg("implied_volatility"), py::arg("seconds_to_expiration"));
+    m.def("expected_gain", py::vectorize(&Strangle::calculate_expected_gain),
+          "Expected gain for arrays of strangles",
+          py::arg("stock_price"), py::arg("upper_strike"), py::arg("lower_strike"),
+          py::arg("implied_volatility"), py::arg("seconds_to_expiration"),
+          py::arg("total_premium_per_share"), py::arg("brokerage_fees_per_share"));
+
     // Bind Option struct with a custom constructor
     py::class_<Option>(m, "Option")
         .def(py::init<>())  // Default constructor
@@ -39,4 +61,145 @@ PYBIND11_MODULE(strangle_module, m) {
     // Bind find_min_spread function
     m.def("find_min_spread", &find_min_spread, "Find the best strangle with minimum normalized difference",
           py::arg("calls"), py::arg("puts"));
-}
\ No newline at end of file
+
+    // Bounded search: returns None when nothing beats max_normalized_difference
+    m.def("find_min_spread_bounded",
+          [](const std::vector<Option>& calls, const std::vector<Option>& puts,
+             double max_normalized_difference) -> py::object {
+              StrangleCombination best_combination;
+              if (!find_min_spread_bounded(calls, puts, max_normalized_difference, best_combination)) {
+                  return py::none();
+              }
+              return py::cast(best_combination);
+          },
+          "Find the best strangle with normalized difference below a bound (None if there is none)",
+          py::arg("calls"), py::arg("puts"), py::arg("max_normalized_difference"));
+
+    // Batched search: many tickers' contracts as flat columns plus offsets, searched on
+    // native threads with the GIL released.  Returns one array per field, one row per ticker.
+    m.def("find_min_spread_batch",
+          [](py::array_t<double, py::array::c_style | py::array::forcecast> call_premium,
+             py::array_t<double, py::array::c_style | py::array::forcecast> call_strike,
+             py::array_t<int64_t, py::array::c_style | py::array::forcecast> call_offsets,
+             py::array_t<double, py::array::c_style | py::array::forcecast> put_premium,
+             py::array_t<double, py::array::c_style | py::array::forcecast> put_strike,
+             py::array_t<int64_t, py::array::c_style | py::array::forcecast> put_offsets,
+             py::array_t<double, py::array::c_style | py::array::forcecast> max_normalized_difference,
+             unsigned num_threads) {
+              const py::ssize_t num_tickers = max_normalized_difference.size();
+              if (call_offsets.size() != num_tickers + 1 || put_offsets.size() != num_tickers + 1) {
+                  throw std::invalid_argument("offsets must have one more entry than there are tickers");
+              }
+              if (call_premium.size() != call_strike.size() || put_premium.size() != put_strike.size()) {
+                  throw std::invalid_argument("premium and strike columns must have the same length");
+              }
+              const int64_t* co = call_offsets.data();
+              const int64_t* po = put_offsets.data();
+              for (py::ssize_t t = 0; t < num_tickers; ++t) {
+                  if (co[t] < 0 || co[t] > co[t + 1] || po[t] < 0 || po[t] > po[t + 1]) {
+                      throw std::invalid_argument("offsets must be non-negative and non-decreasing");
+                  }
+              }
+              if (co[num_tickers] > call_premium.size() || po[num_tickers] > put_premium.size()) {
+                  throw std::invalid_argument("offsets run past the end of the contract columns");
+              }
+
+              std::vector<BatchWinner> winners(num_tickers);
+              {
+                  py::gil_scoped_release release;
+                  find_min_spread_batch(call_premium.data(), call_strike.data(), co,
+                                        put_premium.data(), put_strike.data(), po,
+                                        max_normalized_difference.data(), size_t(num_tickers),
+                                        num_threads, winners.data());
+              }
+
+              py::array_t<int64_t> call_index(num_tickers), put_index(num_tickers);
+              py::array_t<double> strangle_costs(num_tickers), upper_breakeven(num_tickers),
+                  lower_breakeven(num_tickers), breakeven_difference(num_tickers), normalized_difference(num_tickers);
+              for (py::ssize_t t = 0; t < num_tickers; ++t) {
+                  const BatchWinner& w = winners[t];
+                  call_index.mutable_at(t) = w.call_index;
+                  put_index.mutable_at(t) = w.put_index;
+                  strangle_costs.mutable_at(t) = w.strangle_costs;
+                  upper_breakeven.mutable_at(t) = w.upper_breakeven;
+                  lower_breakeven.mutable_at(t) = w.lower_breakeven;
+                  breakeven_difference.mutable_at(t) = w.breakeven_difference;
+                  normalized_difference.mutable_at(t) = w.normalized_difference;
+              }
+
+              py::dict result;
+              result["call_index"] = call_index;
+              result["put_index"] = put_index;
+              result["strangle_costs"] = strangle_costs;
+              result["upper_breakeven"] = upper_breakeven;
+              result["lower_breakeven"] = lower_breakeven;
+              result["breakeven_difference"] = breakeven_difference;
+              result["normalized_difference"] = normalized_difference;
+              return result;
+          },
+          "Best strangle of many tickers at once, from flat contract columns and per-ticker offsets",
+          py::arg("call_premium"), py::arg("call_strike"), py::arg("call_offsets"),
+          py::arg("put_premium"), py::arg("put_strike"), py::arg("put_offsets"),
+          py::arg("max_normalized_difference"), py::arg("num_threads") = 0);
+
+    m.def("batch_instruction_set", &batch_instruction_set,
+          "Instruction set the batched search dispatches to on this CPU");
+
+    // Black-Scholes engine over whole chains.  Inputs are equal-length arrays, one element
+    // per contract (broadcast them first); the loops run with the GIL released.
+    m.def("greeks",
+          [](py::array_t<double, py::array::c_style | py::array::forcecast> stock_price,
+             py::array_t<double, py::array::c_style | py::array::forcecast> strike_price,
+             py::array_t<double, py::array::c_style | py::array::forcecast> implied_volatility,
+             py::array_t<double, py::array::c_style | py::array::forcecast> seconds_to_expiration,
+             py::array_t<uint8_t, py::array::c_style | py::array::forcecast> is_call,
+             double rate) {
+              const py::ssize_t n = stock_price.size();
+              if (strike_price.size() != n || implied_volatility.size() != n ||
+                  seconds_to_expiration.size() != n || is_call.size() != n) {
+                  throw std::invalid_argument("greeks: every input must have the same length");
+              }
+              py::array_t<double> delta(n), gamma(n), vega(n), theta(n);
+              {
+                  py::gil_scoped_release release;
+                  black_scholes_greeks_batch(stock_price.data(), strike_price.data(), implied_volatility.data(),
+                                             seconds_to_expiration.data(), is_call.data(), size_t(n), rate,
+                                             delta.mutable_data(), gamma.mutable_data(),
+                                             vega.mutable_data(), theta.mutable_data());
+              }
+              py::dict result;
+              result["delta"] = delta;
+              result["gamma"] = gamma;
+              result["vega"] = vega;
+              result["theta"] = theta;
+              return result;
+          },
+          "Per-share delta, gamma, vega (per vol point) and theta (per day) for arrays of contracts",
+          py::arg("stock_price"), py::arg("strike_price"), py::arg("implied_volatility"),
+          py::arg("seconds_to_expiration"), py::arg("is_call"), py::arg("rate") = 0.0);
+
+    m.def("implied_volatility",
+          [](py::array_t<double, py::array::c_style | py::array::forcecast> premium,
+             py::array_t<double, py::array::c_style | py::array::forcecast> stock_price,
+             py::array_t<double, py::array::c_style | py::array::forcecast> strike_price,
+             py::array_t<double, py::array::c_style | py::array::forcecast> seconds_to_expiration,
+             py::array_t<uint8_t, py::array::c_style | py::array::forcecast> is_call,
+             double rate) {
+              const py::ssize_t n = premium.size();
+              if (stock_price.size() != n || strike_price.size() != n ||
+                  seconds_to_expiration.size() != n || is_call.size() != n) {
+                  throw std::invalid_argument("implied_volatility: every input must have the same length");
+              }
+              py::array_t<double> result(n);
+              {
+                  py::gil_scoped_release release;
+                  implied_volatility_batch(premium.data(), stock_price.data(), strike_price.data(),
+                                           seconds_to_expiration.data(), is_call.data(), size_t(n), rate,
+                                           result.mutable_data());
+              }
+              return result;
+          },
+          "Implied volatility solved from premium for arrays of contracts (NaN where none exists)",
+          py::arg("premium"), py::arg("stock_price"), py::arg("strike_price"),
+          py::arg("seconds_to_expiration"), py::arg("is_call"), py::arg("rate") = 0.0);
+}
@@ -32,4 +32,74 @@ StrangleCombination find_min_spread(const std::vector<Option>& calls, const std:
     }
 
     return best_combination;
-}
\ No newline at end of file
+}
+
+// Bounded search.  With S = call.premium + put.premium + fees, the breakeven difference is
+// |x - y| where x = call.strike + 2*call.premium + 2*fees and y = put.strike - 2*put.premium.
+// A pair can only beat the bound B if |x - y| < B * (call.strike + put.strike) / 2, so with
+// puts sorted by y each call only needs the puts whose y falls inside that window.  The
+// window shrinks as better combinations are found.
+bool find_min_spread_bounded(const std::vector<Option>& calls, const std::vector<Option>& puts,
+                             double max_normalized_difference, StrangleCombination& best_combination) {
+    if (calls.empty() || puts.empty() || !(max_normalized_difference > 0)) {
+        return false;
+    }
+
+    const double base_strangle_cost = 2 * (0.53 + 0.55) / 100.0;
+
+    // Sort put indices by y, remembering the largest put strike for the window width
+    std::vector<std::pair<double, size_t>> put_keys;
+    put_keys.reserve(puts.size());
+    double max_put_strike = -std::numeric_limits<double>::infinity();
+    for (size_t j = 0; j < puts.size(); ++j) {
+        put_keys.emplace_back(puts[j].strike_price - 2 * puts[j].premium, j);
+        max_put_strike = std::max(max_put_strike, puts[j].strike_price);
+    }
+    std::sort(put_keys.begin(), put_keys.end());
+
+    double min_normalized_diff = max_normalized_difference;
+    bool found = false;
+    size_t best_call = 0, best_put = 0;
+
+    for (size_t i = 0; i < calls.size(); ++i) {
+        const Option& call = calls[i];
+        const double x = call.strike_price + 2 * call.premium + 2 * base_strangle_cost;
+
+        // Slightly widened so rounding can never exclude a qualifying pair; pairs are checked exactly below
+        double half_width = 0.5 * min_normalized_diff * (call.strike_price + max_put_strike);
+        half_width = half_width * (1.0 + 1e-9) + 1e-12;
+        if (std::isinf(half_width)) {
+            half_width = std::numeric_limits<double>::max();
+        }
+
+        auto first = std::lower_bound(put_keys.begin(), put_keys.end(),
+                                      std::make_pair(x - half_width, size_t(0)));
+        for (auto it = first; it != put_keys.end() && it->first <= x + half_width; ++it) {
+            const size_t j = it->second;
+            const Option& put = puts[j];
+
+            // Same arithmetic as find_min_spread so results are bit-for-bit identical
+            double strangle_costs = call.premium + put.premium + base_strangle_cost;
+            double upper_breakeven = call.strike_price + strangle_costs;
+            double lower_breakeven = put.strike_price - strangle_costs;
+            double breakeven_difference = std::abs(upper_breakeven - lower_breakeven);
+            double average_strike_price = 0.5 * (call.strike_price + put.strike_price);
+            double normalized_difference = breakeven_difference / average_strike_price;
+
+            // Keep the first pair in (call, put) order among equal minima, as find_min_spread does
+            bool better = normalized_difference < min_normalized_diff ||
+                          (found && normalized_difference == min_normalized_diff &&
+                           i == best_call && j < best_put);
+            if (better) {
+                min_normalized_diff = normalized_difference;
+                found = true;
+                best_call = i;
+                best_put = j;
+                best_combination = {call, put, strangle_costs, upper_breakeven, lower_breakeven,
+                                    breakeven_difference, average_strike_price, normalized_difference};
+            }
+        }
+    }
+
+    return found;
+}
@@ -0,0 +1,207 @@
+// src/find_min_spread_batch.cpp
+
+#include "find_min_spread_batch.h"
+#include <algorithm>
+#include <atomic>
+#include <cmath>
+#include <exception>
+#include <limits>
+#include <mutex>
+#include <numeric>
+#include <thread>
+#include <utility>
+#include <vector>
+
+// Function multiversioning: the compiler builds one copy of the per-ticker search for each
+// instruction set listed, and the loader picks the widest one this CPU supports.  Elsewhere
+// (Apple silicon, MSVC) the build's own target is used, which on arm64 always has NEON.
+#if defined(__x86_64__) && !defined(__APPLE__) && \
+    ((defined(__clang__) && __clang_major__ >= 14) || (!defined(__clang__) && defined(__GNUC__) && __GNUC__ >= 6))
+#define STRANGLE_TARGET_CLONES __attribute__((target_clones("avx512f", "avx2", "default")))
+#define STRANGLE_RUNTIME_DISPATCH 1
+#else
+#define STRANGLE_TARGET_CLONES
+#define STRANGLE_RUNTIME_DISPATCH 0
+#endif
+
+namespace {
+
+const double base_strangle_cost = 2 * (0.53 + 0.55) / 100.0;
+
+// One ticker's puts sorted by y = strike - 2 * premium, held as separate columns so the
+// window loop reads contiguous memory.  Each thread reuses one across its tickers.
+struct SortedPuts {
+    std::vector<std::pair<double, int64_t>> keys;
+    std::vector<double> y;
+    std::vector<double> premium;
+    std::vector<double> strike;
+    std::vector<int64_t> index;
+};
+
+// The same window search as find_min_spread_bounded, but each call's window is reduced to
+// its minimum in a vector loop first.  Only when that minimum beats the best so far is the
+// window scanned again for the exact pair, taking the lowest put index among equal values.
+// Every value is computed with the same operations in the same order, so results are
+// bit-for-bit identical to the scalar kernels.
+STRANGLE_TARGET_CLONES
+void search_ticker(const double* call_premium, const double* call_strike, size_t num_calls,
+                   const double* put_premium, const double* put_strike, size_t num_puts,
+                   double max_normalized_difference, SortedPuts& sorted, BatchWinner& winner) {
+    winner = {-1, -1, NAN, NAN, NAN, NAN, NAN};
+    if (num_calls == 0 || num_puts == 0 || !(max_normalized_difference > 0)) {
+        return;
+    }
+
+    sorted.keys.clear();
+    double max_put_strike = -std::numeric_limits<double>::infinity();
+    for (size_t j = 0; j < num_puts; ++j) {
+        sorted.keys.emplace_back(put_strike[j] - 2 * put_premium[j], static_cast<int64_t>(j));
+        max_put_strike = std::max(max_put_strike, put_strike[j]);
+    }
+    std::sort(sorted.keys.begin(), sorted.keys.end());
+
+    sorted.y.resize(num_puts);
+    sorted.premium.resize(num_puts);
+    sorted.strike.resize(num_puts);
+    sorted.index.resize(num_puts);
+    for (size_t k = 0; k < num_puts; ++k) {
+        const int64_t j = sorted.keys[k].second;
+        sorted.y[k] = sorted.keys[k].first;
+        sorted.premium[k] = put_premium[j];
+        sorted.strike[k] = put_strike[j];
+        sorted.index[k] = j;
+    }
+    const double* y = sorted.y.data();
+    const double* premium = sorted.premium.data();
+    const double* strike = sorted.strike.data();
+
+    double min_normalized_diff = max_normalized_difference;
+
+    for (size_t i = 0; i < num_calls; ++i) {
+        const double cp = call_premium[i];
+        const double cs = call_strike[i];
+        const double x = cs + 2 * cp + 2 * base_strangle_cost;
+
+        double half_width = 0.5 * min_normalized_diff * (cs + max_put_strike);
+        half_width = half_width * (1.0 + 1e-9) + 1e-12;
+        if (std::isinf(half_width)) {
+            half_width = std::numeric_limits<double>::max();
+        }
+        const size_t first = std::lower_bound(y, y + num_puts, x - half_width) - y;
+        const size_t last = std::upper_bound(y + first, y + num_puts, x + half_width) - y;
+
+        double window_min = std::numeric_limits<double>::infinity();
+#pragma omp simd reduction(min:window_min)
+        for (size_t k = first; k < last; ++k) {
+            double strangle_costs = cp + premium[k] + base_strangle_cost;
+            double upper_breakeven = cs + strangle_costs;
+            double lower_breakeven = strike[k] - strangle_costs;
+            double breakeven_difference = std::abs(upper_breakeven - lower_breakeven);
+            double average_strike_price = 0.5 * (cs + strike[k]);
+            double normalized_difference = breakeven_difference / average_strike_price;
+            window_min = std::min(window_min, normalized_difference);
+        }
+        if (!(window_min < min_normalized_diff)) {
+            continue;
+        }
+
+        // Rare: this call improves on the best so far.  Find which put achieves it.
+        int64_t best_put = -1;
+        for (size_t k = first; k < last; ++k) {
+            double strangle_costs = cp + premium[k] + base_strangle_cost;
+            double upper_breakeven = cs + strangle_costs;
+            double lower_breakeven = strike[k] - strangle_costs;
+            double breakeven_difference = std::abs(upper_breakeven - lower_breakeven);
+            double average_strike_price = 0.5 * (cs + strike[k]);
+            double normalized_difference = breakeven_difference / average_strike_price;
+            if (normalized_difference == window_min && (best_put < 0 || sorted.index[k] < best_put)) {
+                best_put = sorted.index[k];
+                winner = {static_cast<int64_t>(i), best_put, strangle_costs, upper_breakeven,
+                          lower_breakeven, breakeven_difference, normalized_difference};
+            }
+        }
+        min_normalized_diff = window_min;
+    }
+}
+
+} // namespace
+
+void find_min_spread_batch(const double* call_premium, const double* call_strike, const int64_t* call_offsets,
+                           const double* put_premium, const double* put_strike, const int64_t* put_offsets,
+                           const double* max_normalized_difference, size_t num_tickers,
+                           unsigned num_threads, BatchWinner* winners) {
+    if (num_tickers == 0) {
+        return;
+    }
+
+    // Largest tickers first, handed out one at a time, so no thread is left holding a big
+    // chain at the end while the others sit idle
+    std::vector<size_t> order(num_tickers);
+    std::iota(order.begin(), order.end(), 0);
+    std::vector<double> pairs(num_tickers);
+    for (size_t t = 0; t < num_tickers; ++t) {
+        pairs[t] = double(call_offsets[t + 1] - call_offsets[t]) * double(put_offsets[t + 1] - put_offsets[t]);
+    }
+    std::stable_sort(order.begin(), order.end(), [&](size_t a, size_t b) { return pairs[a] > pairs[b]; });
+
+    std::atomic<size_t> next(0);
+    std::exception_ptr error;
+    std::mutex error_mutex;
+
+    auto worker = [&]() {
+        SortedPuts sorted;
+        try {
+            for (size_t n = next++; n < num_tickers; n = next++) {
+                const size_t t = order[n];
+                search_ticker(call_premium + call_offsets[t], call_strike + call_offsets[t],
+                              size_t(call_offsets[t + 1] - call_offsets[t]),
+                              put_premium + put_offsets[t], put_strike + put_offsets[t],
+                              size_t(put_offsets[t + 1] - put_offsets[t]),
+                              max_normalized_difference[t], sorted, winners[t]);
+            }
+        } catch (...) {
+            std::lock_guard<std::mutex> lock(error_mutex);
+            if (!error) {
+                error = std::current_exception();
+            }
+            next = num_tickers;
+        }
+    };
+
+    if (num_threads == 0) {
+        num_threads = std::max(1u, std::thread::hardware_concurrency());
+    }
+    num_threads = static_cast<unsigned>(std::min<size_t>(num_threads, num_tickers));
+
+    // The calling thread is one of the workers
+    std::vector<std::thread> threads;
+    threads.reserve(num_threads - 1);
+    for (unsigned n = 1; n < num_threads; ++n) {
+        threads.emplace_back(worker);
+    }
+    worker();
+    for (auto& thread : threads) {
+        thread.join();
+    }
+
+    if (error) {
+        std::rethrow_exception(error);
+    }
+}
+
+std::string batch_instruction_set() {
+#if STRANGLE_RUNTIME_DISPATCH
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx512f")) {
+        return "avx512f";
+    }
+    if (__builtin_cpu_supports("avx2")) {
+        return "avx2";
+    }
+    return "sse2";
+#elif defined(__aarch64__) || defined(__ARM_NEON)
+    return "neon";
+#else
+    return "scalar";
+#endif
+}
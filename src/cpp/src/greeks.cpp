@@ -0,0 +1,164 @@
+// src/greeks.cpp
+
+#include "greeks.h"
+#include <algorithm>
+#include <cmath>
+#include <limits>
+
+namespace {
+
+const double seconds_per_year = 31536000.0;
+const double inv_sqrt_2 = 0.70710678118654752440;
+const double inv_sqrt_2pi = 0.39894228040143267794;
+const double sqrt_2pi = 2.50662827463100050242;
+
+// Standard normal CDF (erfc keeps precision far out in the tails) and density
+double normal_cdf(double z) {
+    return 0.5 * std::erfc(-z * inv_sqrt_2);
+}
+
+double normal_pdf(double z) {
+    return inv_sqrt_2pi * std::exp(-0.5 * z * z);
+}
+
+bool valid_inputs(double stock_price, double strike_price, double years) {
+    return std::isfinite(stock_price) && std::isfinite(strike_price) && std::isfinite(years) &&
+           stock_price > 0 && strike_price > 0 && years > 0;
+}
+
+// Model price and its derivative with respect to volatility (per unit of volatility)
+void price_and_vega(double stock_price, double strike_price, double sigma, double years, bool is_call,
+                    double discount, double& price, double& vega) {
+    const double sqrt_t = std::sqrt(years);
+    const double sigma_sqrt_t = sigma * sqrt_t;
+    const double d_1 = (std::log(stock_price / (strike_price * discount)) + 0.5 * sigma_sqrt_t * sigma_sqrt_t) / sigma_sqrt_t;
+    const double d_2 = d_1 - sigma_sqrt_t;
+    if (is_call) {
+        price = stock_price * normal_cdf(d_1) - strike_price * discount * normal_cdf(d_2);
+    } else {
+        price = strike_price * discount * normal_cdf(-d_2) - stock_price * normal_cdf(-d_1);
+    }
+    vega = stock_price * normal_pdf(d_1) * sqrt_t;
+}
+
+} // namespace
+
+double black_scholes_price(double stock_price, double strike_price, double implied_volatility,
+                           double seconds_to_expiration, bool is_call, double rate) {
+    const double years = seconds_to_expiration / seconds_per_year;
+    if (!valid_inputs(stock_price, strike_price, years) || !(implied_volatility > 0)) {
+        return std::numeric_limits<double>::quiet_NaN();
+    }
+    double price, vega;
+    price_and_vega(stock_price, strike_price, implied_volatility, years, is_call, std::exp(-rate * years), price, vega);
+    return price;
+}
+
+Greeks black_scholes_greeks(double stock_price, double strike_price, double implied_volatility,
+                            double seconds_to_expiration, bool is_call, double rate) {
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    const double years = seconds_to_expiration / seconds_per_year;
+    if (!valid_inputs(stock_price, strike_price, years) || !(implied_volatility > 0) ||
+        !std::isfinite(implied_volatility)) {
+        return {nan, nan, nan, nan};
+    }
+
+    const double sqrt_t = std::sqrt(years);
+    const double sigma_sqrt_t = implied_volatility * sqrt_t;
+    const double discount = std::exp(-rate * years);
+    const double d_1 = (std::log(stock_price / strike_price) + (rate + 0.5 * implied_volatility * implied_volatility) * years) / sigma_sqrt_t;
+    const double d_2 = d_1 - sigma_sqrt_t;
+    const double density = normal_pdf(d_1);
+
+    Greeks greeks;
+    greeks.delta = is_call ? normal_cdf(d_1) : normal_cdf(d_1) - 1.0;
+    greeks.gamma = density / (stock_price * sigma_sqrt_t);
+    greeks.vega = stock_price * density * sqrt_t / 100.0;
+
+    const double decay = -stock_price * density * implied_volatility / (2.0 * sqrt_t);
+    const double carry = rate * strike_price * discount;
+    const double theta_per_year = is_call ? decay - carry * normal_cdf(d_2) : decay + carry * normal_cdf(-d_2);
+    greeks.theta = theta_per_year / 365.0;
+    return greeks;
+}
+
+double implied_volatility(double premium, double stock_price, double strike_price,
+                          double seconds_to_expiration, bool is_call, double rate) {
+    const double nan = std::numeric_limits<double>::quiet_NaN();
+    const double years = seconds_to_expiration / seconds_per_year;
+    if (!valid_inputs(stock_price, strike_price, years) || !std::isfinite(premium) || !std::isfinite(rate)) {
+        return nan;
+    }
+
+    // A premium outside the no-arbitrage range has no volatility that explains it
+    const double discount = std::exp(-rate * years);
+    const double intrinsic = is_call ? std::max(stock_price - strike_price * discount, 0.0)
+                                     : std::max(strike_price * discount - stock_price, 0.0);
+    const double upper = is_call ? stock_price : strike_price * discount;
+    if (!(premium > intrinsic) || !(premium < upper)) {
+        return nan;
+    }
+
+    // Start from the Brenner-Subrahmanyam at-the-money estimate; the bracket makes any start safe
+    double sigma = sqrt_2pi / std::sqrt(years) * premium / stock_price;
+    sigma = std::min(std::max(sigma, 0.05), 3.0);
+    double low = 0.0;
+    double high = std::numeric_limits<double>::infinity();
+    const double tolerance = 1e-10 * premium + 1e-14;
+
+    for (int iteration = 0; iteration < 100; ++iteration) {
+        double price, vega;
+        price_and_vega(stock_price, strike_price, sigma, years, is_call, discount, price, vega);
+        const double error = price - premium;
+        if (std::abs(error) <= tolerance) {
+            return sigma;
+        }
+
+        // The price rises with volatility, so the sign of the error narrows the bracket
+        if (error > 0) {
+            high = sigma;
+        } else {
+            low = sigma;
+        }
+
+        // Newton where it stays inside the bracket; otherwise bisect, or double while there
+        // is no upper end yet (far out of the money a tiny vega would throw Newton too far)
+        double next = sigma - error / vega;
+        if (std::isinf(high)) {
+            next = (vega > 0) ? std::min(next, 2.0 * sigma) : 2.0 * sigma;
+        } else if (!(vega > 0) || !(next > low && next < high)) {
+            next = 0.5 * (low + high);
+        }
+        if (high - low <= 1e-12 * sigma) {
+            return 0.5 * (low + high);
+        }
+        if (low > 100.0) {  // beyond 10,000% volatility: no meaningful answer
+            return nan;
+        }
+        sigma = next;
+    }
+    return nan;
+}
+
+void black_scholes_greeks_batch(const double* stock_price, const double* strike_price,
+                                const double* implied_volatility, const double* seconds_to_expiration,
+                                const uint8_t* is_call, size_t n, double rate,
+                                double* delta, double* gamma, double* vega, double* theta) {
+    for (size_t i = 0; i < n; ++i) {
+        const Greeks greeks = black_scholes_greeks(stock_price[i], strike_price[i], implied_volatility[i],
+                                                   seconds_to_expiration[i], is_call[i] != 0, rate);
+        delta[i] = greeks.delta;
+        gamma[i] = greeks.gamma;
+        vega[i] = greeks.vega;
+        theta[i] = greeks.theta;
+    }
+}
+
+void implied_volatility_batch(const double* premium, const double* stock_price, const double* strike_price,
+                              const double* seconds_to_expiration, const uint8_t* is_call, size_t n,
+                              double rate, double* implied_volatility_out) {
+    for (size_t i = 0; i < n; ++i) {
+        implied_volatility_out[i] = implied_volatility(premium[i], stock_price[i], strike_price[i],
+                                                       seconds_to_expiration[i], is_call[i] != 0, rate);
+    }
+}
@@ -1,23 +1,21 @@
 import os
 import json
+import time
+import random
 import logging
 import argparse
 import asyncio
-import threading
-from threading import Lock
 from datetime import datetime
 from collections import defaultdict
+from typing import Dict, Iterable, List, Set
 
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.graph_objects as go
+from aiohttp import web
 import websockets
 
-from models import Strangle
-
-# Initialize Dash app
-app = dash.Dash(__name__)
+from models import StrangleSet
+from expiry_calendar import ExpiryCalendar
+from dashboard_metrics import DashboardMetrics
+from price_history import PriceHistoryBook, MAX_POINTS
 
 # Configure logging
 # logging.basicConfig(
@@ -33,22 +31,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Set the werkzeug logger level to WARNING to suppress INFO logs
-logging.getLogger('werkzeug').setLevel(logging.WARNING)
-
-# Create a lock for thread safety
-data_lock = Lock()
+# Keep aiohttp's per-request access log out of the trade log
+logging.getLogger('aiohttp.access').setLevel(logging.WARNING)
 
 # Polygon WebSocket URL and API Key
-WS_URL = "wss://socket.polygon.io/stocks"
+WS_URL = os.getenv("POLYGON_WS_URL", "wss://socket.polygon.io/stocks")
 API_KEY = os.getenv("POLYGONIO_API_KEY")
 
-# Load strangles from holdings.json
-with open('holdings.json', 'r') as f:
+# Where the dashboard is served, and how often an idle event stream sends a keep-alive comment
+HOST = "127.0.0.1"
+PORT = 8050
+KEEPALIVE_SECONDS = 15.0
+
+# Trades kept as they came per ticker, before the history falls back to min/max buckets
+HISTORY_SIZE = 1024
+
+# Tickers per websocket connection (0: every ticker on one connection), and the pause before
+# a dropped connection reconnects.  Polygon plans limit concurrent connections per cluster,
+# so only shard as far as the plan allows.
+SHARD_SIZE = 0
+RECONNECT_SECONDS = 5.0
+
+# Channel prefix for each subscription type
+CHANNEL_PREFIXES = {'per_minute': 'AM.', 'per_second': 'A.', 'trades': 'T.'}
+
+# Load strangles from holdings.json (next to this file)
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'holdings.json'), 'r') as f:
     strangles_data = json.load(f)
 
-# Initialize Strangle objects with additional calculations
-strangles = []
+# Initialize Strangle rows with additional calculations
 for data in strangles_data:
     premium_call = data.get("premium_call", 0)
     premium_put = data.get("premium_put", 0)
@@ -75,121 +86,339 @@ for data in strangles_data:
         "num_strangles_considered": 1,
         "total_in": total_in
     })
-    strangles.append(Strangle(**data))
+strangles = StrangleSet.from_records(strangles_data, ExpiryCalendar())
 
 # Initialize a dictionary of lists to handle multiple holdings for each ticker
 strangle_dict = defaultdict(list)
 for strangle in strangles:
     strangle_dict[strangle.ticker].append(strangle)
 
-# Dash layout
-app.layout = html.Div([
-    html.Div(id='strangle-display'),
-    dcc.Interval(
-        id='interval-component',
-        interval=1000,  # in milliseconds
-        n_intervals=0
-    )
-])
-
-@app.callback(
-    Output('strangle-display', 'children'),
-    Input('interval-component', 'n_intervals')
-)
-def update_strangles(n_intervals):
-    display_list = []
-    logger.debug("Updating Dash display with latest prices...")
-    with data_lock:
-        for ticker, strangle_list in strangle_dict.items():
-            for strangle in strangle_list:
-                x_min = strangle.lower_breakeven - (strangle.breakeven_difference * 0.25)
-                x_max = strangle.upper_breakeven + (strangle.breakeven_difference * 0.25)
-
-                if strangle.stock_price > 0:
-                    if strangle.stock_price < x_min:
-                        x_min = strangle.stock_price - (strangle.breakeven_difference * 0.1)
-                    if strangle.stock_price > x_max:
-                        x_max = strangle.stock_price + (strangle.breakeven_difference * 0.1)
-
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=[x_min, x_max],
-                    y=[0, 0],
-                    mode="lines",
-                    line=dict(color="black", width=1),
-                    showlegend=False
-                ))
-                fig.add_trace(go.Scatter(
-                    x=[strangle.lower_breakeven, strangle.upper_breakeven],
-                    y=[0, 0],
-                    mode="lines",
-                    line=dict(color="green", width=2),
-                    name="Breakeven Range"
-                ))
-                fig.add_trace(go.Scatter(
-                    x=[strangle.lower_breakeven],
-                    y=[0], 
-                    mode="markers",
-                    marker=dict(color="green", size=12, symbol="cross", line_width=0),
-                    name="Lower Breakeven"
-                ))
-                fig.add_trace(go.Scatter(
-                    x=[strangle.upper_breakeven],
-                    y=[0], 
-                    mode="markers",
-                    marker=dict(color="green", size=12, symbol="cross", line_width=0),
-                    name="Upper Breakeven"
-                ))
-                if strangle.stock_price > 0:
-                    fig.add_trace(go.Scatter(
-                        x=[strangle.stock_price],
-                        y=[0],
-                        mode="markers",
-                        marker=dict(color="red", size=12, symbol="circle", line=dict(color="black", width=1)),
-                        name="Current Price"
-                    ))
-
-                fig.update_layout(
-                    showlegend=False,
-                    xaxis=dict(
-                        showgrid=False,
-                        zeroline=False,
-                        title=(
-                            f"({strangle.ticker}) "
-                            f"(call: ${strangle.strike_price_call}, {strangle.expiration_date_call}) "
-                            f"(put: ${strangle.strike_price_put}, {strangle.expiration_date_put}) "
-                            f"(in: ${strangle.total_in:.2f})"
-                        ),
-                        range=[x_min, x_max]
-                    ),
-                    yaxis=dict(
-                        showticklabels=False,
-                        showgrid=True,
-                        zeroline=True,
-                        range=[0, 0],
-                        automargin=True
-                    ),
-                    height=200,
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    paper_bgcolor="rgba(0,0,0,0)"
-                )
-
-                # Append a display component for each strangle individually
-                display_list.append(html.Div([
-                    dcc.Graph(
-                        figure=fig,
-                        config={'displayModeBar': False},
-                        style={'height': '200px', 'padding': '0', 'margin': '0'}
-                    )
-                ], style={'padding': '0', 'margin': '0'}))
-
-    return display_list
-
-async def websocket_listener(subscription_type):
+class Subscriber:
+    """
+    One connected browser.  Prices published while it is busy are coalesced to the latest
+    per ticker, so a slow client gets fewer, fresher updates instead of a growing backlog.
+    """
+
+    def __init__(self):
+        self.pending: Dict[str, dict] = {}
+        self.ready = asyncio.Event()
+
+    def offer(self, ticker: str, update: dict) -> bool:
+        # True if this replaced an update the client had not been sent yet
+        replaced = ticker in self.pending
+        self.pending[ticker] = update
+        self.ready.set()
+        return replaced
+
+    def drain(self) -> Dict[str, dict]:
+        pending, self.pending = self.pending, {}
+        self.ready.clear()
+        return pending
+
+class PriceHub:
+    """Latest price per ticker, pushed to every connected client as it arrives."""
+
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def publish(self, ticker: str, price: float, timestamp_ms=None) -> None:
+        # Update stock price for all holdings of this ticker, record it in the ticker's
+        # intraday history, then notify every client
+        for strangle in strangle_dict[ticker]:
+            strangle.stock_price = price
+        now_ms = time.time() * 1000
+        price_history.append(ticker, timestamp_ms or now_ms, price)
+        update = {'price': price, 't': timestamp_ms, 'sent': now_ms}
+        for subscriber in self.subscribers:
+            if subscriber.offer(ticker, update):
+                metrics.num_coalesced += 1
+
+metrics = DashboardMetrics()
+price_hub = PriceHub()
+price_history = PriceHistoryBook(strangle_dict, size=HISTORY_SIZE)
+
+def snapshot() -> dict:
+    # Everything a client needs to draw the holdings and their price history so far;
+    # prices then arrive as updates
+    holdings = []
+    for ticker, strangle_list in strangle_dict.items():
+        for strangle in strangle_list:
+            holdings.append({
+                'ticker': ticker,
+                'lower_breakeven': strangle.lower_breakeven,
+                'upper_breakeven': strangle.upper_breakeven,
+                'breakeven_difference': strangle.breakeven_difference,
+                'stock_price': strangle.stock_price if strangle.stock_price == strangle.stock_price else 0,
+                'title': (
+                    f"({strangle.ticker}) "
+                    f"(call: ${strangle.strike_price_call}, {strangle.expiration_date_call}) "
+                    f"(put: ${strangle.strike_price_put}, {strangle.expiration_date_put}) "
+                    f"(in: ${strangle.total_in:.2f})"
+                ),
+            })
+    return {'holdings': holdings, 'history': price_history.series(), 'max_points': MAX_POINTS}
+
+def sse_message(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+async def index(request: web.Request) -> web.Response:
+    return web.Response(text=PAGE, content_type='text/html')
+
+async def events(request: web.Request) -> web.StreamResponse:
+    """Server-sent events: one snapshot, then price updates only when prices change."""
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    await response.prepare(request)
+
+    # Subscribe before taking the snapshot so no update falls between the two
+    subscriber = price_hub.subscribe()
+    metrics.num_clients += 1
+    try:
+        await response.write(sse_message('snapshot', snapshot()))
+        while True:
+            try:
+                await asyncio.wait_for(subscriber.ready.wait(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                await response.write(b": keep-alive\n\n")
+                continue
+            prices = subscriber.drain()
+            await response.write(sse_message('prices', prices))
+            now_ms = time.time() * 1000
+            for update in prices.values():
+                metrics.push_delay.add(now_ms - update['sent'])
+    except (ConnectionResetError, ConnectionError):
+        pass  # Browser went away
+    finally:
+        price_hub.unsubscribe(subscriber)
+        metrics.num_clients -= 1
+    return response
+
+async def history(request: web.Request) -> web.Response:
+    # Downsampled price history, for every ticker or those in ?tickers=A,B
+    tickers = request.query.get('tickers')
+    return web.json_response(price_history.series(tickers.split(',') if tickers else None))
+
+def metrics_snapshot() -> dict:
+    snapshot = metrics.snapshot()
+    snapshot['history'] = price_history.stats()
+    return snapshot
+
+async def get_metrics(request: web.Request) -> web.Response:
+    return web.json_response(metrics_snapshot())
+
+async def post_metrics(request: web.Request) -> web.Response:
+    # The page reports its render samples and gets the server's figures back for its status strip
+    try:
+        report = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='expected a JSON object')
+    if isinstance(report, dict):
+        metrics.client_report(report)
+    return web.json_response(metrics_snapshot())
+
+def make_app() -> web.Application:
+    app = web.Application()
+    app.router.add_get('/', index)
+    app.router.add_get('/events', events)
+    app.router.add_get('/history', history)
+    app.router.add_get('/metrics', get_metrics)
+    app.router.add_post('/metrics', post_metrics)
+    return app
+
+# The page draws one Plotly chart per holding: the price history against the breakeven band,
+# extended with each pushed update
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>EdgeWalker holdings</title>
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<style>
+  body { font-family: sans-serif; margin: 0; }
+  .holding { height: 200px; padding: 0; margin: 0; }
+  #status { position: fixed; bottom: 0; left: 0; right: 0; padding: 3px 8px; font: 12px monospace;
+            background: #f4f4f4; border-top: 1px solid #ccc; white-space: nowrap; overflow: hidden; }
+  #strangle-display { margin-bottom: 24px; }
+</style>
+</head>
+<body>
+<div id="strangle-display"></div>
+<div id="status">waiting for metrics...</div>
+<script>
+const charts = {};  // ticker -> list of {div, holding, low, high}
+let maxPoints = 400;   // points per history trace, from the server
+const stale = {};      // ticker -> live points added since its history was last fetched
+
+function xRange(h, low, high) {
+  let xMin = h.lower_breakeven - h.breakeven_difference * 0.25;
+  let xMax = h.upper_breakeven + h.breakeven_difference * 0.25;
+  if (low > 0 && low < xMin) xMin = low - h.breakeven_difference * 0.1;
+  if (high > 0 && high > xMax) xMax = high + h.breakeven_difference * 0.1;
+  return [xMin, xMax];
+}
+
+function extremes(prices, price) {
+  const known = price > 0 ? prices.concat([price]) : prices;
+  return known.length ? [Math.min(...known), Math.max(...known)] : [0, 0];
+}
+
+// Price across, time up: the intraday trace climbs through the breakeven band
+function draw(h, history) {
+  const div = document.createElement('div');
+  div.className = 'holding';
+  document.getElementById('strangle-display').appendChild(div);
+  const [low, high] = extremes(history.p, h.stock_price);
+  const range = xRange(h, low, high);
+  const last = history.t.length ? new Date(history.t[history.t.length - 1]) : new Date();
+  const traces = [
+    {x: history.p, y: history.t.map((t) => new Date(t)), mode: 'lines', line: {color: 'steelblue', width: 1}},
+    {x: h.stock_price > 0 ? [h.stock_price] : [], y: h.stock_price > 0 ? [last] : [], mode: 'markers',
+     marker: {color: 'red', size: 12, symbol: 'circle', line: {color: 'black', width: 1}}},
+  ];
+  const edge = (x) => ({type: 'line', xref: 'x', yref: 'paper', x0: x, x1: x, y0: 0, y1: 1,
+                        line: {color: 'green', width: 2}});
+  const layout = {
+    showlegend: false, height: 200, margin: {t: 10},
+    xaxis: {showgrid: false, zeroline: false, title: {text: h.title}, range: range},
+    yaxis: {type: 'date', tickformat: '%H:%M', showgrid: true, zeroline: false, automargin: true},
+    shapes: [
+      {type: 'rect', xref: 'x', yref: 'paper', x0: h.lower_breakeven, x1: h.upper_breakeven, y0: 0, y1: 1,
+       fillcolor: 'green', opacity: 0.12, line: {width: 0}},
+      edge(h.lower_breakeven), edge(h.upper_breakeven),
+    ],
+    plot_bgcolor: 'rgba(0,0,0,0)', paper_bgcolor: 'rgba(0,0,0,0)',
+  };
+  Plotly.newPlot(div, traces, layout, {displayModeBar: false, staticPlot: false});
+  (charts[h.ticker] = charts[h.ticker] || []).push({div: div, holding: h, low: low, high: high});
+}
+
+function update(ticker, price, when) {
+  for (const chart of charts[ticker] || []) {
+    chart.low = chart.low > 0 ? Math.min(chart.low, price) : price;
+    chart.high = Math.max(chart.high, price);
+    const range = xRange(chart.holding, chart.low, chart.high);
+    // Live points are appended until the next history fetch replaces the trace
+    Plotly.extendTraces(chart.div, {x: [[price]], y: [[when]]}, [0], 2 * maxPoints);
+    Plotly.update(chart.div, {x: [[price]], y: [[when]]}, {'xaxis.range': range}, [1]);
+  }
+  if (charts[ticker]) stale[ticker] = (stale[ticker] || 0) + 1;
+}
+
+// Swap each stale trace for the server's downsampled history, so a long session costs
+// the same to draw as a short one
+let fetching = false;
+async function refreshHistory() {
+  const tickers = Object.keys(stale);
+  if (fetching || !tickers.length) return;
+  fetching = true;
+  for (const ticker of tickers) delete stale[ticker];
+  try {
+    const response = await fetch('/history?tickers=' + encodeURIComponent(tickers.join(',')));
+    const series = await response.json();
+    for (const ticker in series) {
+      for (const chart of charts[ticker] || []) {
+        Plotly.restyle(chart.div, {x: [series[ticker].p], y: [series[ticker].t.map((t) => new Date(t))]}, [0]);
+      }
+    }
+  } catch (error) {
+    for (const ticker of tickers) stale[ticker] = stale[ticker] || 1;
+  } finally {
+    fetching = false;
+  }
+}
+setInterval(refreshHistory, 30000);
+
+const source = new EventSource('/events');
+source.addEventListener('snapshot', (e) => {
+  document.getElementById('strangle-display').innerHTML = '';
+  for (const key in charts) delete charts[key];
+  const snapshot = JSON.parse(e.data);
+  maxPoints = snapshot.max_points;
+  for (const h of snapshot.holdings) draw(h, snapshot.history[h.ticker] || {t: [], p: []});
+});
+
+// Render timings go back to the server once a second; the reply fills the status strip
+let samples = {render_ms: [], tick_to_render_ms: []};
+
+source.addEventListener('prices', (e) => {
+  const prices = JSON.parse(e.data);
+  const ticks = [];
+  for (const ticker in prices) {
+    const start = performance.now();
+    update(ticker, prices[ticker].price, new Date(prices[ticker].t || prices[ticker].sent));
+    if (charts[ticker]) samples.render_ms.push(performance.now() - start);
+    if (prices[ticker].t) ticks.push(prices[ticker].t);
+    // A busy ticker does not wait for the timer to get its trace downsampled again
+    if (stale[ticker] > maxPoints) refreshHistory();
+  }
+  // The new prices are on screen once the next frame has been drawn
+  requestAnimationFrame(() => setTimeout(() => {
+    const now = Date.now();
+    for (const t of ticks) samples.tick_to_render_ms.push(now - t);
+  }, 0));
+});
+
+function ms(s) {
+  return s && s.count ? `${s.p50.toFixed(1)}/${s.p95.toFixed(1)}/${s.p99.toFixed(1)} ms` : '-';
+}
+
+async function reportMetrics() {
+  const report = samples;
+  samples = {render_ms: [], tick_to_render_ms: []};
+  try {
+    const response = await fetch('/metrics', {method: 'POST', body: JSON.stringify(report),
+                                              headers: {'Content-Type': 'application/json'}});
+    const m = await response.json();
+    document.getElementById('status').textContent =
+      `ingest ${m.events.per_second}/s | queue ${m.queue.depth} (max ${m.queue.max_depth}), ` +
+      `wait ${ms(m.queue_wait_ms)} | push ${ms(m.push_delay_ms)} | render ${ms(m.render_ms)} | ` +
+      `tick-to-render ${ms(m.tick_to_render_ms)} (p50/p95/p99) | ${m.clients} client(s) | ` +
+      `${m.connections.open}/${m.connections.total} feed connection(s) | ` +
+      `history ${m.history.prices.toLocaleString()} prices in ${m.history.kb} kB`;
+  } catch (error) {
+    document.getElementById('status').textContent = 'metrics unavailable';
+  }
+}
+setInterval(reportMetrics, 1000);
+</script>
+</body>
+</html>
+"""
+
+def shard_tickers(tickers: Iterable[str], shard_size: int = SHARD_SIZE) -> List[List[str]]:
+    # Split the book into equal shards of at most shard_size tickers
+    tickers = list(tickers)
+    if shard_size <= 0 or len(tickers) <= shard_size:
+        return [tickers]
+    num_shards = -(-len(tickers) // shard_size)
+    return [tickers[i::num_shards] for i in range(num_shards)]
+
+async def websocket_listener(subscription_type, frames: asyncio.Queue, tickers: List[str], shard: int = 0):
+    # One connection for one shard of the book.  Only reads frames and queues them with their
+    # arrival time; event_consumer does the work, so the queue's depth is the backlog the
+    # dashboard has not caught up with yet.  Every shard feeds the same queue, and a shard
+    # that drops reconnects and resubscribes on its own while the others keep streaming.
+    if subscription_type not in CHANNEL_PREFIXES:
+        logger.error(f"Invalid subscription type: {subscription_type}")
+        return
+    prefix = CHANNEL_PREFIXES[subscription_type]
+    label = f"[shard {shard}] " if metrics.num_shards > 1 else ""
+
     while True:
         try:
             async with websockets.connect(WS_URL) as websocket:
-                logger.info("WebSocket connection established.")
+                logger.info(f"{label}WebSocket connection established.")
 
                 # Step 2: Authenticate
                 await websocket.send(json.dumps({"action": "auth", "params": API_KEY}))
@@ -197,57 +426,63 @@ async def websocket_listener(subscription_type):
                 # Wait for authentication response
                 while True:
                     auth_response = await websocket.recv()
-                    logger.info(f"Auth Response: {auth_response}")
+                    logger.info(f"{label}Auth Response: {auth_response}")
                     
                     response_data = json.loads(auth_response)
                     if isinstance(response_data, list) and any(event.get("status") == "auth_success" for event in response_data):
-                        logger.info("Authentication successful.")
+                        logger.info(f"{label}Authentication successful.")
                         break
                     elif isinstance(response_data, list) and any(event.get("status") == "connected" for event in response_data):
-                        logger.info("Connection established but not authenticated.")
+                        logger.info(f"{label}Connection established but not authenticated.")
                     else:
-                        logger.error(f"Unexpected auth response: {auth_response}")
+                        logger.error(f"{label}Unexpected auth response: {auth_response}")
                         await asyncio.sleep(5)
                         continue
 
-                # Step 3: Subscribe to tickers based on subscription_type
-                if subscription_type == 'per_minute':
-                    prefix = 'AM.'
-                elif subscription_type == 'per_second':
-                    prefix = 'A.'
-                elif subscription_type == 'trades':
-                    prefix = 'T.'
-                else:
-                    logger.error(f"Invalid subscription type: {subscription_type}")
-                    return
-
-                tickers_str = ",".join([f"{prefix}{ticker}" for ticker in strangle_dict.keys()])
+                # Step 3: Subscribe to this shard's tickers based on subscription_type
+                tickers_str = ",".join([f"{prefix}{ticker}" for ticker in tickers])
                 await websocket.send(json.dumps({"action": "subscribe", "params": tickers_str}))
-                logger.info(f"Subscribed to {subscription_type} updates for tickers: {tickers_str}")
+                shown = ", ".join(tickers[:20]) + (f" and {len(tickers) - 20:,} more" if len(tickers) > 20 else "")
+                logger.info(f"{label}Subscribed to {subscription_type} updates for tickers: {shown}")
+                metrics.connection_opened(shard)
 
                 # Loop to receive data
-                logger.info("Listening for incoming messages...")
+                logger.info(f"{label}Listening for incoming messages...")
                 while True:
                     message = await websocket.recv()
-                    logger.debug(f"Raw message received: {message}")
-                    data = json.loads(message)
-
-                    # Handle the case where data is a list of events
-                    if isinstance(data, list):
-                        for event in data:
-                            await process_event(event, subscription_type)
-                    # Handle the case where data is a single event (unlikely based on API, but just in case)
-                    elif isinstance(data, dict):
-                        await process_event(data, subscription_type)
-                    else:
-                        logger.warning(f"Unexpected message format: {data}")
+                    frames.put_nowait((message, time.time()))
+                    metrics.frame_queued(frames.qsize(), shard)
 
         except websockets.exceptions.ConnectionClosed as e:
-            logger.error(f"WebSocket connection closed: {e}. Reconnecting in 5 seconds...")
-            await asyncio.sleep(5)
+            delay = RECONNECT_SECONDS + random.uniform(0, 1)
+            logger.error(f"{label}WebSocket connection closed: {e}. Reconnecting in {delay:.1f} seconds...")
         except Exception as e:
-            logger.error(f"Error in websocket_listener: {e}. Reconnecting in 5 seconds...")
-            await asyncio.sleep(5)
+            delay = RECONNECT_SECONDS + random.uniform(0, 1)
+            logger.error(f"{label}Error in websocket_listener: {e}. Reconnecting in {delay:.1f} seconds...")
+        metrics.connection_lost(shard)
+        # (with a little jitter, so shards dropped together do not reconnect in lockstep)
+        await asyncio.sleep(delay)
+
+async def event_consumer(subscription_type, frames: asyncio.Queue):
+    while True:
+        message, received = await frames.get()
+        metrics.frame_dequeued(frames.qsize(), received)
+        logger.debug(f"Raw message received: {message}")
+        try:
+            data = json.loads(message)
+        except ValueError:
+            logger.warning(f"Unreadable message: {message}")
+            continue
+
+        # Handle the case where data is a list of events
+        if isinstance(data, list):
+            for event in data:
+                await process_event(event, subscription_type)
+        # Handle the case where data is a single event (unlikely based on API, but just in case)
+        elif isinstance(data, dict):
+            await process_event(data, subscription_type)
+        else:
+            logger.warning(f"Unexpected message format: {data}")
 
 async def process_event(event, subscription_type):
     ev_type = event.get("ev")
@@ -273,10 +508,10 @@ async def process_event(event, subscription_type):
         return
 
     if price is not None:
-        with data_lock:
-            # Update stock price for all holdings of this ticker
-            for strangle in strangle_dict[ticker]:
-                strangle.stock_price = price
+        # Record the price and push it to every connected browser
+        timestamp_ms = event.get("t") or event.get("e")
+        metrics.event_processed(timestamp_ms)
+        price_hub.publish(ticker, price, timestamp_ms)
         if ev_type == "T":
             Nshares = event.get("s")
             realtime_ms = event.get("t")
@@ -291,21 +526,43 @@ async def process_event(event, subscription_type):
     else:
         logger.warning(f"Price not found in event: {event}")
 
-def run_websocket_listener(subscription_type):
-    asyncio.run(websocket_listener(subscription_type))
+async def serve(subscription_type, host=HOST, port=PORT, shard_size=SHARD_SIZE):
+    # The web server and the websocket listeners share one event loop; no threads, no locks
+    runner = web.AppRunner(make_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Dashboard at http://{host}:{port}/ (metrics at /metrics)")
+
+    # One connection per shard of the book, all merging into one frame queue and price state
+    shards = shard_tickers(strangle_dict, shard_size)
+    metrics.shards_started([len(shard) for shard in shards])
+    if len(shards) > 1:
+        logger.info(f"Subscribing {len(strangle_dict):,} tickers over {len(shards):,} connections.")
+    frames = asyncio.Queue()
+    consumer = asyncio.ensure_future(event_consumer(subscription_type, frames))
+    listeners = [
+        asyncio.ensure_future(websocket_listener(subscription_type, frames, tickers, shard=i))
+        for i, tickers in enumerate(shards)
+    ]
+    try:
+        await asyncio.gather(*listeners)
+    finally:
+        for listener in listeners:
+            listener.cancel()
+        consumer.cancel()
+        await runner.cleanup()
 
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description='Strangle Dashboard')
     parser.add_argument('--subscription', choices=['per_minute', 'per_second', 'trades'], default='trades',
                         help='Subscription type for websocket (default: per_minute)')
+    parser.add_argument('--port', type=int, default=PORT, help=f'port to serve the dashboard on (default: {PORT})')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, metavar='N',
+                        help='tickers per websocket connection; 0 puts every ticker on one (default: 0)')
     args = parser.parse_args()
 
-    # Start the WebSocket listener in a separate thread
-    threading.Thread(target=run_websocket_listener, args=(args.subscription,), daemon=True).start()
-
-    # Start the Dash server
-    app.run_server(debug=False)
+    asyncio.run(serve(args.subscription, port=args.port, shard_size=args.shard_size))
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,174 @@
+# dashboard_metrics.py
+
+import math
+import time
+import logging
+from collections import deque
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+class RateMeter:
+    """Events per second over the last `window` seconds."""
+
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self.total = 0
+        self._counts: deque = deque()  # (whole second, events in it)
+
+    def add(self, count: int = 1, now: float = None) -> None:
+        second = int(time.monotonic() if now is None else now)
+        if self._counts and self._counts[-1][0] == second:
+            self._counts[-1][1] += count
+        else:
+            self._counts.append([second, count])
+        self.total += count
+
+    def rate(self, now: float = None) -> float:
+        now = time.monotonic() if now is None else now
+        while self._counts and self._counts[0][0] <= now - self.window:
+            self._counts.popleft()
+        return sum(count for _, count in self._counts) / self.window
+
+class LatencyRecorder:
+    """
+    The most recent `size` samples of one latency, in milliseconds, in a fixed ring buffer
+    so recording is O(1) and memory stays flat however long the dashboard runs.
+    """
+
+    def __init__(self, size: int = 4096):
+        self._samples = np.zeros(size, dtype=np.float64)
+        self._next = 0
+        self.count = 0
+
+    def add(self, milliseconds: float) -> None:
+        self._samples[self._next] = milliseconds
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            # Clients can post anything: keep finite numbers only
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            try:
+                value = float(value)
+            except OverflowError:
+                continue
+            if math.isfinite(value):
+                self.add(value)
+
+    def summary(self) -> Dict[str, float]:
+        samples = self._samples[:min(self.count, len(self._samples))]
+        if not len(samples):
+            return {'count': 0}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            'count': self.count,
+            'p50': round(float(p50), 3),
+            'p95': round(float(p95), 3),
+            'p99': round(float(p99), 3),
+            'max': round(float(samples.max()), 3),
+        }
+
+class DashboardMetrics:
+    """
+    How far behind the market the dashboard is, stage by stage.
+
+        ingest_lag      SIP timestamp of an event -> the server processes it
+        queue_wait      websocket frame received -> its events are processed
+        push_delay      price published -> written to a browser's event stream
+        render          one Plotly.update in the browser (reported by the page)
+        tick_to_render  SIP timestamp -> the browser has drawn the new price
+
+    plus the event ingest rate, the depth of the receive queue and the state of each
+    websocket shard.  The SIP-based latencies include any offset between the exchange
+    clock and this machine's.
+    """
+
+    def __init__(self, window: float = 10.0):
+        self.started = time.monotonic()
+        self.events = RateMeter(window)
+        self.frames = RateMeter(window)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.num_coalesced = 0
+        self.num_clients = 0
+        self.ingest_lag = LatencyRecorder()
+        self.queue_wait = LatencyRecorder()
+        self.push_delay = LatencyRecorder()
+        self.render = LatencyRecorder()
+        self.tick_to_render = LatencyRecorder()
+
+        # Per websocket shard: tickers, whether it is connected, frames and reconnects
+        self.shards: List[dict] = []
+
+    @property
+    def num_shards(self) -> int:
+        return len(self.shards)
+
+    def shards_started(self, sizes: List[int]) -> None:
+        self.shards = [{'tickers': size, 'connected': False, 'frames': 0, 'reconnects': 0} for size in sizes]
+
+    def connection_opened(self, shard: int) -> None:
+        self.shards[shard]['connected'] = True
+
+    def connection_lost(self, shard: int) -> None:
+        self.shards[shard]['connected'] = False
+        self.shards[shard]['reconnects'] += 1
+
+    def frame_queued(self, depth: int, shard: int = 0) -> None:
+        self.frames.add()
+        if self.shards:
+            self.shards[shard]['frames'] += 1
+        self.queue_depth = depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def frame_dequeued(self, depth: int, received: float) -> None:
+        self.queue_depth = depth
+        self.queue_wait.add(1000 * (time.time() - received))
+
+    def event_processed(self, timestamp_ms) -> None:
+        self.events.add()
+        if timestamp_ms:
+            self.ingest_lag.add(time.time() * 1000 - timestamp_ms)
+
+    def client_report(self, report: dict) -> None:
+        # Samples a page posts back: how long its renders took and how stale they were
+        for key, recorder in (('render_ms', self.render), ('tick_to_render_ms', self.tick_to_render)):
+            samples = report.get(key)
+            if isinstance(samples, list):
+                recorder.extend(samples)
+
+    def snapshot(self) -> dict:
+        return {
+            'uptime_s': round(time.monotonic() - self.started, 1),
+            'events': {'total': self.events.total, 'per_second': round(self.events.rate(), 1)},
+            'frames': {'total': self.frames.total, 'per_second': round(self.frames.rate(), 1)},
+            'queue': {'depth': self.queue_depth, 'max_depth': self.max_queue_depth},
+            'clients': self.num_clients,
+            'connections': {
+                'open': sum(shard['connected'] for shard in self.shards),
+                'total': len(self.shards),
+                'reconnects': sum(shard['reconnects'] for shard in self.shards),
+                'shards': self.shards,
+            },
+            'coalesced': self.num_coalesced,
+            'ingest_lag_ms': self.ingest_lag.summary(),
+            'queue_wait_ms': self.queue_wait.summary(),
+            'push_delay_ms': self.push_delay.summary(),
+            'render_ms': self.render.summary(),
+            'tick_to_render_ms': self.tick_to_render.summary(),
+        }
@@ -0,0 +1,82 @@
+# enrichment.py
+
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from models import StrangleSet
+from ticker_metadata import TickerMetadata
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+class Enricher:
+    """
+    Adds company names (and any later per-ticker details) to strangles after ranking.
+
+    Only the strangles that will be reported are enriched.  Names come from the local
+    metadata store first, then from an in-memory cache, and only then from the API in
+    one concurrent batch on a semaphore of its own, so lookups never compete with chain
+    downloads for request slots.
+    """
+
+    def __init__(self, market_data_client, metadata: TickerMetadata, concurrency: int = 4):
+        self.market_data_client = market_data_client
+        self.metadata = metadata
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.cache: Dict[str, str] = {}
+        self.num_api_lookups = 0
+
+    async def company_names(self, tickers: Iterable[str], timeout: Optional[float] = None) -> Dict[str, str]:
+        names = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            name = self.cache.get(ticker) or self.metadata.company_name(ticker)
+            if name is None:
+                missing.append(ticker)
+            else:
+                names[ticker] = name
+
+        # One batch of API lookups for the tickers the store does not know.  Lookups still
+        # running after `timeout` seconds are cancelled and those tickers shown by symbol.
+        if missing:
+            self.num_api_lookups += len(missing)
+            lookups = [
+                asyncio.ensure_future(self.market_data_client.get_ticker_details(ticker, semaphore=self.semaphore))
+                for ticker in missing
+            ]
+            done, pending = await asyncio.wait(lookups, timeout=timeout)
+            for lookup in pending:
+                lookup.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.info(f"Company name lookups timed out for {len(pending):,} tickers; showing symbols instead.\n")
+            for ticker, lookup in zip(missing, lookups):
+                name = lookup.result() if lookup in done else None
+                names[ticker] = name or f"({ticker})"
+
+        self.cache.update(names)
+        return names
+
+    async def enrich(self, strangles: StrangleSet, timeout: Optional[float] = None) -> None:
+        """Fill the company_name column for every row of a (ranked, filtered) result set."""
+        if not len(strangles):
+            return
+        num_api_lookups = self.num_api_lookups
+        names = await self.company_names(strangles.ticker.tolist(), timeout=timeout)
+        strangles.company_name[:] = np.array([names[t] for t in strangles.ticker], dtype=object)
+        logger.info(
+            f"Enriched {len(strangles):,} reported strangles "
+            f"({self.num_api_lookups - num_api_lookups:,} API lookups, the rest from the metadata store).\n"
+        )
@@ -0,0 +1,109 @@
+# expiry_calendar.py
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Options expire at the 4:00 PM close in New York.  Using the zone (rather than a
+# fixed UTC-5 offset) keeps the close correct on both sides of daylight saving time.
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_CLOSE = time(16, 0)
+
+class ExpiryCalendar:
+    """
+    Run-wide as-of clock and a precomputed table of seconds from that instant to the
+    market close on each calendar day of the scan horizon.
+
+    Expiration dates are encoded once as integer day indices (days after the as-of date
+    in New York), so every analytic downstream can be computed from integer arrays
+    without parsing dates per object.
+    """
+
+    def __init__(self, as_of: Optional[datetime] = None, horizon_days: int = 400):
+        # A single timestamp shared by every calculation in the run
+        if as_of is None:
+            as_of = datetime.now(timezone.utc)
+        elif as_of.tzinfo is None:
+            as_of = as_of.replace(tzinfo=timezone.utc)
+        self.as_of = as_of
+        self.as_of_epoch = int(as_of.timestamp())
+
+        # Day zero is the as-of date on the exchange's own calendar
+        self.start_date = as_of.astimezone(MARKET_TIMEZONE).date()
+        self.horizon_days = horizon_days
+
+        # Precompute seconds-to-close and the OCC date code for each day in the horizon
+        days = [self.start_date + timedelta(days=i) for i in range(horizon_days)]
+        self.seconds_to_close = np.array(
+            [self._close_epoch(day) - self.as_of_epoch for day in days], dtype=np.int64
+        )
+        self.occ_codes = [day.strftime('%y%m%d') for day in days]
+        self._day_index = {day.isoformat(): i for i, day in enumerate(days)}
+
+    @staticmethod
+    def _close_epoch(day: date) -> int:
+        close = datetime.combine(day, MARKET_CLOSE, tzinfo=MARKET_TIMEZONE)
+        return int(close.timestamp())
+
+    def day_index(self, expiration_date: str) -> int:
+        """Integer day index of an ISO expiration date (may fall outside the horizon)."""
+        index = self._day_index.get(expiration_date)
+        if index is None:
+            index = (date.fromisoformat(expiration_date) - self.start_date).days
+        return index
+
+    def day_indices(self, expiration_dates: Iterable[str]) -> np.ndarray:
+        """Encode a sequence of ISO expiration dates as an int32 array of day indices."""
+        return np.fromiter(
+            (self.day_index(d) for d in expiration_dates), dtype=np.int32
+        )
+
+    def date_string(self, day_index: int) -> str:
+        """ISO date string for a day index (inverse of day_index)."""
+        return (self.start_date + timedelta(days=int(day_index))).isoformat()
+
+    def occ_code(self, day_index: int) -> str:
+        """YYMMDD code used in OCC option symbols for a day index."""
+        if 0 <= day_index < self.horizon_days:
+            return self.occ_codes[day_index]
+        return (self.start_date + timedelta(days=int(day_index))).strftime('%y%m%d')
+
+    def seconds_for(self, day_indices) -> np.ndarray:
+        """Seconds from the as-of instant to the close on each day index in an array."""
+        indices = np.asarray(day_indices, dtype=np.int64).ravel()
+        in_horizon = (indices >= 0) & (indices < self.horizon_days)
+        if in_horizon.all():
+            return self.seconds_to_close[indices]
+
+        # Rare: expirations before today or beyond the horizon fall back to direct computation
+        seconds = np.empty(indices.shape, dtype=np.int64)
+        seconds[in_horizon] = self.seconds_to_close[indices[in_horizon]]
+        for position in np.flatnonzero(~in_horizon):
+            seconds[position] = self._seconds_outside_horizon(int(indices[position]))
+        return seconds
+
+    def seconds_to_expiration(self, expiration_date: str) -> int:
+        """Seconds from the as-of instant to the close on a single ISO expiration date."""
+        index = self.day_index(expiration_date)
+        if 0 <= index < self.horizon_days:
+            return int(self.seconds_to_close[index])
+        return self._seconds_outside_horizon(index)
+
+    def _seconds_outside_horizon(self, day_index: int) -> int:
+        day = self.start_date + timedelta(days=day_index)
+        return self._close_epoch(day) - self.as_of_epoch
@@ -0,0 +1,68 @@
+# import_budget.py
+#
+# Measure how long it takes to import the scanner's entry point and check it against a
+# budget.  Heavy libraries should not appear in the list: they are loaded lazily, on the
+# code paths that need them.
+#
+#   python import_budget.py                 # default: main, 500 ms
+#   python import_budget.py --module dashboard --budget-ms 3000
+
+import os
+import sys
+import argparse
+import subprocess
+
+# Libraries that must not be imported just by starting the scanner
+HEAVY_MODULES = ['pandas', 'scipy', 'bs4', 'aiohttp', 'requests', 'dash', 'plotly']
+
+def measure(module: str):
+    # Run in a fresh interpreter so nothing is already cached in sys.modules
+    src_path = os.path.dirname(os.path.abspath(__file__))
+    probe = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} "
+        f"if m in sys.modules and type(sys.modules[m]).__name__ != '_LazyModule'))"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=src_path, capture_output=True, text=True, check=True
+    )
+
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append((int(cumulative_us), int(self_us), name[1:]))
+
+    # Top-level imports (no leading indentation in the name) add up to the total
+    total_us = sum(
+        cumulative for cumulative, _, name in timings if not name.startswith(' ')
+    )
+    loaded_heavy = [m for m in completed.stdout.strip().split(',') if m]
+    return total_us, timings, loaded_heavy
+
+def main():
+    parser = argparse.ArgumentParser(description='Check import time of an EdgeWalker entry point')
+    parser.add_argument('--module', default='main', help='module to import (default: main)')
+    parser.add_argument('--budget-ms', type=float, default=500.0, help='import-time budget in milliseconds')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest imports to list')
+    args = parser.parse_args()
+
+    total_us, timings, loaded_heavy = measure(args.module)
+
+    print(f"Slowest imports for '{args.module}' (cumulative ms):")
+    for cumulative, _, name in sorted(timings, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {name.strip()}")
+    print(f"\nTotal import time: {total_us / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    ok = total_us / 1000 <= args.budget_ms
+    if loaded_heavy:
+        print(f"Heavy modules imported eagerly: {', '.join(loaded_heavy)}")
+        ok = False
+    print("OK" if ok else "OVER BUDGET")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# lazy_imports.py
+
+import os
+import sys
+import logging
+import importlib
+import importlib.util
+from importlib.machinery import EXTENSION_SUFFIXES
+from types import ModuleType
+from typing import Optional
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Where CMake puts the compiled strangle_module (see cpp/README.txt)
+src_path = os.path.dirname(os.path.abspath(__file__))
+cpp_build_path = os.path.join(src_path, "cpp", "build")
+
+# Ways import_strangle_module can pick the analytics backend
+STRANGLE_BACKENDS = ("auto", "native", "numpy")
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a module that is only executed on first attribute access.
+
+    Heavy dependencies (pandas, aiohttp, BeautifulSoup, ...) are bound at module level
+    with this so that code paths which never touch them never pay their import time.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def _import_native_strangle_module() -> ModuleType:
+    # The extension is loaded from its file directly rather than by appending cpp/build to
+    # sys.path; an installed strangle_module is used otherwise
+    if "strangle_module" in sys.modules:
+        return sys.modules["strangle_module"]
+
+    for suffix in EXTENSION_SUFFIXES:
+        candidate = os.path.join(cpp_build_path, f"strangle_module{suffix}")
+        if os.path.isfile(candidate):
+            spec = importlib.util.spec_from_file_location("strangle_module", candidate)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules["strangle_module"] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules["strangle_module"]
+                raise
+            return module
+
+    return importlib.import_module("strangle_module")
+
+def import_strangle_module(backend: Optional[str] = None) -> ModuleType:
+    """
+    Import the strangle analytics backend: the compiled strangle_module (preferring a
+    build in cpp/build), or its pure-NumPy counterpart strangle_numpy.
+
+    `backend` (default: the EDGEWALKER_BACKEND environment variable, else 'auto') is
+    'native', 'numpy', or 'auto' for the compiled module when it imports and NumPy
+    otherwise.  Both expose the same functions and classes.
+    """
+    backend = (backend or os.getenv("EDGEWALKER_BACKEND") or "auto").lower()
+    if backend not in STRANGLE_BACKENDS:
+        raise ValueError(f"Unknown strangle_module backend {backend!r} (expected one of {', '.join(STRANGLE_BACKENDS)})")
+
+    if backend != "numpy":
+        try:
+            return _import_native_strangle_module()
+        except ImportError as error:
+            if backend == "native":
+                raise
+            logger.warning(f"Compiled strangle_module unavailable ({error}); using the NumPy backend. "
+                           f"Build it in {cpp_build_path} for full speed.")
+    return importlib.import_module("strangle_numpy")
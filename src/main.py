@@ -4,6 +4,8 @@ import sys
 import time
 import json
 import asyncio
+from collections import deque
+import argparse
 
 # Adjust the Python path to ensure modules can be imported when running main.py directly
 src_path = os.path.dirname(os.path.abspath(__file__))
@@ -11,8 +13,20 @@ sys.path.append(src_path)
 
 # Import classes from the EdgeWalker package (src directory)
 from market_data_client import MarketDataClient
-from strangle_finder import StrangleFinder
+from strangle_finder import StrangleFinder, SearchBound, ScenarioRun
+from scenarios import Scenario, load_scenarios, DEFAULT_SCENARIO_FILE
 from report_writer import ReportWriter
+from expiry_calendar import ExpiryCalendar
+from request_policy import RequestPolicy
+from ticker_history import TickerHistory
+from ticker_metadata import TickerMetadata
+from enrichment import Enricher
+from chain_decoder import ChainBufferPool
+from memory_budget import MemoryBudget
+from snapshot_archive import SnapshotArchive
+from run_journal import RunJournal, new_run_id
+from pair_search import PairSearchBatcher
+from models import STRANGLE_BACKEND
 
 # Configure basic logging.  show warning or higher for external modules.
 logging.basicConfig(
@@ -26,27 +40,37 @@ logger = logging.getLogger(__name__)
 # Show info level logger events for this module
 logger.setLevel(logging.INFO)
 
-async def main():  
+async def main(args=None):  
+    # Command-line options (defaults when called without any)
+    if args is None:
+        args = parse_args([])
+    collections_to_include = args.collections
+
     # Start the timer
     start_time = time.time()
 
+    # Memory at each stage, and an optional ceiling that holds back new tickers
+    memory_budget = MemoryBudget(ceiling_mb=args.memory_ceiling, trace=args.trace_memory)
+    memory_budget.stage('start')
+
     # Load tickers from the tickers.json file
     tickers_file = os.path.join(os.path.dirname(__file__), 'tickers.json')
     with open(tickers_file, 'r') as f:
         tickers_data = json.load(f)
 
-    # Define the collections you want to include
-    collections_to_include = [
-        #'1_tickers',
-        #'5_tickers',
-        #'25_tickers',
-        #'100_tickers',
-        #'sp500_tickers',
-        #'russell1000_tickers',
-        #'nyse_tickers',
-        #'nasdaq_tickers',
-        'all_polygon'
-    ]
+    # Define the collections you want to include (unless given on the command line)
+    if collections_to_include is None:
+        collections_to_include = [
+            #'1_tickers',
+            #'5_tickers',
+            #'25_tickers',
+            #'100_tickers',
+            #'sp500_tickers',
+            #'russell1000_tickers',
+            #'nyse_tickers',
+            #'nasdaq_tickers',
+            'all_polygon'
+        ]
 
     # Initialize an empty set to store tickers and avoid duplicates
     all_tickers = set()
@@ -65,6 +89,7 @@ async def main():
 
     # Print a descriptive summary with the estimated time remaining
     logger.info(f"Using collections: {', '.join(collections_to_include)}\n")
+    logger.info(f"Analytics backend: {STRANGLE_BACKEND}\n")
     logger.info(
         f"We will process {num_tickers:,} unique tickers.\n"
         f"\nExpect {estimated_time_seconds:.0f} "
@@ -80,65 +105,278 @@ async def main():
 
     # Initialize the MarketDataClient
     polygonio_api_key = os.getenv("POLYGONIO_API_KEY")
-    market_data_client = MarketDataClient(api_key=polygonio_api_key)
+    request_policy = RequestPolicy(hedge_after=args.hedge_after)
+    market_data_client = MarketDataClient(api_key=polygonio_api_key, policy=request_policy, base_url=args.base_url)
 
-    # Initialize the StrangleFinder
-    strangle_finder = StrangleFinder(market_data_client=market_data_client)
+    # Checkpoint journal: finished tickers are recorded as they complete, so an interrupted
+    # run can be resumed with the same run ID instead of starting over
+    journal = RunJournal(args.run_id or new_run_id())
+    logger.info(f"Run ID {journal.run_id} (resume with --run-id {journal.run_id})\n")
+
+    # Fix a single as-of clock for every expiration calculation in this run (kept on resume)
+    calendar = ExpiryCalendar(as_of=journal.as_of)
+    journal.start(calendar.as_of)
+
+    # Company names come from the local metadata store (see utility/scrape_all_polygon.py)
+    ticker_metadata = TickerMetadata.load()
+    if not len(ticker_metadata):
+        logger.info("No ticker metadata store found; company names will be fetched for reported strangles.\n")
+
+    # Per-ticker timings and best results from earlier runs
+    ticker_history = TickerHistory.load()
+
+    # The scenarios to judge every chain by (expiration window, contract filters, cutoff,
+    # ranking).  Without --scenarios there is one, with the cutoff below and filters.json.
+    max_normalized_difference = 0.1  # Adjust as needed
+    if args.scenarios:
+        scenarios = load_scenarios(args.scenarios)
+    else:
+        scenarios = [Scenario(max_normalized_difference=max_normalized_difference)]
 
-    # Initialize results storage
-    results = []
-    num_tickers_processed = 0
-    num_strangles_considered = 0
+    # Only put interesting results into reports or output.  Each scenario's cutoff (and the
+    # top-N floor, if it ranks by normalized difference) goes into its pair search, so tickers
+    # that cannot make it stop early.  A warm start only applies to the first scenario.
+    runs = []
+    for scenario in scenarios:
+        top_n = (scenario.top if scenario.top is not None else args.top) if scenario.ranks_by_search else None
+        warm_start = None
+        if args.warm_start and not runs and top_n is not None:
+            warm_start = ticker_history.warm_start_bound(tickers, top_n)
+        bound = SearchBound(scenario.max_normalized_difference, top_n=top_n, warm_start=warm_start)
+        runs.append(ScenarioRun(scenario, calendar, bound=bound))
+    if len(runs) > 1:
+        logger.info("Scenarios, all evaluated on one download of each chain:\n" +
+                    "\n".join(f"  {scenario.describe()}" for scenario in scenarios) + "\n")
 
-    # Main loop over tickers with asynchronous execution
-    tasks = []
+    # Initialize the StrangleFinder
+    # (one reusable set of chain column buffers per concurrent request)
+    # (pair searches are batched across tickers onto the kernel's native threads)
+    archive = SnapshotArchive(args.archive) if args.archive else None
+    batcher = PairSearchBatcher(max_batch=args.batch_size, num_threads=args.kernel_threads) if args.batch_size > 0 else None
+    strangle_finder = StrangleFinder(
+        market_data_client=market_data_client, calendar=calendar,
+        buffer_pool=ChainBufferPool(concurrent_requests), memory_budget=memory_budget,
+        archive=archive, batcher=batcher, runs=runs
+    )
+
+    # Tickers finished before an interruption come back from the journal, not the API
+    # (unless the journal was written for a different set of scenarios)
+    restored = set()
     for ticker in tickers:
-        tasks.append(strangle_finder.find_balanced_strangle(ticker, semaphore=semaphore))
+        if ticker in journal.entries and strangle_finder.restorable(journal.entries[ticker]):
+            strangle_finder.restore(ticker, journal.entries[ticker])
+            restored.add(ticker)
+    remaining = [ticker for ticker in tickers if ticker not in restored]
+    if journal.resumed:
+        logger.info(f"{len(tickers) - len(remaining):,} tickers restored from the journal, {len(remaining):,} to go.\n")
+
+    # Bulk-fetch underlying prices so strike limits can be pushed into each chain request
+    if remaining:
+        await strangle_finder.prefetch_stock_prices(remaining, semaphore=semaphore)
+
+    # Record today's prices and chains for backtest.py
+    if archive is not None:
+        archive.save_meta(calendar.start_date, calendar.as_of)
+        archive.save_prices(calendar.start_date, strangle_finder.stock_prices)
+    memory_budget.stage('prices prefetched')
+
+    # Start the largest, slowest chains first (from earlier runs) so they do not finish last.
+    # Against a deadline, start with the tickers most likely to pay off per second instead.
+    if args.deadline is None:
+        remaining = ticker_history.longest_first(remaining)
+    else:
+        remaining = ticker_history.most_valuable_first(remaining)
+
+    # A fixed pool of workers takes tickers in that order, so the order above is the order they
+    # start in, and only the tickers being worked on are ever in flight
+    queue = deque(remaining)
+    num_scanned = 0
 
-    # Process all tasks concurrently
-    strangle_results = await asyncio.gather(*tasks)
+    async def scan_tickers():
+        nonlocal num_scanned
+        while queue:
+            ticker = queue.popleft()
+            await strangle_finder.find_balanced_strangle(ticker, semaphore=semaphore)
+            entry = strangle_finder.journal_entry(ticker)
+            if entry is not None:
+                journal.record(ticker, entry)
+            num_scanned += 1
 
-    # After all the tasks complete, process the results
-    for ticker, strangle in zip(tickers, strangle_results):
-        num_tickers_processed += 1
+    workers = [asyncio.ensure_future(scan_tickers()) for _ in range(min(concurrent_requests, len(remaining)))]
 
-        if strangle is not None:
-            num_strangles_considered += strangle.num_strangles_considered
+    # Each ticker's best strangle lands in each scenario's results.  With a deadline, the
+    # workers still running when the scan's share of it is used up are cancelled (releasing
+    # their request slots and buffers), and the report covers what finished.
+    num_cancelled = 0
+    try:
+        if args.deadline is None or not workers:
+            await asyncio.gather(*workers)
+        else:
+            scan_until = start_time + args.deadline - deadline_reserve(args.deadline)
+            done, pending = await asyncio.wait(workers, timeout=max(0.0, scan_until - time.time()))
+            # Empty the queue as well as cancelling: a worker whose cancellation is lost (e.g. in
+            # asyncio.wait_for) then stops after its current ticker instead of draining the queue
+            queue.clear()
+            for worker in pending:
+                worker.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for worker in done:
+                worker.result()
+            num_cancelled = len(remaining) - num_scanned
+        if not market_data_client.fetch_log.failures and not num_cancelled:
+            journal.mark_complete()
+    finally:
+        journal.close()
+        if batcher is not None:
+            batcher.close()
+        if archive is not None:
+            archive.close()
+    memory_budget.stage('chains scanned')
+    num_tickers_processed = len(tickers) - num_cancelled
+    num_strangles_considered = strangle_finder.num_strangles_considered
 
-            # Only put interesting results into reports or output
-            max_normalized_difference = 0.1  # Adjust as needed
-            if strangle.normalized_difference < max_normalized_difference:
-                results.append(strangle)
+    # The search already dropped anything at or above each bound; keep the best N if asked,
+    # with analytics for the surviving strangles computed in one batch per scenario
+    selections = [run.scenario.select(run.results, top=args.top) for run in runs]
+
+    # Company names only for the strangles that will be reported, on their own request budget
+    enricher = Enricher(market_data_client, ticker_metadata)
+    enrich_timeout = None if args.deadline is None else max(0.0, start_time + args.deadline - time.time())
+    for results in selections:
+        await enricher.enrich(results, timeout=enrich_timeout)
+    memory_budget.stage('analytics, names')
 
     # Calculate execution time
     execution_time = time.time() - start_time
-    execution_time_per_ticker = execution_time / len(tickers)
+    execution_time_per_ticker = execution_time / max(num_tickers_processed, 1)
 
     # Prepare execution details for the report
     execution_details = {
         'num_tickers_processed': num_tickers_processed,
         'num_strangles_considered': num_strangles_considered,
         'execution_time': execution_time,
-        'execution_time_per_ticker': execution_time_per_ticker
+        'execution_time_per_ticker': execution_time_per_ticker,
+        'failed_tickers': sorted(market_data_client.fetch_log.failures),
+        'num_tickers_retried': len(market_data_client.fetch_log.retries),
+        'partial': {
+            'deadline': args.deadline, 'num_tickers_processed': num_tickers_processed, 'num_tickers': len(tickers)
+        } if num_cancelled else None
     }
 
+    # Remember each chain's size and fetch time for scheduling the next run
+    for ticker, (pages, seconds) in market_data_client.chain_fetches.items():
+        ticker_history.record(ticker, pages, seconds)
+    for ticker, entry in journal.entries.items():
+        outcome = strangle_finder.primary_outcome(entry)
+        if ticker not in restored and outcome is not None:
+            ticker_history.record_best(ticker, outcome['row']['normalized_difference'] if outcome['status'] == 'found' else None)
+    ticker_history.save()
+
     # Write reports
-    report_writer = ReportWriter(results, execution_details)
-    report_writer.write_html()
-    report_writer.write_csv()
+    # (one pair of reports per scenario, named after it, when there are several)
+    for run, results in zip(runs, selections):
+        if len(runs) == 1:
+            report_writer = ReportWriter(results, execution_details)
+        else:
+            report_writer = ReportWriter(results, execution_details, scenario=run.scenario, suffix=run.name)
+        report_writer.write_html()
+        report_writer.write_csv()
+    memory_budget.stage('reports written')
 
     # Print summary
     logger.info(f"Number of tickers processed: {num_tickers_processed:,}")
     logger.info(f"Number of contract pairs tried: {num_strangles_considered:,}")
+    for run, results in zip(runs, selections):
+        prefix = f"[{run.name}] " if len(runs) > 1 else ""
+        if len(runs) > 1:
+            logger.info(f"{prefix}Strangles reported: {len(results):,} of {len(run.results):,} found")
+        logger.info(
+            f"{prefix}Tickers pruned by the search bound: {len(run.pruned_tickers):,} "
+            f"(final bound {run.bound.value:.4f})"
+        )
     logger.info(f"Execution time: {execution_time:.2f} seconds")
     logger.info(f"Execution time per ticker: {execution_time_per_ticker:.4f} seconds\n")
+    if num_cancelled:
+        logger.info(
+            f"Deadline of {args.deadline:.0f} s reached: {num_cancelled:,} tickers were not scanned and the "
+            f"report is partial.  Resume with --run-id {journal.run_id} to finish them.\n"
+        )
 
-def run_async_main():
-    asyncio.run(main())
+    # Retries, hedges and tickers that could not be fetched
+    logger.info(market_data_client.fetch_log.summary() + "\n")
 
-if __name__ == "__main__":
-    if '--profile' in sys.argv:
+    # Compression and volume of the options chain downloads
+    logger.info(market_data_client.transfer_stats.summary() + "\n")
+
+    # How the pair searches were batched
+    if batcher is not None:
+        logger.info(batcher.summary() + "\n")
+
+    # Which contract filter rules (filters.json) removed the most contracts
+    for run in runs:
+        if len(runs) > 1:
+            logger.info(f"[{run.name}]")
+        logger.info(run.contract_filter.summary() + "\n")
+    logger.info(
+        f"Implied volatility solved from premium for {strangle_finder.num_iv_solved:,} of "
+        f"{strangle_finder.num_iv_missing:,} contracts without one.\n"
+    )
+
+    # Resident memory at each stage (and allocation sites with --trace-memory)
+    logger.info(memory_budget.summary() + "\n")
+
+def deadline_reserve(deadline: float) -> float:
+    # Share of a deadline kept back from the scan for ranking, company names and the reports
+    return min(0.1 * deadline, 5.0)
+
+def run_async_main(args=None):
+    asyncio.run(main(args))
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='EdgeWalker strangle scan')
+    parser.add_argument('--collections', nargs='+', metavar='NAME',
+                        help='ticker collections from tickers.json (default: all_polygon)')
+    parser.add_argument('--hedge-after', type=float, default=None, metavar='SECONDS',
+                        help='send a duplicate request for any page slower than this (default: off)')
+    parser.add_argument('--base-url', default=None, metavar='URL',
+                        help='REST API base URL, e.g. a local stand-in server (default: $POLYGON_BASE_URL or api.polygon.io)')
+    parser.add_argument('--top', type=int, default=None, metavar='N',
+                        help='report only the N best strangles and prune the search against the N-th best so far')
+    parser.add_argument('--warm-start', action='store_true',
+                        help="with --top, start the bound at last run's N-th best (may drop results if the market moved)")
+    parser.add_argument('--deadline', type=float, default=None, metavar='SECONDS',
+                        help='finish within this many seconds: scan the most promising tickers first, '
+                             'cancel the rest when time runs out and write a partial report')
+    parser.add_argument('--scenarios', nargs='?', const=DEFAULT_SCENARIO_FILE, default=None, metavar='FILE',
+                        help='evaluate every chain under each scenario in FILE, one report per scenario '
+                             '(default FILE: scenarios.json; default: one scenario from filters.json)')
+    parser.add_argument('--run-id', default=None, metavar='ID',
+                        help='resume an interrupted run: skip tickers its journal already has (default: new run)')
+    parser.add_argument('--batch-size', type=int, default=64, metavar='N',
+                        help='tickers per batched pair search; 0 searches each ticker on its own (default: 64)')
+    parser.add_argument('--kernel-threads', type=int, default=0, metavar='N',
+                        help='native threads for the batched pair search (default: one per core)')
+    parser.add_argument('--archive', default=None, metavar='DIR',
+                        help="also store today's chains and underlying prices in DIR for backtest.py")
+    parser.add_argument('--memory-ceiling', type=float, default=None, metavar='MB',
+                        help='hold back new tickers while resident memory is above this (default: no limit)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record Python allocations (tracemalloc) at each stage; slows the run')
+    parser.add_argument('--profile', action='store_true',
+                        help='run under cProfile and write profile_output.prof')
+    return parser.parse_args(argv)
+
+def cli(argv=None):
+    # Console entry point.  Only argparse runs before the scan starts; aiohttp is imported
+    # lazily, when the first request is made.
+    args = parse_args(argv)
+
+    if args.profile:
         import cProfile
-        cProfile.run('run_async_main()', 'profile_output.prof')
+        profile_file = os.path.join(src_path, 'profile_output.prof')
+        cProfile.runctx('run_async_main(args)', globals(), {'args': args}, profile_file)
     else:
-        run_async_main()
+        run_async_main(args)
+
+if __name__ == "__main__":
+    cli()
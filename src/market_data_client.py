@@ -1,15 +1,22 @@
 # market_data_client.py
 
+from __future__ import annotations
+
 import os
+import time
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
-import requests
-import aiohttp
-import asyncio
+
+from chain_decoder import ACCEPT_ENCODING, ChainColumns, TransferStats, decompress, json_loads
+from ticker_metadata import short_company_name
+from request_policy import RETRYABLE_STATUSES, FetchError, FetchLog, RequestPolicy
+from lazy_imports import lazy_import
+
+# aiohttp loads on first use, not at startup
+aiohttp = lazy_import('aiohttp')
 
 # Configure basic logging.  show warning or higher for external modules.
 logging.basicConfig(
@@ -23,18 +30,141 @@ logger = logging.getLogger(__name__)
 # Show info level logger events for this module
 logger.setLevel(logging.INFO)
 
+# Polygon's REST API, unless pointed elsewhere (e.g. utility/polygon_standin.py for load tests)
+DEFAULT_BASE_URL = os.getenv("POLYGON_BASE_URL", "https://api.polygon.io")
+
 class MarketDataClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, policy: Optional[RequestPolicy] = None, base_url: Optional[str] = None):
 
         # store the api key 
         self.api_key = api_key
 
         # initialize base URLs for the various API endpoints
-        self.options_url = "https://api.polygon.io/v3/snapshot/options"
-        self.ticker_details_url = "https://api.polygon.io/v3/reference/tickers"
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.options_url = f"{self.base_url}/v3/snapshot/options"
+        self.ticker_details_url = f"{self.base_url}/v3/reference/tickers"
+        self.stock_snapshot_url = f"{self.base_url}/v2/snapshot/locale/us/markets/stocks/tickers"
+
+        # Wire versus decoded bytes for every options chain page
+        self.transfer_stats = TransferStats()
+
+        # Timeouts, retries and hedging for every request, with a record of what went wrong
+        self.policy = policy if policy is not None else RequestPolicy()
+        self.fetch_log = FetchLog()
+
+        # Pages returned and seconds spent holding a concurrency slot, per ticker (no time if retried)
+        self.chain_fetches: Dict[str, Tuple[int, Optional[float]]] = {}
+
+    def _session(self):
+        # Compression is negotiated explicitly and undone in chain_decoder.decompress
+        return aiohttp.ClientSession(auto_decompress=False, headers={'Accept-Encoding': ACCEPT_ENCODING})
+
+    async def _single_get(self, session, url: str, params: dict) -> Tuple[int, bytes, str]:
+        timeout = aiohttp.ClientTimeout(total=self.policy.request_timeout)
+        async with session.get(url, params=params, timeout=timeout) as response:
+            body = await response.read()
+            return response.status, body, response.headers.get('Content-Encoding', 'identity')
+
+    async def _hedged_get(self, session, url: str, params: dict) -> Tuple[int, bytes, str]:
+        if self.policy.hedge_after is None:
+            return await self._single_get(session, url, params)
+
+        primary = asyncio.ensure_future(self._single_get(session, url, params))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.policy.hedge_after)
+            if done:
+                return primary.result()
+
+            # Slow request in the latency tail: race a duplicate against it
+            self.fetch_log.hedged_requests += 1
+            hedge = asyncio.ensure_future(self._single_get(session, url, params))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.fetch_log.hedge_wins += 1
+                        return task.result()
+
+            # Both attempts failed; report the original's error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
 
-    async def get_options_chain(self, ticker: str, params: dict, semaphore=None) -> pd.DataFrame:
-        options_chain = []
+    async def _get(self, session, url: str, params: dict, ticker: str) -> Tuple[bytes, str]:
+        """
+        GET under the request policy: per-request timeout, jittered exponential retries for
+        retryable statuses and network errors, and optional hedging.  Returns the (still
+        encoded) body and its Content-Encoding, or raises FetchError.
+        """
+        attempt = 0
+        while True:
+            try:
+                status, body, encoding = await self._hedged_get(session, url, params)
+                if status == 200:
+                    return body, encoding
+                reason = f"status {status}"
+                if status not in RETRYABLE_STATUSES:
+                    raise FetchError(reason)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                reason = f"{type(e).__name__} {e}".strip()
+
+            if attempt >= self.policy.max_retries:
+                raise FetchError(f"{reason} (after {attempt} retries)")
+            attempt += 1
+            self.fetch_log.record_retry(ticker, reason)
+            await asyncio.sleep(self.policy.backoff(attempt))
+
+    async def get_stock_prices(self, tickers: List[str], semaphore=None) -> Dict[str, float]:
+        """
+        Latest underlying prices from the bulk stock snapshot, in one request.
+
+        The snapshot is fetched for the whole market (cheaper than a long ticker list in the
+        query string) and reduced to the requested tickers.  Returns an empty dict on failure.
+        """
+        wanted = set(tickers)
+        prices = {}
+        try:
+            async with semaphore:
+                async with self._session() as session:
+                    body, encoding = await self._get(
+                        session, self.stock_snapshot_url, {"apiKey": self.api_key}, 'stock snapshot'
+                    )
+            data = json_loads(decompress(body, encoding))
+        except Exception as e:
+            logger.warning(f"Warning: Error fetching stock snapshot: {e}")
+            return prices
+
+        for snapshot in data.get('tickers') or []:
+            ticker = snapshot.get('ticker')
+            if ticker not in wanted:
+                continue
+
+            # Prefer the last trade; fall back to today's and then yesterday's close
+            price = (
+                (snapshot.get('lastTrade') or {}).get('p') or
+                (snapshot.get('day') or {}).get('c') or
+                (snapshot.get('prevDay') or {}).get('c')
+            )
+            if price:
+                prices[ticker] = float(price)
+        return prices
+
+    async def get_options_chain(self, ticker: str, params: dict, semaphore=None,
+                                chain: Optional[ChainColumns] = None) -> Dict[str, np.ndarray]:
+        """
+        Download every page of a ticker's options snapshot into column arrays (see chain_decoder).
+
+        Compression is requested explicitly and undone here, so bytes on the wire are
+        counted in transfer_stats.  Returns an empty dict on failure or an empty chain.
+        Pass a (reset) buffer borrowed from a ChainBufferPool to reuse its columns; the
+        returned arrays are then views that stay valid until the buffer is returned.
+        """
+        if chain is None:
+            chain = ChainColumns()
         url = f"{self.options_url}/{ticker}"
         params['apiKey'] = self.api_key
         params['limit'] = 250  # Set a limit for pagination
@@ -42,50 +172,84 @@ class MarketDataClient:
         try:
             # Use the semaphore to limit concurrency
             async with semaphore:
-                async with aiohttp.ClientSession() as session:
-                    while url:  # Loop to handle pagination
-                        async with session.get(url, params=params) as response:
-                            if response.status == 200:
-                                data = await response.json()
-
-                                # Collect options data from 'results'
-                                if 'results' in data and data['results']:
-                                    options_chain.extend(data['results'])
-
-                                # Check for pagination (next_url)
-                                if data.get('next_url'):
-                                    url = f"{data.get('next_url')}&apiKey={self.api_key}"
-                                    params = {}  # Reset params if `next_url` already includes them
-                                else:
-                                    break  # No more pages
-                            else:
-                                logger.warning(f"Failed to fetch options chain for {ticker}. Status code: {response.status}")
-                                return pd.DataFrame()  # Return an empty DataFrame on failure
-
+                slot_start = time.perf_counter()
+                async with self._session() as session:
+                    await asyncio.wait_for(
+                        self._fetch_chain_pages(session, ticker, url, params, chain),
+                        timeout=self.policy.ticker_deadline
+                    )
+                # A retried fetch's time includes its backoff, so only its page count is kept
+                seconds = time.perf_counter() - slot_start
+                if ticker in self.fetch_log.retries:
+                    seconds = None
+                self.chain_fetches[ticker] = (chain.num_pages, seconds)
+        except asyncio.TimeoutError:
+            self.fetch_log.record_failure(ticker, f"ticker deadline of {self.policy.ticker_deadline:.0f} s exceeded")
+            return {}  # Return no columns on failure
+        except FetchError as e:
+            self.fetch_log.record_failure(ticker, str(e))
+            return {}
         except Exception as e:
-            logger.warning(f"Warning: Error fetching options chain for {ticker}: {e}")
-            return pd.DataFrame()  # Return an empty DataFrame on error
-        # Convert options_chain to pandas DataFrame
-        options_df = pd.DataFrame(options_chain)
-        return options_df
+            self.fetch_log.record_failure(ticker, f"error fetching options chain: {e}")
+            return {}  # Return no columns on error
+
+        if chain.num_contracts == 0:
+            return {}
+        return chain.to_arrays()
+
+    async def _fetch_chain_pages(self, session, ticker: str, url: str, params: dict, chain: ChainColumns) -> None:
+        while url:  # Loop to handle pagination
+            wire_body, encoding = await self._get(session, url, params, ticker)
+            body = decompress(wire_body, encoding)
+            self.transfer_stats.add(len(wire_body), len(body), encoding)
+
+            # Pull the needed fields into column buffers; the page itself is dropped, and
+            # so are its bodies, before the next page is requested
+            page = chain.add_page(body)
+            del wire_body, body
+
+            # Check for pagination (next_url)
+            if page.get('next_url'):
+                url = f"{page.get('next_url')}&apiKey={self.api_key}"
+                params = {}  # Reset params if `next_url` already includes them
+            else:
+                break  # No more pages
+
+    async def list_tickers(self, params: dict, semaphore=None) -> List[dict]:
+        """
+        Every result of a /v3/reference/tickers listing, following next_url pagination.
+        Raises FetchError if any page cannot be fetched, so a partial listing is never used.
+        """
+        results = []
+        url = self.ticker_details_url
+        params = dict(params, apiKey=self.api_key)
+        async with semaphore:
+            async with self._session() as session:
+                while url:
+                    body, encoding = await self._get(session, url, params, 'ticker listing')
+                    page = json_loads(decompress(body, encoding))
+                    results.extend(page.get('results') or [])
+                    if page.get('next_url'):
+                        url = f"{page['next_url']}&apiKey={self.api_key}"
+                        params = {}
+                    else:
+                        break
+        return results
 
     async def get_ticker_details(self, ticker: str, semaphore=None) -> Optional[str]:
         try:
             url = f"{self.ticker_details_url}/{ticker}"
             async with semaphore:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, params={"apiKey": self.api_key}) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            if 'results' in data and data['results'].get('name'):
-                                max_words = 3
-                                company_name = ' '.join(data['results']['name'].split()[:max_words])
-                                return company_name
-                            else:
-                                return f"({ticker})"
-                        else:
-                            logger.warning(f"Warning: Failed to fetch details for {ticker}. Status code: {response.status}")
-                            return f"({ticker})"
+                async with self._session() as session:
+                    body, encoding = await self._get(session, url, {"apiKey": self.api_key}, ticker)
+            data = json_loads(decompress(body, encoding))
+            if data.get('results') and data['results'].get('name'):
+                return short_company_name(data['results']['name'])
+            else:
+                return f"({ticker})"
+        except FetchError as e:
+            logger.warning(f"Warning: Failed to fetch details for {ticker}: {e}")
+            return f"({ticker})"
         except Exception as e:
             logger.warning(f"Warning: Could not fetch company name for {ticker}: {e}")
-            return ""
\ No newline at end of file
+            return ""
@@ -0,0 +1,183 @@
+# memory_budget.py
+
+import sys
+import gc
+import time
+import asyncio
+import logging
+import tracemalloc
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    # A kB field of /proc/self/status (Linux only), in MB
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024 / 1e6
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def _rusage_peak_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1e6 if sys.platform == 'darwin' else peak * 1024 / 1e6
+
+def current_rss_mb() -> float:
+    """Resident set size right now, in MB (falls back to the peak where /proc is unavailable)."""
+    rss = _proc_status_mb('VmRSS')
+    return _rusage_peak_mb() if rss is None else rss
+
+def peak_rss_mb() -> float:
+    """
+    Highest resident set size of this process so far, in MB.  Read from the same place as
+    current_rss_mb() where possible, and never less than it.
+    """
+    peak = _proc_status_mb('VmHWM')
+    if peak is None:
+        peak = _rusage_peak_mb()
+    return max(peak, current_rss_mb())
+
+class MemoryBudget:
+    """
+    Memory accounting for a run, and an optional ceiling that throttles intake.
+
+    stage(name) records resident and peak RSS at a stage boundary, plus the traced Python
+    heap and its largest allocation sites when tracing is on (tracemalloc slows the run,
+    so it is opt-in).  With a ceiling, admit() holds back new tickers while RSS is above
+    it; tickers already in flight keep going, and one is always let through when nothing
+    else is running, so the scan cannot stall.
+
+    Held-back tickers wait in one FIFO queue.  A single watcher task polls RSS for the
+    whole queue and releases it in order; it collects garbage once when the queue forms,
+    not once per ticker.
+    """
+
+    def __init__(self, ceiling_mb: Optional[float] = None, trace: bool = False,
+                 poll_interval: float = 0.05, top_sites: int = 5):
+        self.ceiling_mb = ceiling_mb
+        self.trace = trace
+        self.poll_interval = poll_interval
+        self.top_sites = top_sites
+        self.stages: List[dict] = []
+        self.in_flight = 0
+        self.num_throttled = 0
+        self.seconds_throttled = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._watcher: Optional[asyncio.Task] = None
+        self._rss_mb = 0.0
+        self._rss_time = -float('inf')
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name: str) -> dict:
+        record = {'stage': name, 'rss_mb': current_rss_mb(), 'peak_rss_mb': peak_rss_mb()}
+        if self.trace:
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            record['traced_mb'] = traced / 1e6
+            record['traced_peak_mb'] = traced_peak / 1e6
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:self.top_sites]
+            record['top_sites'] = [
+                (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size / 1e6)
+                for stat in statistics
+            ]
+            tracemalloc.reset_peak()
+        self.stages.append(record)
+        return record
+
+    def over_ceiling(self) -> bool:
+        if self.ceiling_mb is None:
+            return False
+        # RSS is sampled at most once per poll interval, however many tickers ask
+        now = time.monotonic()
+        if now - self._rss_time >= self.poll_interval:
+            self._rss_mb, self._rss_time = current_rss_mb(), now
+        return self._rss_mb > self.ceiling_mb
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold a new ticker back while memory is over the ceiling, then count it as in flight."""
+        if self._waiters or (self.in_flight > 0 and self.over_ceiling()):
+            # Queue behind tickers already held back, so they start in the order they arrived
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            if self._watcher is None:
+                self._watcher = asyncio.ensure_future(self._watch())
+            self.num_throttled += 1
+            wait_start = time.perf_counter()
+            try:
+                await waiter
+            finally:
+                self.seconds_throttled += time.perf_counter() - wait_start
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._release_next()
+
+    def _release_next(self) -> None:
+        # Let the longest-waiting ticker start (skipping any cancelled while waiting)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _watch(self) -> None:
+        # Free what can be freed once for this throttle episode, then release waiters in order
+        # while RSS is under the ceiling (or one at a time while nothing else is running)
+        try:
+            gc.collect()
+            while True:
+                while self._waiters and self._waiters[0].done():
+                    self._waiters.popleft()  # cancelled while waiting
+                if not self._waiters:
+                    break
+                if not self.over_ceiling():
+                    while self._waiters:
+                        self._release_next()
+                elif self.in_flight == 0:
+                    self._release_next()
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            self._watcher = None
+
+    def summary(self) -> str:
+        lines = [f"Memory by stage (peak RSS {peak_rss_mb():,.0f} MB):"]
+        for record in self.stages:
+            line = f"  {record['stage']:<20} RSS {record['rss_mb']:8,.1f} MB, peak {record['peak_rss_mb']:8,.1f} MB"
+            if 'traced_mb' in record:
+                line += f", Python heap {record['traced_mb']:,.1f} MB (stage peak {record['traced_peak_mb']:,.1f} MB)"
+            lines.append(line)
+            for site, size_mb in record.get('top_sites', []):
+                lines.append(f"      {size_mb:8,.2f} MB  {site}")
+        if self.ceiling_mb is not None:
+            lines.append(
+                f"  ceiling {self.ceiling_mb:,.0f} MB: {self.num_throttled:,} tickers held back "
+                f"for {self.seconds_throttled:.1f} s in total"
+            )
+        return '\n'.join(lines)
@@ -1,23 +1,16 @@
 # models.py
 
-import os  
-import sys
-from dataclasses import dataclass
-from typing import Optional, ClassVar
+from typing import Optional, ClassVar, Tuple, Iterable, Iterator, Union
 import logging
 import math
 import numpy as np
-from scipy.stats import norm
-from datetime import datetime, timedelta
 
+from expiry_calendar import ExpiryCalendar
+from lazy_imports import import_strangle_module
 
-# Add the cpp/build directory to the path for importing strangle_module
-src_path = os.path.dirname(os.path.abspath(__file__))
-cpp_build_path = os.path.join(src_path, "cpp/build")
-sys.path.append(cpp_build_path)
-
-# Import the C++ module
-import strangle_module
+# Import the C++ module (from cpp/build when present), or its NumPy counterpart without a build
+strangle_module = import_strangle_module()
+STRANGLE_BACKEND = getattr(strangle_module, 'BACKEND', 'native')
 
 # Configure basic logging.  show warning or higher for external modules.
 logging.basicConfig(
@@ -31,106 +24,319 @@ logger = logging.getLogger(__name__)
 # Show info level logger events for this module
 logger.setLevel(logging.INFO)
 
-@dataclass
 class Strangle:
-    ticker: str
-    company_name: str
-    stock_price: float
-    expiration_date_call: str
-    expiration_date_put: str
-    strike_price_call: float
-    strike_price_put: float
-    premium_call: float
-    premium_put: float
-    cost_call: float
-    cost_put: float
-    upper_breakeven: float
-    lower_breakeven: float
-    breakeven_difference: float
-    normalized_difference: float
-    implied_volatility: float
-    num_strangles_considered: int
-    escape_ratio: Optional[float] = None  
-    probability_of_profit: Optional[float] = None
-    expected_gain: Optional[float] = None  
-    call_contract: Optional[str] = None 
-    put_contract: Optional[str] = None  
-    total_in: Optional[float] = None
+    """
+    Lightweight row view into a StrangleSet.  Field access reads (and writes) the
+    underlying column arrays, so a view costs two slots regardless of field count.
+    """
+    __slots__ = ('_set', '_row')
 
     # Class variable for brokerage fee per contract
     brokerage_fee_per_contract: ClassVar[float] = 0.53 + 0.55 # Default value (adjust as needed)
 
-    def __post_init__(self):
-        # Build call and put contract tickers once
-        expiration_call = self.expiration_date_call[2:].replace("-", "")
-        expiration_put = self.expiration_date_put[2:].replace("-", "")
-        self.call_contract_ticker = f"O:{self.ticker}{expiration_call}C{int(self.strike_price_call * 1000):08}"
-        self.put_contract_ticker = f"O:{self.ticker}{expiration_put}P{int(self.strike_price_put * 1000):08}"
-
-    def calculate_escape_ratio(self) -> None:
-        # Use the C++ function from strangle_module to calculate the escape ratio
-        cpp_strangle = strangle_module.Strangle(
-            self.stock_price, self.upper_breakeven, self.lower_breakeven
-        )
-        self.escape_ratio = cpp_strangle.calculate_escape_ratio()
+    def __init__(self, strangle_set: 'StrangleSet', row: int):
+        self._set = strangle_set
+        self._row = row
+
+    def __repr__(self) -> str:
+        return f"Strangle({self.as_dict()})"
+
+    @property
+    def expiration_date_call(self) -> str:
+        return self._set.calendar.date_string(self._set.expiration_call[self._row])
+
+    @property
+    def expiration_date_put(self) -> str:
+        return self._set.calendar.date_string(self._set.expiration_put[self._row])
+
+    @property
+    def cost_call(self) -> float:
+        return self.premium_call * 100.0
+
+    @property
+    def cost_put(self) -> float:
+        return self.premium_put * 100.0
+
+    @property
+    def seconds_to_expiration(self) -> int:
+        # Earliest expiration, measured to the 4:00 PM ET close on the run's clock
+        expiration = min(self._set.expiration_call[self._row], self._set.expiration_put[self._row])
+        return int(self._set.calendar.seconds_for([expiration])[0])
+
+    @property
+    def call_contract_ticker(self) -> str:
+        # Built on demand; most strangles never need their OCC symbols
+        expiration_call = self._set.calendar.occ_code(self._set.expiration_call[self._row])
+        return f"O:{self.ticker}{expiration_call}C{int(self.strike_price_call * 1000):08}"
+
+    @property
+    def put_contract_ticker(self) -> str:
+        expiration_put = self._set.calendar.occ_code(self._set.expiration_put[self._row])
+        return f"O:{self.ticker}{expiration_put}P{int(self.strike_price_put * 1000):08}"
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in StrangleSet.record_fields}
+
+def _column_property(name: str, optional: bool) -> property:
+    # Reads convert to Python scalars; missing optional values are stored as NaN and read as None
+    def getter(self):
+        value = self._set.columns[name][self._row]
+        if isinstance(value, np.floating):
+            value = float(value)
+            if optional and math.isnan(value):
+                return None
+        elif isinstance(value, np.integer):
+            value = int(value)
+        return value
+
+    def setter(self, value):
+        self._set.columns[name][self._row] = np.nan if value is None else value
+
+    return property(getter, setter)
+
+# Columns results can be ranked by, and whether a larger value ranks higher
+RANKING_KEYS = {
+    'normalized_difference': False,
+    'probability_of_profit': True,
+    'expected_gain': True,
+    'escape_ratio': True,
+}
+
+class StrangleSet:
+    """
+    Struct-of-arrays container for strangle results, one NumPy column per field.
+
+    Expirations are stored as ExpiryCalendar day indices, so filtering, sorting and the
+    analytics all run over whole arrays.  Iterating or indexing yields Strangle row views.
+    """
+
+    # (column, dtype, optional).  Optional float columns use NaN for "not computed".
+    column_specs: ClassVar[Tuple] = (
+        ('ticker', object, False),
+        ('company_name', object, False),
+        ('stock_price', np.float64, False),
+        ('expiration_call', np.int32, False),
+        ('expiration_put', np.int32, False),
+        ('strike_price_call', np.float64, False),
+        ('strike_price_put', np.float64, False),
+        ('premium_call', np.float64, False),
+        ('premium_put', np.float64, False),
+        ('upper_breakeven', np.float64, False),
+        ('lower_breakeven', np.float64, False),
+        ('breakeven_difference', np.float64, False),
+        ('normalized_difference', np.float64, False),
+        ('implied_volatility', np.float64, False),
+        ('num_strangles_considered', np.int64, False),
+        ('escape_ratio', np.float64, True),
+        ('probability_of_profit', np.float64, True),
+        ('expected_gain', np.float64, True),
+        ('total_in', np.float64, True),
+        # Net greeks of the position (one call plus one put), per share
+        ('delta', np.float64, True),
+        ('gamma', np.float64, True),
+        ('vega', np.float64, True),
+        ('theta', np.float64, True),
+    )
+
+    # Field names as seen on a Strangle row (for dict/record export)
+    record_fields: ClassVar[Tuple[str, ...]] = (
+        'ticker', 'company_name', 'stock_price', 'expiration_date_call', 'expiration_date_put',
+        'strike_price_call', 'strike_price_put', 'premium_call', 'premium_put', 'cost_call',
+        'cost_put', 'upper_breakeven', 'lower_breakeven', 'breakeven_difference',
+        'normalized_difference', 'implied_volatility', 'num_strangles_considered',
+        'escape_ratio', 'probability_of_profit', 'expected_gain', 'total_in',
+        'delta', 'gamma', 'vega', 'theta',
+    )
+
+    def __init__(self, calendar: ExpiryCalendar, capacity: int = 64):
+        self.calendar = calendar
+        self._size = 0
+        self._capacity = max(int(capacity), 1)
+        self._columns = {
+            name: self._empty_column(dtype, optional, self._capacity)
+            for name, dtype, optional in self.column_specs
+        }
+
+    @staticmethod
+    def _empty_column(dtype, optional: bool, length: int) -> np.ndarray:
+        if optional:
+            return np.full(length, np.nan, dtype=dtype)
+        return np.empty(length, dtype=dtype)
 
-    def calculate_probability_of_profit(self) -> None:
+    @property
+    def columns(self) -> dict:
+        """Column arrays trimmed to the number of stored rows (views, not copies)."""
+        return {name: column[:self._size] for name, column in self._columns.items()}
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Column access as attributes, e.g. strangles.normalized_difference
+        columns = self.__dict__.get('_columns')
+        if columns is not None and name in columns:
+            return columns[name][:self._size]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Strangle]:
+        for row in range(self._size):
+            yield Strangle(self, row)
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]) -> Union[Strangle, 'StrangleSet']:
+        if isinstance(key, (int, np.integer)):
+            row = int(key)
+            if row < 0:
+                row += self._size
+            if not 0 <= row < self._size:
+                raise IndexError("StrangleSet index out of range")
+            return Strangle(self, row)
+        return self.take(np.arange(self._size)[key])
+
+    def append(self, **fields) -> Strangle:
+        """Add one strangle (Strangle field names, ISO expiration dates) and return its row view."""
+        if self._size == self._capacity:
+            self._grow(2 * self._capacity)
+        row = self._size
+        self._size += 1
+
+        # Derived fields (costs) are not stored
+        fields.pop('cost_call', None)
+        fields.pop('cost_put', None)
+        fields['expiration_call'] = self.calendar.day_index(fields.pop('expiration_date_call'))
+        fields['expiration_put'] = self.calendar.day_index(fields.pop('expiration_date_put'))
+
+        for name, dtype, optional in self.column_specs:
+            value = fields.get(name)
+            self._columns[name][row] = np.nan if (optional and value is None) else value
+        return Strangle(self, row)
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.append(**record)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], calendar: ExpiryCalendar) -> 'StrangleSet':
+        records = list(records)
+        strangle_set = cls(calendar, capacity=len(records))
+        strangle_set.extend(records)
+        return strangle_set
+
+    def _grow(self, capacity: int) -> None:
+        for name, dtype, optional in self.column_specs:
+            column = self._empty_column(dtype, optional, capacity)
+            column[:self._size] = self._columns[name][:self._size]
+            self._columns[name] = column
+        self._capacity = capacity
+
+    def take(self, indices: np.ndarray) -> 'StrangleSet':
+        """New set holding the given rows, in the given order."""
+        indices = np.asarray(indices, dtype=np.intp)
+        subset = StrangleSet(self.calendar, capacity=len(indices))
+        for name in self._columns:
+            subset._columns[name][:len(indices)] = self._columns[name][:self._size][indices]
+        subset._size = len(indices)
+        return subset
+
+    def filter(self, mask: np.ndarray) -> 'StrangleSet':
+        """New set holding the rows where mask is True."""
+        return self.take(np.flatnonzero(mask))
+
+    def sorted(self, by: str = 'normalized_difference') -> 'StrangleSet':
         """
-        Calculates the Probability of Profit (POP) for the strangle strategy, incorporating brokerage fees.
-        
-        Estimates the likelihood that the strangle will reach a profitable position at expiration,
-        based on implied volatility (IV), current stock price, expiration date, both breakeven points.
+        Rows ordered by normalized difference (ascending), then probability of profit
+        (descending); or best first by another of the RANKING_KEYS, ties broken by
+        normalized difference.  Missing values sort last.
         """
-        # Use the earliest expiration date and set it to market close time (4:00 PM ET)
-        expiration_date_str = min(self.expiration_date_call, self.expiration_date_put)
-        expiration_date = datetime.strptime(expiration_date_str, '%Y-%m-%d')
-        market_close_time = datetime(
-            expiration_date.year, expiration_date.month, expiration_date.day, 16, 0
-        )
-        expiration_datetime_utc = market_close_time - timedelta(hours=5)  # Convert 4 PM ET to UTC
+        if by == 'normalized_difference':
+            order = np.lexsort((-self.probability_of_profit, self.normalized_difference))
+        else:
+            key = getattr(self, by)
+            order = np.lexsort((self.normalized_difference, -key if RANKING_KEYS[by] else key))
+        return self.take(order)
+
+    def expiration_dates(self, column: str) -> np.ndarray:
+        """ISO date strings for an expiration column, decoding each distinct day only once."""
+        unique_days, inverse = np.unique(getattr(self, column), return_inverse=True)
+        date_strings = np.array([self.calendar.date_string(day) for day in unique_days], dtype=object)
+        return date_strings[inverse]
 
-        # Calculate seconds to expiration from the current UTC time
-        today = datetime.utcnow()  # Use UTC for consistency
-        seconds_to_expiration = int((expiration_datetime_utc - today).total_seconds())
+    def seconds_to_expiration(self) -> np.ndarray:
+        """Seconds to the earliest expiration of each strangle, from the calendar's as-of clock."""
+        earliest = np.minimum(self.expiration_call, self.expiration_put)
+        return self.calendar.seconds_for(earliest)
 
-        # Use the C++ function to calculate probability of profit
-        self.probability_of_profit = strangle_module.Strangle.calculate_probability_of_profit(
+    def calculate_analytics(self) -> None:
+        """Fill escape ratio, probability of profit and expected gain for every row at once."""
+        if self._size == 0:
+            return
+        escape_ratio, probability_of_profit, expected_gain = calculate_analytics(
             self.stock_price, self.upper_breakeven, self.lower_breakeven,
-            self.implied_volatility, seconds_to_expiration
+            self.strike_price_call, self.strike_price_put,
+            self.premium_call, self.premium_put,
+            self.implied_volatility, self.seconds_to_expiration()
         )
+        self.escape_ratio[:] = escape_ratio
+        self.probability_of_profit[:] = probability_of_profit
+        self.expected_gain[:] = expected_gain
 
-    def calculate_expected_gain(self) -> None:
-        """
-        Calculates the expected gain of the strangle by analytically computing the payoffs for both the 
-        call and put options, weighted by their probabilities under a log-normal stock price distribution 
-        at expiration.
-        """
+# Expose each stored column as a read/write attribute on the row view
+for _name, _dtype, _optional in StrangleSet.column_specs:
+    if _name not in ('expiration_call', 'expiration_put'):
+        setattr(Strangle, _name, _column_property(_name, _optional))
 
-        # Use the earliest expiration date at 4:00 PM ET
-        expiration_date_str = min(self.expiration_date_call, self.expiration_date_put)
-        expiration_date = datetime.strptime(expiration_date_str, '%Y-%m-%d')
-        market_close_time = datetime(
-            expiration_date.year, expiration_date.month, expiration_date.day, 16, 0
-        )
-        expiration_datetime_utc = market_close_time - timedelta(hours=5)  # Convert 4 PM ET to UTC
-
-        # Calculate seconds to expiration
-        today = datetime.utcnow()  # Use UTC for consistency
-        seconds_to_expiration = int((expiration_datetime_utc - today).total_seconds())
-
-        # Sum the premiums and brokerage fees per share
-        total_premium_per_share = float(self.premium_call + self.premium_put)
-        total_brokerage_fees_per_share = float((self.brokerage_fee_per_contract * 2) / 100)  # Convert to per share
-
-        # Ensure all parameters are explicitly cast to float as needed
-        stock_price = float(self.stock_price)
-        strike_price_call = float(self.strike_price_call)
-        strike_price_put = float(self.strike_price_put)
-        implied_volatility = float(self.implied_volatility)
-
-        # Call the C++ function to calculate the expected gain
-        self.expected_gain = strangle_module.Strangle.calculate_expected_gain(
-            stock_price, strike_price_call, strike_price_put,
-            implied_volatility, seconds_to_expiration,
-            total_premium_per_share, total_brokerage_fees_per_share
-        )
\ No newline at end of file
+def calculate_analytics(
+    stock_price: np.ndarray,
+    upper_breakeven: np.ndarray,
+    lower_breakeven: np.ndarray,
+    strike_price_call: np.ndarray,
+    strike_price_put: np.ndarray,
+    premium_call: np.ndarray,
+    premium_put: np.ndarray,
+    implied_volatility: np.ndarray,
+    seconds_to_expiration: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batch version of the Strangle analytics.  Every argument is an array with one element per
+    strangle (seconds_to_expiration from ExpiryCalendar.seconds_for).  Returns the escape ratio,
+    probability of profit and expected gain arrays.
+    """
+    brokerage_fees_per_share = (Strangle.brokerage_fee_per_contract * 2) / 100
+    escape_ratio = strangle_module.escape_ratio(stock_price, upper_breakeven, lower_breakeven)
+    probability_of_profit = strangle_module.probability_of_profit(
+        stock_price, upper_breakeven, lower_breakeven,
+        implied_volatility, seconds_to_expiration
+    )
+    expected_gain = strangle_module.expected_gain(
+        stock_price, strike_price_call, strike_price_put,
+        implied_volatility, seconds_to_expiration,
+        np.asarray(premium_call) + np.asarray(premium_put), brokerage_fees_per_share
+    )
+    return escape_ratio, probability_of_profit, expected_gain
+
+def solve_implied_volatility(
+    premium: np.ndarray,
+    stock_price: np.ndarray,
+    strike_price: np.ndarray,
+    seconds_to_expiration: np.ndarray,
+    is_call: np.ndarray,
+) -> np.ndarray:
+    """
+    Implied volatility of each contract from its premium (Black-Scholes, on the same clock as
+    the analytics).  NaN where no volatility explains the premium.
+    """
+    arrays = np.broadcast_arrays(premium, stock_price, strike_price, seconds_to_expiration, is_call)
+    return strangle_module.implied_volatility(*arrays)
+
+def calculate_greeks(
+    stock_price: np.ndarray,
+    strike_price: np.ndarray,
+    implied_volatility: np.ndarray,
+    seconds_to_expiration: np.ndarray,
+    is_call: np.ndarray,
+) -> dict:
+    """
+    Per-share delta, gamma, vega (per volatility point) and theta (per calendar day) of each
+    contract, as a dict of arrays.  NaN where an input is missing.
+    """
+    arrays = np.broadcast_arrays(stock_price, strike_price, implied_volatility, seconds_to_expiration, is_call)
+    return strangle_module.greeks(*arrays)
@@ -0,0 +1,127 @@
+# pair_search.py
+
+import math
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from models import strangle_module
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+class PairSearchBatcher:
+    """
+    Gathers tickers' filtered contracts and searches them together with one
+    find_min_spread_batch call instead of one find_min_spread call per ticker.
+
+    A batch goes out once max_batch tickers are waiting, or max_delay seconds after the
+    first of them arrived.  The kernel spreads a batch over its own native threads
+    (num_threads, 0: one per core) with the GIL released, on a background thread, so the
+    event loop keeps downloading chains meanwhile.  Batches run one at a time.
+    """
+
+    def __init__(self, max_batch: int = 64, max_delay: float = 0.01, num_threads: int = 0):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.num_threads = num_threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pair-search')
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: set = set()
+
+        # Kernel accounting
+        self.num_batches = 0
+        self.num_tickers = 0
+        self.seconds = 0.0
+
+    async def search(self, call_premium: np.ndarray, call_strike: np.ndarray,
+                     put_premium: np.ndarray, put_strike: np.ndarray,
+                     max_normalized_difference: float = math.inf) -> Optional[dict]:
+        """
+        One ticker's winning pair: positions of the call and the put in the arrays given,
+        with the combination's costs, breakevens and normalized difference.  None when no
+        pair beats max_normalized_difference.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((call_premium, call_strike, put_premium, put_strike, max_normalized_difference, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: List[tuple]) -> None:
+        call_offsets = np.zeros(len(batch) + 1, dtype=np.int64)
+        put_offsets = np.zeros(len(batch) + 1, dtype=np.int64)
+        np.cumsum([len(item[0]) for item in batch], out=call_offsets[1:])
+        np.cumsum([len(item[2]) for item in batch], out=put_offsets[1:])
+        arguments = (
+            np.concatenate([item[0] for item in batch]).astype(np.float64, copy=False),
+            np.concatenate([item[1] for item in batch]).astype(np.float64, copy=False),
+            call_offsets,
+            np.concatenate([item[2] for item in batch]).astype(np.float64, copy=False),
+            np.concatenate([item[3] for item in batch]).astype(np.float64, copy=False),
+            put_offsets,
+            np.array([item[4] for item in batch], dtype=np.float64),
+            self.num_threads,
+        )
+
+        start = time.perf_counter()
+        try:
+            winners = await asyncio.get_running_loop().run_in_executor(
+                self._executor, strangle_module.find_min_spread_batch, *arguments
+            )
+        except Exception as error:
+            for item in batch:
+                if not item[-1].done():
+                    item[-1].set_exception(error)
+            return
+        self.seconds += time.perf_counter() - start
+        self.num_batches += 1
+        self.num_tickers += len(batch)
+
+        for t, item in enumerate(batch):
+            future = item[-1]
+            if future.done():  # the ticker was cancelled while it waited
+                continue
+            if winners['call_index'][t] < 0:
+                future.set_result(None)
+            else:
+                future.set_result({name: values[t].item() for name, values in winners.items()})
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def summary(self) -> str:
+        if not self.num_batches:
+            return "Batched pair search: no batches"
+        return (
+            f"Batched pair search ({strangle_module.batch_instruction_set()}): {self.num_tickers:,} tickers "
+            f"in {self.num_batches:,} batches (mean {self.num_tickers / self.num_batches:.1f}), "
+            f"{self.seconds:.2f} s in the kernel"
+        )
@@ -0,0 +1,171 @@
+# price_history.py
+
+import math
+import logging
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Bucket widths of the downsampled levels (seconds), buckets kept per level, and the
+# most points a series is drawn with.  200 buckets of 2 minutes cover a trading day;
+# of 15 minutes, about a week.
+BUCKET_SECONDS = (5, 30, 120, 900)
+BUCKETS_PER_LEVEL = 200
+MAX_POINTS = 2 * BUCKETS_PER_LEVEL
+
+class _Level:
+    """
+    Lowest and highest price (and when each happened) in consecutive buckets of one width,
+    for the newest `size` buckets that had any trades.
+    """
+
+    def __init__(self, bucket_ms: float, size: int):
+        self.bucket_ms = bucket_ms
+        self.bucket = np.zeros(size, dtype=np.int64)  # bucket number, time // bucket_ms
+        self.low = np.zeros(size)
+        self.low_time = np.zeros(size)
+        self.high = np.zeros(size)
+        self.high_time = np.zeros(size)
+        self._next = 0
+        self.count = 0  # buckets ever opened
+
+    @property
+    def size(self) -> int:
+        return len(self.bucket)
+
+    def add(self, timestamp_ms: float, price: float) -> None:
+        bucket = int(timestamp_ms // self.bucket_ms)
+        last = self._next - 1
+        if self.count and bucket == self.bucket[last]:
+            if price < self.low[last]:
+                self.low[last], self.low_time[last] = price, timestamp_ms
+            if price > self.high[last]:
+                self.high[last], self.high_time[last] = price, timestamp_ms
+            return
+
+        # A new bucket replaces the oldest one
+        i = self._next
+        self.bucket[i] = bucket
+        self.low[i] = self.high[i] = price
+        self.low_time[i] = self.high_time[i] = timestamp_ms
+        self._next = (i + 1) % self.size
+        self.count += 1
+
+    def order(self) -> np.ndarray:
+        # Slots from oldest to newest bucket
+        if self.count < self.size:
+            return np.arange(self.count)
+        return np.roll(np.arange(self.size), -self._next)
+
+    def points(self, max_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Each of the newest `max_buckets` buckets as its low and high, in the order they happened."""
+        slots = self.order()[-max_buckets:]
+        low_first = self.low_time[slots] <= self.high_time[slots]
+        times = np.empty((len(slots), 2))
+        prices = np.empty((len(slots), 2))
+        times[:, 0] = np.where(low_first, self.low_time[slots], self.high_time[slots])
+        times[:, 1] = np.where(low_first, self.high_time[slots], self.low_time[slots])
+        prices[:, 0] = np.where(low_first, self.low[slots], self.high[slots])
+        prices[:, 1] = np.where(low_first, self.high[slots], self.low[slots])
+
+        # A bucket with a single trade is one point, not two
+        keep = np.ones((len(slots), 2), dtype=bool)
+        keep[:, 1] = times[:, 1] != times[:, 0]
+        return times[keep], prices[keep]
+
+class PriceHistory:
+    """
+    Timestamped prices of one ticker in fixed-size ring buffers: the newest `size` trades as
+    they came, plus min/max buckets at each of `bucket_seconds`.  Appending is O(1) and the
+    memory is fixed up front, however long the session runs.
+
+    series() gives at most `max_points` points for drawing: the raw trades while there are
+    few enough, otherwise the finest level whose buckets cover the whole history.  Keeping
+    each bucket's low and high means spikes survive the downsampling.
+    """
+
+    def __init__(self, size: int = 1024, bucket_seconds: Iterable[float] = BUCKET_SECONDS,
+                 buckets: int = BUCKETS_PER_LEVEL):
+        self.time = np.zeros(size)
+        self.price = np.zeros(size)
+        self._next = 0
+        self.count = 0  # prices ever appended
+        self.last_time = -math.inf
+        self.levels = [_Level(1000.0 * seconds, buckets) for seconds in bucket_seconds]
+
+    def __len__(self) -> int:
+        return min(self.count, len(self.time))
+
+    def append(self, timestamp_ms: float, price: float) -> None:
+        # Trades can arrive slightly out of order; keep the history monotonic
+        timestamp_ms = max(float(timestamp_ms), self.last_time)
+        self.last_time = timestamp_ms
+        self.time[self._next] = timestamp_ms
+        self.price[self._next] = price
+        self._next = (self._next + 1) % len(self.time)
+        self.count += 1
+        for level in self.levels:
+            level.add(timestamp_ms, price)
+
+    def raw(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The newest trades, oldest first."""
+        if self.count < len(self.time):
+            return self.time[:self.count].copy(), self.price[:self.count].copy()
+        order = np.roll(np.arange(len(self.time)), -self._next)
+        return self.time[order], self.price[order]
+
+    def series(self, max_points: int = MAX_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+        if self.count <= min(len(self.time), max_points):
+            return self.raw()
+        for level in self.levels:
+            if level.count <= level.size and 2 * level.count <= max_points:
+                return level.points(level.count)
+
+        # Longer than every level: the coarsest one's newest buckets
+        return self.levels[-1].points(max_points // 2)
+
+    @property
+    def nbytes(self) -> int:
+        return self.time.nbytes + self.price.nbytes + sum(
+            level.bucket.nbytes + level.low.nbytes + level.low_time.nbytes + level.high.nbytes +
+            level.high_time.nbytes for level in self.levels
+        )
+
+class PriceHistoryBook:
+    """One PriceHistory per ticker, all sized alike."""
+
+    def __init__(self, tickers: Iterable[str], size: int = 1024):
+        self.histories: Dict[str, PriceHistory] = {ticker: PriceHistory(size) for ticker in tickers}
+
+    def append(self, ticker: str, timestamp_ms: float, price: float) -> None:
+        history = self.histories.get(ticker)
+        if history is not None:
+            history.append(timestamp_ms, price)
+
+    def series(self, tickers: Iterable[str] = None, max_points: int = MAX_POINTS) -> Dict[str, dict]:
+        # JSON-ready {'t': [ms...], 'p': [price...]} per ticker
+        tickers = self.histories if tickers is None else [t for t in tickers if t in self.histories]
+        series = {}
+        for ticker in tickers:
+            times, prices = self.histories[ticker].series(max_points)
+            series[ticker] = {'t': np.round(times).astype(np.int64).tolist(), 'p': prices.tolist()}
+        return series
+
+    def stats(self) -> dict:
+        return {
+            'tickers': len(self.histories),
+            'prices': sum(history.count for history in self.histories.values()),
+            'kb': round(sum(history.nbytes for history in self.histories.values()) / 1024, 1),
+        }
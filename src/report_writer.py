@@ -1,14 +1,19 @@
 # report_writer.py
 
 import os
-import logging
 import csv 
+import gzip
+import html
+import json
+import base64
+import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import Optional
 
-from bs4 import BeautifulSoup
+import numpy as np
 
-from models import Strangle
+from models import StrangleSet
+from scenarios import Scenario
 
 # Configure basic logging.  show warning or higher for external modules.
 logging.basicConfig(
@@ -22,12 +27,17 @@ logger = logging.getLogger(__name__)
 # Show info level logger events for this module
 logger.setLevel(logging.INFO)
 
+# Reports (and their template) live in html/ at the top of the repository, wherever the scan is run from
+REPORT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'html', '')
+
 class ReportWriter:
-    def __init__(self, results: List[Strangle], execution_details: dict):
+    def __init__(self, results: StrangleSet, execution_details: dict, scenario: Optional[Scenario] = None,
+                 suffix: Optional[str] = None):
         self.results = results  # Assign the results to the instance
+        self.scenario = scenario
         
         # If the report directory doesn't exist, create it
-        self.report_directory = '../html/'
+        self.report_directory = REPORT_DIRECTORY
         try:
             os.makedirs(self.report_directory, exist_ok=True)
         except OSError as e:
@@ -38,12 +48,18 @@ class ReportWriter:
         # stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         # self.base_filename = f'{self.report_directory}edgewalker_report_{stamp}'
         self.base_filename = f'{self.report_directory}edgewalker_report'
+        if suffix:
+            # One report per scenario when a scan evaluates several
+            self.base_filename += f'_{suffix}'
 
         # Extract execution details
         self.num_tickers_processed = execution_details.get('num_tickers_processed')
         self.num_strangles_considered = execution_details.get('num_strangles_considered')
         self.execution_time = execution_details.get('execution_time')
         self.execution_time_per_ticker = execution_details.get('execution_time_per_ticker')
+        self.failed_tickers = execution_details.get('failed_tickers', [])
+        self.num_tickers_retried = execution_details.get('num_tickers_retried', 0)
+        self.partial = execution_details.get('partial')
 
         # Clean the results (filter and sort)
         self.clean_results()
@@ -53,57 +69,52 @@ class ReportWriter:
 
     def clean_results(self):
         """Filter and sort the results by normalized difference and profitability probability."""
-        filtered_results = [
-            x for x in self.results
-            if (
-                x.normalized_difference is not None and
-                x.probability_of_profit is not None
-            )
-        ]
-        sorted_results = sorted(
-            filtered_results,
-            key=lambda x: (
-                x.normalized_difference,   # First priority (ascending)
-                -x.probability_of_profit # second priority (descending)
-            )
+        filtered_results = self.results.filter(
+            ~np.isnan(self.results.normalized_difference) &
+            ~np.isnan(self.results.probability_of_profit)
         )
-        self.results = sorted_results
-
-    def generate_html_table(self, strangle: Strangle, position: int) -> Optional[str]:
-        # Check if any of the required fields are None
-        required_fields = [
-            'company_name', 'ticker', 'stock_price', 'normalized_difference',
-            'escape_ratio', 'probability_of_profit', 'cost_call', 'cost_put',
-            'num_strangles_considered', 'expiration_date_call', 'strike_price_call',
-            'cost_call', 'expiration_date_put', 'strike_price_put', 'cost_put',
-            'upper_breakeven', 'lower_breakeven', 'breakeven_difference'
-        ]
 
-        if any(getattr(strangle, field) is None for field in required_fields):
-            return None  # Skip this strangle if any required value is None
-
-        # Generate the result card for the HTML report
-        return ''.join([
-            f'<div class="panel" data-position="{position}">',
-            f'{strangle.company_name} ({strangle.ticker}): ${strangle.stock_price:.2f}<br>',
-            f'Normalized Breakeven Difference: {strangle.normalized_difference:.3f}<br>',
-            f'Implied Volatility: {strangle.implied_volatility:.3f}<br>',
-            f'Probability of Profit: {strangle.probability_of_profit:.3f}<br>',
-            f'Expected Gain: {strangle.expected_gain/(strangle.cost_call + strangle.cost_put):.3f}<br>'
-            f'Escape ratio: {strangle.escape_ratio:.3f}<br>',
-            f'Cost of strangle: ${strangle.cost_call + strangle.cost_put:.2f}<br>',
-            f'Contract pairs tried: {strangle.num_strangles_considered:,}<br>',
-            f'Call expiration: {strangle.expiration_date_call}<br>',
-            f'Call strike: ${strangle.strike_price_call:.2f}<br>',
-            f'Call premium: ${strangle.premium_call:.2f}<br>',
-            f'Put expiration: {strangle.expiration_date_put}<br>',
-            f'Put strike: ${strangle.strike_price_put:.2f}<br>',
-            f'Put premium: ${strangle.premium_put:.2f}<br>',
-            f'Upper breakeven: ${strangle.upper_breakeven:.3f}<br>',
-            f'Lower breakeven: ${strangle.lower_breakeven:.3f}<br>',
-            f'Breakeven difference: ${strangle.breakeven_difference:.3f}',
-            '</div>'
-        ])
+        # normalized difference first priority (ascending), probability of profit second (descending),
+        # unless the scenario ranks by something else
+        self.results = filtered_results.sorted(self.scenario.rank_by if self.scenario is not None else 'normalized_difference')
+
+    # Columns shipped to the browser, and the significant digits kept for floating-point ones
+    report_columns = [
+        'company_name', 'ticker', 'stock_price', 'normalized_difference', 'implied_volatility',
+        'probability_of_profit', 'expected_gain', 'escape_ratio', 'num_strangles_considered',
+        'expiration_date_call', 'strike_price_call', 'premium_call',
+        'expiration_date_put', 'strike_price_put', 'premium_put',
+        'upper_breakeven', 'lower_breakeven', 'breakeven_difference',
+        'delta', 'gamma', 'vega', 'theta',
+    ]
+    significant_digits = 8
+
+    def report_payload(self) -> str:
+        """
+        The results as compact JSON (one array per column), gzip-compressed and base64-encoded
+        for embedding in the report.  Rows missing any displayed value are left out.
+        """
+        results = self.results
+        complete = np.array([name is not None for name in results.company_name.tolist()], dtype=bool)
+        for name in ('escape_ratio', 'probability_of_profit', 'expected_gain'):
+            complete &= ~np.isnan(getattr(results, name))
+        results = results.filter(complete)
+
+        columns = {}
+        for name in self.report_columns:
+            if name in ('expiration_date_call', 'expiration_date_put'):
+                values = results.expiration_dates(name.replace('_date', ''))
+            else:
+                values = getattr(results, name)
+            if values.dtype.kind == 'f':
+                # Shorter numbers compress better; JSON has no NaN, so an unknown number is sent as null
+                digits = self.significant_digits
+                columns[name] = [None if v != v else float(f'{v:.{digits}g}') for v in values.tolist()]
+            else:
+                columns[name] = values.tolist()
+
+        payload = json.dumps({'num_rows': len(results), 'columns': columns}, separators=(',', ':'))
+        return base64.b64encode(gzip.compress(payload.encode(), compresslevel=9)).decode('ascii')
 
     def write_html(self) -> None:
         # Try to read the template file and handle the case where the file is not found
@@ -111,7 +122,7 @@ class ReportWriter:
         template_file = f'{self.report_directory}template_report.html'
         try:
             with open(template_file, 'r') as file:
-                soup = BeautifulSoup(file, 'html.parser')
+                template = file.read()
         except FileNotFoundError:
             logger.error(f"Error: Template file '{template_file}' not found. Aborting report generation.")
             return  # Exit the function if the template file is not found
@@ -124,42 +135,41 @@ class ReportWriter:
             f'({self.execution_time_per_ticker*1000:.2f} ms per ticker)'
         )
 
-        # Find the header text and insert the content
-        header_div = soup.find("div", {"class": "header-text"})
-        if header_div:
-            header_div.clear()  # Clear any existing content
-            header_div.append(BeautifulSoup(header_panel, 'html.parser'))
-
-        # Generate all the HTML content
-        all_results = [
-            result_html for idx, result in enumerate(self.results)
-            if (result_html := self.generate_html_table(result, idx + 1)) is not None
-        ]
-
-        # Find the grid container
-        grid_container = soup.find("div", class_="grid-container")
-
-        # Replace or add panels
-        for idx, result in enumerate(all_results):
-            data_position = idx + 1  # Data positions for panels are 1-indexed
-            panel = grid_container.find("div", {"data-position": str(data_position)})
+        # Make any data loss visible: tickers that failed after retries are listed by name
+        if self.failed_tickers or self.num_tickers_retried:
+            header_panel += f'. {self.num_tickers_retried:,} tickers needed retries'
+            if self.failed_tickers:
+                shown = ', '.join(self.failed_tickers[:20])
+                more = f' and {len(self.failed_tickers) - 20:,} more' if len(self.failed_tickers) > 20 else ''
+                header_panel += f'; {len(self.failed_tickers):,} failed ({shown}{more})'
+
+        # A deadline run that stopped early says so up front
+        if self.partial:
+            header_panel += (
+                f'. PARTIAL RESULTS: the {self.partial["deadline"]:.0f} s deadline stopped the scan after '
+                f'{self.partial["num_tickers_processed"]:,} of {self.partial["num_tickers"]:,} tickers'
+            )
 
-            # If the panel exists, replace its content
-            if panel:
-                new_content = BeautifulSoup(result, 'html.parser').div.decode_contents()  # Extract inner content
-                panel.clear()  # Clear any existing content
-                panel.append(BeautifulSoup(new_content, 'html.parser'))  # Insert the new content
-            else:
-                # Create a new panel if it doesn't exist
-                new_panel = soup.new_tag("div", **{"class": "panel", "data-position": str(data_position)})
-                new_content = BeautifulSoup(result, 'html.parser').div.decode_contents()
-                new_panel.append(BeautifulSoup(new_content, 'html.parser'))
-                grid_container.append(new_panel)  # Append the new panel to the grid container
+        # Name the scenario when the report is one of several
+        if self.scenario is not None:
+            header_panel += f'. Scenario {self.scenario.describe()}'
+
+        # Fill in the header text and the data payload; the page renders the panels itself
+        substitutions = {
+            '<div class="header-text">Edge Walker Options</div>':
+                f'<div class="header-text">{html.escape(header_panel)}</div>',
+            '<script id="report-data" type="text/plain"></script>':
+                f'<script id="report-data" type="text/plain">{self.report_payload()}</script>',
+        }
+        for placeholder, content in substitutions.items():
+            if placeholder not in template:
+                logger.error(f"Error: Template file '{template_file}' has no {placeholder}. Aborting report generation.")
+                return
+            template = template.replace(placeholder, content)
 
         # Write the report to file
         with open(f'{self.base_filename}.html', 'w') as file:
-            file.write(str(soup))
-
+            file.write(template)
 
     def write_csv(self) -> None:
 
@@ -168,33 +178,40 @@ class ReportWriter:
                       "Lower Breakeven", "Upper Breakeven", "Breakeven Difference",
                       "Implied Volatility", "Probability of Profit", "Expected Gain", "Escape Ratio",
                       "Strangle Cost", "Pairs Tried", "Call Expiration", "Call Strike", 
-                      "Call Premium", "Put Expiration", "Put Strike", "Put Premium"]
+                      "Call Premium", "Put Expiration", "Put Strike", "Put Premium",
+                      "Delta", "Gamma", "Vega", "Theta"]
+
+        # Build every CSV column at once from the result arrays
+        results = self.results
+        strangle_cost = 100.0 * (results.premium_call + results.premium_put)
+        csv_columns = [
+            results.company_name,
+            results.ticker,
+            results.stock_price,
+            results.normalized_difference,
+            results.lower_breakeven,
+            results.upper_breakeven,
+            results.breakeven_difference,
+            results.implied_volatility,
+            results.probability_of_profit,
+            results.expected_gain / strangle_cost,
+            results.escape_ratio,
+            strangle_cost,
+            results.num_strangles_considered,
+            results.expiration_dates('expiration_call'),
+            results.strike_price_call,
+            results.premium_call,
+            results.expiration_dates('expiration_put'),
+            results.strike_price_put,
+            results.premium_put,
+            results.delta,
+            results.gamma,
+            results.vega,
+            results.theta,
+        ]
 
         # Open the CSV file for writing
         with open(f'{self.base_filename}.csv', mode='w', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=csv_header)
-            writer.writeheader()
-
-            # Iterate through each strangle result and write to CSV
-            for strangle in self.results:
-                writer.writerow({
-                    "Company": strangle.company_name,
-                    "Symbol": strangle.ticker,
-                    "Stock Price": strangle.stock_price,
-                    "Normalized Breakeven Difference": strangle.normalized_difference,
-                    "Lower Breakeven": strangle.lower_breakeven,
-                    "Upper Breakeven": strangle.upper_breakeven,
-                    "Breakeven Difference": strangle.breakeven_difference,
-                    "Implied Volatility": strangle.implied_volatility,
-                    "Probability of Profit": strangle.probability_of_profit,
-                    "Expected Gain": strangle.expected_gain/(strangle.cost_call + strangle.cost_put),
-                    "Escape Ratio": strangle.escape_ratio,
-                    "Strangle Cost": strangle.cost_call + strangle.cost_put,
-                    "Pairs Tried": strangle.num_strangles_considered,
-                    "Call Expiration": strangle.expiration_date_call,
-                    "Call Strike": strangle.strike_price_call,
-                    "Call Premium": strangle.premium_call,
-                    "Put Expiration": strangle.expiration_date_put,
-                    "Put Strike": strangle.strike_price_put,
-                    "Put Premium": strangle.premium_put
-                })
\ No newline at end of file
+            writer = csv.writer(file)
+            writer.writerow(csv_header)
+            writer.writerows(zip(*(column.tolist() for column in csv_columns)))
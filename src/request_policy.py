@@ -0,0 +1,76 @@
+# request_policy.py
+
+import random
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# HTTP statuses worth trying again (rate limiting and transient server errors)
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+class FetchError(Exception):
+    """A request that still failed after every retry (or ran out of time)."""
+
+@dataclass
+class RequestPolicy:
+    """
+    Timeouts, retries and hedging for API requests.
+
+    request_timeout   seconds allowed for one HTTP request, including reading the body
+    ticker_deadline   seconds allowed for all of one ticker's pages (None: no limit)
+    max_retries       extra attempts for retryable statuses, timeouts and connection errors
+    backoff_base      first retry waits up to this many seconds; doubles each attempt
+    backoff_max       cap on the wait between attempts
+    hedge_after       if a request has not finished after this many seconds, send a duplicate
+                      and use whichever answers first (None: no hedging)
+    """
+    request_timeout: float = 15.0
+    ticker_deadline: Optional[float] = 120.0
+    max_retries: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    hedge_after: Optional[float] = None
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, base * 2^(attempt-1)], capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+class FetchLog:
+    """Per-ticker accounting of retries, hedged requests and failures for the run summary."""
+
+    def __init__(self):
+        self.retries: Counter = Counter()
+        self.failures: Dict[str, str] = {}
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    def record_retry(self, ticker: str, reason: str) -> None:
+        self.retries[ticker] += 1
+        logger.debug(f"Retrying {ticker}: {reason}")
+
+    def record_failure(self, ticker: str, reason: str) -> None:
+        self.failures[ticker] = reason
+        logger.warning(f"Warning: giving up on {ticker}: {reason}")
+
+    def summary(self) -> str:
+        lines = [
+            f"Tickers retried: {len(self.retries):,} ({sum(self.retries.values()):,} retries), "
+            f"tickers failed: {len(self.failures):,}, "
+            f"hedged requests: {self.hedged_requests:,} ({self.hedge_wins:,} won by the hedge)"
+        ]
+        for ticker, reason in sorted(self.failures.items()):
+            lines.append(f"  failed {ticker}: {reason}")
+        return '\n'.join(lines)
@@ -0,0 +1,105 @@
+# run_journal.py
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# One journal per run ID, next to tickers.json
+DEFAULT_JOURNAL_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'runs')
+
+def new_run_id() -> str:
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+class RunJournal:
+    """
+    Append-only checkpoint journal of a scan, one JSON line per finished ticker.
+
+    The first line records the run's as-of clock.  Each ticker's outcome (its best strangle,
+    or that it was pruned or had nothing to offer) is appended and flushed the moment the
+    ticker finishes, and synced to disk every `sync_interval` seconds, so an interrupted
+    run loses at most the tickers in flight.  Reopening the same run ID replays the
+    journal; a torn last line from a crash is dropped.  Failed tickers are not journaled,
+    so they are tried again on resume.
+    """
+
+    def __init__(self, run_id: str, directory: str = DEFAULT_JOURNAL_DIRECTORY, sync_interval: float = 2.0):
+        self.run_id = run_id
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+        self.sync_interval = sync_interval
+        self.as_of: Optional[datetime] = None
+        self.entries: Dict[str, dict] = {}
+        self.complete = False
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            self._replay()
+        self._file = open(self.path, 'a')
+        self._last_sync = time.monotonic()
+
+    def _replay(self) -> None:
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn write at the moment of the crash
+            if 'as_of' in entry:
+                self.as_of = datetime.fromisoformat(entry['as_of'])
+            elif entry.get('complete'):
+                self.complete = True
+            elif 'ticker' in entry:
+                self.entries[entry['ticker']] = entry
+
+        # Cut a torn last line off, so the next record starts on a line of its own
+        if data and not data.endswith(b'\n'):
+            with open(self.path, 'r+b') as f:
+                f.truncate(data.rfind(b'\n') + 1)
+        logger.info(f"Resuming run {self.run_id}: {len(self.entries):,} tickers already done.\n")
+
+    @property
+    def resumed(self) -> bool:
+        return self.as_of is not None
+
+    def _write(self, entry: dict) -> None:
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._file.flush()
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = time.monotonic()
+
+    def start(self, as_of: datetime) -> None:
+        if self.as_of is None:
+            self.as_of = as_of
+            self._write({'as_of': as_of.isoformat()})
+
+    def record(self, ticker: str, entry: dict) -> None:
+        entry = dict(entry, ticker=ticker)
+        self.entries[ticker] = entry
+        self._write(entry)
+
+    def mark_complete(self) -> None:
+        if not self.complete:
+            self.complete = True
+            self._write({'complete': True})
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
@@ -0,0 +1,130 @@
+# scenarios.py
+
+import os
+import re
+import json
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from models import StrangleSet, RANKING_KEYS
+from contract_filter import ContractFilter, FilterRule, DEFAULT_FILTER_FILE
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Example scenario set, next to this module
+DEFAULT_SCENARIO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenarios.json')
+
+@dataclass
+class Scenario:
+    """
+    One way of judging a scan's chains: which expirations to pair, which contracts to keep,
+    the normalized-difference cutoff, and how to rank what is left.
+
+    Expirations are whole days after the run's as-of date, inclusive at both ends.
+    `filters` is a rule file like filters.json (relative to this directory), or a list of
+    rules written inline; None uses filters.json.  `rank_by` is a StrangleSet column
+    from models.RANKING_KEYS, and `top` keeps only the best N by that ranking.
+    """
+    name: str = 'default'
+    min_days: int = 15
+    max_days: int = 195
+    max_normalized_difference: float = 0.1
+    filters: Optional[Union[str, List[dict]]] = None
+    rank_by: str = 'normalized_difference'
+    top: Optional[int] = None
+
+    def __post_init__(self):
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', self.name):
+            raise ValueError(f"Scenario name {self.name!r}: use letters, digits, '_' and '-' only")
+        if not 0 <= self.min_days <= self.max_days:
+            raise ValueError(f"Scenario '{self.name}': need 0 <= min_days <= max_days")
+        if self.rank_by not in RANKING_KEYS:
+            raise ValueError(f"Scenario '{self.name}': cannot rank by '{self.rank_by}' "
+                             f"(one of {', '.join(RANKING_KEYS)})")
+
+    def contract_filter(self) -> ContractFilter:
+        # Each scenario gets its own compiled filter, so rejections are counted per scenario
+        if self.filters is None:
+            return ContractFilter.from_file(DEFAULT_FILTER_FILE)
+        if isinstance(self.filters, str):
+            path = self.filters
+            if not os.path.isabs(path):
+                path = os.path.join(os.path.dirname(DEFAULT_FILTER_FILE), path)
+            return ContractFilter.from_file(path)
+        return ContractFilter([FilterRule(**rule) for rule in self.filters])
+
+    @property
+    def ranks_by_search(self) -> bool:
+        # The pair search minimizes normalized difference, so only that ranking can prune
+        return self.rank_by == 'normalized_difference'
+
+    def select(self, strangles: StrangleSet, top: Optional[int] = None) -> StrangleSet:
+        """
+        The strangles this scenario reports: below its cutoff, with analytics filled in,
+        and (with `top`, or the scenario's own top) only the best N by its ranking.
+        """
+        top = self.top if self.top is not None else top
+        results = strangles.filter(strangles.normalized_difference < self.max_normalized_difference)
+        if self.ranks_by_search:
+            # Analytics only for the rows that make the cut
+            if top is not None and len(results) > top:
+                best = np.argsort(results.normalized_difference, kind='stable')[:top]
+                results = results.take(np.sort(best))
+            results.calculate_analytics()
+        else:
+            results.calculate_analytics()
+            if top is not None and len(results) > top:
+                results = results.sorted(self.rank_by)[:top]
+        return results
+
+    def describe(self) -> str:
+        return (f"{self.name}: expirations {self.min_days}-{self.max_days} days, "
+                f"cutoff {self.max_normalized_difference:g}, ranked by {self.rank_by.replace('_', ' ')}")
+
+def load_scenarios(path: str = DEFAULT_SCENARIO_FILE) -> List[Scenario]:
+    with open(path, 'r') as f:
+        config = json.load(f)
+    scenarios = [Scenario(**scenario) for scenario in config['scenarios']]
+    if not scenarios:
+        raise ValueError(f"{path} defines no scenarios")
+    names = [scenario.name for scenario in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: scenario names must be unique")
+    return scenarios
+
+def union_window(scenarios: List[Scenario]) -> Tuple[int, int]:
+    """The expiration window (in days) one chain download must cover for every scenario."""
+    return min(s.min_days for s in scenarios), max(s.max_days for s in scenarios)
+
+def union_pushdown(param_sets: List[dict]) -> dict:
+    """
+    Server-side chain parameters that drop nothing any scenario would keep: a parameter
+    survives only if every scenario sets it, at the loosest of their values.
+    """
+    if not param_sets:
+        return {}
+    params = {}
+    for key, value in param_sets[0].items():
+        values = [param_set.get(key) for param_set in param_sets]
+        if any(v is None for v in values):
+            continue
+        if key.endswith(('.gt', '.gte')):
+            params[key] = min(values)
+        elif key.endswith(('.lt', '.lte')):
+            params[key] = max(values)
+        elif all(v == value for v in values):
+            params[key] = value
+    return params
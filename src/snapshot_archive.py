@@ -0,0 +1,160 @@
+# snapshot_archive.py
+
+import os
+import json
+import bisect
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from chain_decoder import CHAIN_FIELDS
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+class SnapshotArchive:
+    """
+    Local archive of daily options-chain snapshots and underlying prices, for backtests.
+
+    One directory per trading day:
+
+        {root}/{YYYY-MM-DD}/meta.json            as-of timestamp of the snapshot
+        {root}/{YYYY-MM-DD}/prices.json          underlying price per ticker
+        {root}/{YYYY-MM-DD}/chains/{TICKER}.npz  the chain's CHAIN_FIELDS columns, compressed
+
+    Chains are stored as columns (strings as fixed-width unicode), so replaying a day loads
+    arrays directly with no JSON decoding and no pickles.  A live scan records each chain as
+    it requested it, after the server-side strike and expiration filters, so a replay only
+    sees the window that run asked for.
+
+    During a scan, chains are compressed and written on a writer thread (save_chain_async)
+    so the event loop keeps downloading; close() waits for the last writes.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._price_history: Optional[Dict[str, tuple]] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def day_dir(self, day: date) -> str:
+        return os.path.join(self.root, day.isoformat())
+
+    def days(self, start: Optional[date] = None, end: Optional[date] = None) -> List[date]:
+        """Archived days in order, optionally limited to start <= day <= end."""
+        if not os.path.isdir(self.root):
+            return []
+        days = []
+        for name in os.listdir(self.root):
+            try:
+                day = date.fromisoformat(name)
+            except ValueError:
+                continue
+            if (start is None or day >= start) and (end is None or day <= end):
+                days.append(day)
+        return sorted(days)
+
+    # --- recording -------------------------------------------------------------------
+
+    def save_meta(self, day: date, as_of: datetime) -> None:
+        os.makedirs(self.day_dir(day), exist_ok=True)
+        with open(os.path.join(self.day_dir(day), 'meta.json'), 'w') as f:
+            json.dump({'as_of': as_of.isoformat()}, f)
+
+    def save_prices(self, day: date, prices: Dict[str, float]) -> None:
+        # Merged with anything already stored for the day (e.g. by the first half of a resumed run)
+        os.makedirs(self.day_dir(day), exist_ok=True)
+        prices = {**self.load_prices(day), **prices}
+        with open(os.path.join(self.day_dir(day), 'prices.json'), 'w') as f:
+            json.dump(prices, f, separators=(',', ':'), sort_keys=True)
+        self._price_history = None
+
+    def save_chain(self, day: date, ticker: str, chain: Dict[str, np.ndarray]) -> None:
+        chain_dir = os.path.join(self.day_dir(day), 'chains')
+        os.makedirs(chain_dir, exist_ok=True)
+        columns = {}
+        for name, (_, dtype) in CHAIN_FIELDS.items():
+            values = chain[name]
+            if dtype is object:
+                values = np.array(['' if v is None else v for v in values.tolist()], dtype=str)
+            columns[name] = values
+        np.savez_compressed(os.path.join(chain_dir, f"{ticker}.npz"), **columns)
+
+    async def save_chain_async(self, day: date, ticker: str, chain: Dict[str, np.ndarray]) -> None:
+        # The columns may be views into a reusable chain buffer, so the writer gets copies
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='archive-writer')
+        chain = {name: chain[name].copy() for name in CHAIN_FIELDS}
+        await asyncio.get_running_loop().run_in_executor(self._writer, self.save_chain, day, ticker, chain)
+
+    def close(self) -> None:
+        # Wait for chains still being written
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+
+    # --- replay ----------------------------------------------------------------------
+
+    def as_of(self, day: date) -> datetime:
+        with open(os.path.join(self.day_dir(day), 'meta.json'), 'r') as f:
+            return datetime.fromisoformat(json.load(f)['as_of'])
+
+    def tickers(self, day: date) -> List[str]:
+        chain_dir = os.path.join(self.day_dir(day), 'chains')
+        if not os.path.isdir(chain_dir):
+            return []
+        return sorted(name[:-4] for name in os.listdir(chain_dir) if name.endswith('.npz'))
+
+    def load_prices(self, day: date) -> Dict[str, float]:
+        path = os.path.join(self.day_dir(day), 'prices.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def load_chain(self, day: date, ticker: str) -> Dict[str, np.ndarray]:
+        """A stored chain as CHAIN_FIELDS columns (empty dict if the ticker was not recorded)."""
+        path = os.path.join(self.day_dir(day), 'chains', f"{ticker}.npz")
+        if not os.path.exists(path):
+            return {}
+        with np.load(path, allow_pickle=False) as stored:
+            chain = {}
+            for name, (_, dtype) in CHAIN_FIELDS.items():
+                values = stored[name]
+                if dtype is object:
+                    values = values.astype(object)
+                    values[values == ''] = None
+                chain[name] = values
+        return chain
+
+    def price_on(self, ticker: str, day: date, max_gap_days: int = 4) -> Optional[float]:
+        """
+        Underlying price on `day`, or on the latest archived day before it within
+        max_gap_days (weekends and holidays).  None if the archive has no such price.
+        """
+        if self._price_history is None:
+            history: Dict[str, List] = {}
+            for archived_day in self.days():
+                for symbol, price in self.load_prices(archived_day).items():
+                    history.setdefault(symbol, ([], []))
+                    history[symbol][0].append(archived_day)
+                    history[symbol][1].append(price)
+            self._price_history = history
+
+        days, prices = self._price_history.get(ticker, ([], []))
+        position = bisect.bisect_right(days, day) - 1
+        if position < 0 or day - days[position] > timedelta(days=max_gap_days):
+            return None
+        return prices[position]
@@ -1,13 +1,33 @@
-import os
-import sys
-import pandas as pd
+from __future__ import annotations
+
+import math
+import asyncio
+import heapq
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+from contextlib import AsyncExitStack
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
 
 from market_data_client import MarketDataClient
-from models import Strangle
-from strangle_module import Option, StrangleCombination, find_min_spread  # Import C++ bindings
+from models import Strangle, StrangleSet, strangle_module, solve_implied_volatility, calculate_greeks
+from expiry_calendar import ExpiryCalendar
+from contract_filter import ContractFilter
+from chain_decoder import ChainBufferPool, ChainColumns
+from memory_budget import MemoryBudget
+from snapshot_archive import SnapshotArchive
+from pair_search import PairSearchBatcher
+from scenarios import Scenario, union_window, union_pushdown
+
+# C++ bindings
+Option = strangle_module.Option
+StrangleCombination = strangle_module.StrangleCombination
+find_min_spread = strangle_module.find_min_spread
+find_min_spread_bounded = strangle_module.find_min_spread_bounded
+
+# Per-contract greeks carried through the search and summed over a strangle's two legs
+GREEKS = ('delta', 'gamma', 'vega', 'theta')
 
 # Configure basic logging. Show warning or higher for external modules.
 logging.basicConfig(
@@ -21,15 +41,221 @@ logger = logging.getLogger(__name__)
 # Show info level logger events for this module
 logger.setLevel(logging.INFO)
 
+class SearchBound:
+    """
+    The cutoff a ticker's best strangle must beat to be reported, handed to the pair search.
+
+    Starts at the global max_normalized_difference.  With top_n set it tightens to the
+    N-th best normalized difference found so far in the run, since nothing worse can make
+    the report.  An optional warm_start (e.g. last run's N-th best) tightens the bound
+    until N real results are in; it is a guess, so a market that moved can cost results.
+    """
+
+    def __init__(self, max_normalized_difference: float, top_n: Optional[int] = None,
+                 warm_start: Optional[float] = None):
+        self.max_normalized_difference = max_normalized_difference
+        self.top_n = top_n
+        self.warm_start = warm_start
+        self._best: List[float] = []  # negated, so the heap root is the current floor
+
+    @property
+    def value(self) -> float:
+        bound = self.max_normalized_difference
+        if self.top_n:
+            if len(self._best) >= self.top_n:
+                bound = min(bound, -self._best[0])
+            elif self.warm_start is not None:
+                bound = min(bound, self.warm_start)
+        return bound
+
+    def offer(self, normalized_difference: float) -> None:
+        if not self.top_n:
+            return
+        if len(self._best) < self.top_n:
+            heapq.heappush(self._best, -normalized_difference)
+        elif normalized_difference < -self._best[0]:
+            heapq.heapreplace(self._best, -normalized_difference)
+
+class ScenarioRun:
+    """
+    One scenario's share of a scan: its contract filter and search bound, and the best
+    strangle it found for each ticker.  Every scenario is evaluated on the same downloaded
+    chains, so several can be compared at the API cost of one scan.
+    """
+
+    def __init__(self, scenario: Scenario, calendar: ExpiryCalendar,
+                 contract_filter: Optional[ContractFilter] = None, bound: Optional[SearchBound] = None):
+        self.scenario = scenario
+        self.contract_filter = contract_filter if contract_filter is not None else scenario.contract_filter()
+        self.bound = bound
+
+        # Every ticker's best strangle is appended here as one row
+        self.results = StrangleSet(calendar)
+        self.found: Dict[str, Strangle] = {}
+
+        # Search accounting, including tickers whose best strangle could not beat the bound
+        self.pairs_tried: Dict[str, int] = {}
+        self.pruned_tickers: set = set()
+        self.best_normalized_difference: Dict[str, float] = {}
+
+    @property
+    def name(self) -> str:
+        return self.scenario.name
+
+    @property
+    def num_strangles_considered(self) -> int:
+        return sum(self.pairs_tried.values())
+
+    def outcome(self, ticker: str) -> dict:
+        entry = {'pairs': self.pairs_tried.get(ticker, 0)}
+        if ticker in self.found:
+            entry.update(status='found', row=self.found[ticker].as_dict())
+        elif ticker in self.pruned_tickers:
+            entry['status'] = 'pruned'
+        else:
+            entry['status'] = 'none'
+        return entry
+
+    def restore(self, ticker: str, entry: dict) -> None:
+        self.pairs_tried[ticker] = entry.get('pairs', 0)
+        if entry['status'] == 'found':
+            row = entry['row']
+            self.found[ticker] = self.results.append(**row)
+            self.best_normalized_difference[ticker] = row['normalized_difference']
+            if self.bound is not None:
+                self.bound.offer(row['normalized_difference'])
+        elif entry['status'] == 'pruned':
+            self.pruned_tickers.add(ticker)
+
 class StrangleFinder:
-    def __init__(self, market_data_client: MarketDataClient):
+    def __init__(self, market_data_client: MarketDataClient, calendar: Optional[ExpiryCalendar] = None,
+                 contract_filter: Optional[ContractFilter] = None, bound: Optional[SearchBound] = None,
+                 buffer_pool: Optional[ChainBufferPool] = None, memory_budget: Optional[MemoryBudget] = None,
+                 archive: Optional[SnapshotArchive] = None, batcher: Optional[PairSearchBatcher] = None,
+                 runs: Optional[List[ScenarioRun]] = None):
         self.market_data_client = market_data_client
 
+        # Pair searches go to the batched multi-threaded kernel (None: one call per ticker)
+        self.batcher = batcher
+
+        # Every downloaded chain is also stored here for backtests (None: not recorded)
+        self.archive = archive
+
+        # Reusable per-worker column buffers, and the memory ceiling that gates new tickers
+        self.buffer_pool = buffer_pool
+        self.memory_budget = memory_budget
+
+        # One as-of clock for the whole run
+        self.calendar = calendar if calendar is not None else ExpiryCalendar()
+
+        # The scenarios every chain is evaluated under.  By default there is one, with the
+        # given contract filter rules (filters.json) and search bound (None: keep every
+        # ticker's best strangle).
+        if runs is None:
+            runs = [ScenarioRun(Scenario(), self.calendar, contract_filter=contract_filter or ContractFilter.from_file(),
+                                bound=bound)]
+        self.runs = runs
+
+        # Underlying prices from the bulk snapshot, used to push strike limits to the server
+        self.stock_prices: Dict[str, float] = {}
+
+        # Contracts that came without a vendor implied volatility, and how many were solved
+        self.num_iv_missing = 0
+        self.num_iv_solved = 0
+
+    # The first scenario's state, for callers that only ever use one
+    @property
+    def results(self) -> StrangleSet:
+        return self.runs[0].results
+
+    @property
+    def bound(self) -> Optional[SearchBound]:
+        return self.runs[0].bound
+
+    @property
+    def contract_filter(self) -> ContractFilter:
+        return self.runs[0].contract_filter
+
+    @property
+    def pairs_tried(self) -> Dict[str, int]:
+        return self.runs[0].pairs_tried
+
+    @property
+    def pruned_tickers(self) -> set:
+        return self.runs[0].pruned_tickers
+
+    @property
+    def best_normalized_difference(self) -> Dict[str, float]:
+        return self.runs[0].best_normalized_difference
+
+    @property
+    def num_strangles_considered(self) -> int:
+        return sum(run.num_strangles_considered for run in self.runs)
+
+    def journal_entry(self, ticker: str) -> Optional[dict]:
+        """
+        Checkpoint record of a finished ticker for a RunJournal, or None if the ticker failed
+        to download (failures are retried when the run resumes, so they are not recorded).
+        With several scenarios each one's outcome is kept under its name.
+        """
+        if ticker in self.market_data_client.fetch_log.failures:
+            return None
+        entry = {}
+        if ticker in self.market_data_client.chain_fetches:
+            entry['fetch'] = list(self.market_data_client.chain_fetches[ticker])
+        if len(self.runs) == 1:
+            entry.update(self.runs[0].outcome(ticker))
+        else:
+            entry['scenarios'] = {run.name: run.outcome(ticker) for run in self.runs}
+        return entry
+
+    def restorable(self, entry: dict) -> bool:
+        """Whether a journal entry holds an outcome for every scenario of this scan."""
+        if 'scenarios' in entry:
+            return len(self.runs) > 1 and all(run.name in entry['scenarios'] for run in self.runs)
+        return len(self.runs) == 1
+
+    def primary_outcome(self, entry: dict) -> Optional[dict]:
+        """The first scenario's outcome in a journal entry (None if it has none)."""
+        if 'scenarios' in entry:
+            return entry['scenarios'].get(self.runs[0].name)
+        return entry
+
+    def restore(self, ticker: str, entry: dict) -> None:
+        """Put a journaled ticker's outcome back, as if it had just been scanned."""
+        if 'fetch' in entry:
+            self.market_data_client.chain_fetches[ticker] = tuple(entry['fetch'])
+        if 'scenarios' in entry:
+            for run in self.runs:
+                run.restore(ticker, entry['scenarios'][run.name])
+        else:
+            self.runs[0].restore(ticker, entry)
+
+    async def prefetch_stock_prices(self, tickers: List[str], semaphore=None) -> None:
+        # One bulk request up front instead of learning each price from its chain
+        self.stock_prices = await self.market_data_client.get_stock_prices(tickers, semaphore=semaphore)
+        logger.info(f"Prefetched underlying prices for {len(self.stock_prices):,} of {len(tickers):,} tickers.\n")
+
     async def find_balanced_strangle(self, ticker: str, semaphore=None) -> Optional[Strangle]:
+        async with AsyncExitStack() as stack:
+            # Parse and filter into a worker's reusable buffers (returned when this ticker is done)
+            chain_buffer = None
+            if self.buffer_pool is not None:
+                chain_buffer = await stack.enter_async_context(self.buffer_pool.borrow())
+
+            # Holding a worker slot, wait for memory headroom before taking on another chain
+            if self.memory_budget is not None:
+                await stack.enter_async_context(self.memory_budget.admit())
+
+            return await self._find_balanced_strangle(ticker, semaphore, chain_buffer)
+
+    async def _find_balanced_strangle(self, ticker: str, semaphore=None,
+                                      chain_buffer: Optional[ChainColumns] = None) -> Optional[Strangle]:
         
-        # Set date limits
-        date_min = datetime.today() + timedelta(days=15)
-        date_max = date_min + timedelta(days=180)
+        # Set date limits relative to the run's as-of date, wide enough for every scenario
+        min_days, max_days = union_window([run.scenario for run in self.runs])
+        date_min = self.calendar.start_date + timedelta(days=min_days)
+        date_max = self.calendar.start_date + timedelta(days=max_days)
         date_min = date_min.strftime('%Y-%m-%d')
         date_max = date_max.strftime('%Y-%m-%d')
 
@@ -39,46 +265,61 @@ class StrangleFinder:
             "expiration_date.lte": date_max,
         }
 
-        # Pull the option chain for this ticker asynchronously
-        options_df = await self.market_data_client.get_options_chain(ticker, params, semaphore=semaphore)
-        if options_df.empty:
+        # Let the server drop contracts the filter rules would reject (e.g. strike range);
+        # with several scenarios, only what all of them would reject
+        stock_price = self.stock_prices.get(ticker)
+        params.update(union_pushdown([run.contract_filter.pushdown_params(stock_price) for run in self.runs]))
+
+        # Pull the option chain for this ticker asynchronously, as column arrays
+        chain = await self.market_data_client.get_options_chain(
+            ticker, params, semaphore=semaphore, chain=chain_buffer
+        )
+        if not chain:
             return None
+        if self.archive is not None:
+            # Recorded for backtests; compressed and written off the event loop
+            await self.archive.save_chain_async(self.calendar.start_date, ticker, chain)
+
+        # Premiums and implied volatilities once per chain, then each scenario's own search
+        columns = self._prepare_columns(chain, chain_buffer)
+        if len(self.runs) == 1:
+            return await self._evaluate(self.runs[0], ticker, columns, chain_buffer)
+        outcomes = await asyncio.gather(*[
+            self._evaluate(run, ticker, columns, chain_buffer) for run in self.runs
+        ])
+        return outcomes[0]
 
-        # Filter the contracts
-        options_df = self._filter_options(options_df)
-        if options_df.empty:
+    async def _evaluate(self, run: ScenarioRun, ticker: str, columns: Dict[str, np.ndarray],
+                        chain_buffer: Optional[ChainColumns] = None) -> Optional[Strangle]:
+        # Filter the contracts (the filtered columns are copies, independent of the buffer)
+        contracts = self._filter_options(run, columns, chain_buffer)
+        if contracts is None:
             return None
 
-        # Divide options into calls and puts, and extract expiration dates
-        calls = [
-            Option(row['premium'], row['strike_price'], row['implied_volatility'], row['contract_type'])
-            for _, row in options_df[options_df['contract_type'] == 'call'].iterrows()
-        ]
-        puts = [
-            Option(row['premium'], row['strike_price'], row['implied_volatility'], row['contract_type'])
-            for _, row in options_df[options_df['contract_type'] == 'put'].iterrows()
-        ]
-        
-        if not calls or not puts:
+        # Divide options into calls and puts
+        is_call = contracts['contract_type'] == 'call'
+        is_put = contracts['contract_type'] == 'put'
+        if not is_call.any() or not is_put.any():
             return None  # Ensure there are both calls and puts to process
 
-        # Call the C++ function to find the best strangle
-        best_combination: StrangleCombination = find_min_spread(calls, puts)
-
-        # Get company name and expiration dates for the selected strangle
-        company_name = await self.market_data_client.get_ticker_details(ticker, semaphore=semaphore)
+        # Call the C++ search for the best strangle.  With a bound the search only visits
+        # pairs that could beat it and returns None when none do.
+        num_strangles_considered = int(is_call.sum()) * int(is_put.sum())
+        run.pairs_tried[ticker] = num_strangles_considered
+        if self.batcher is not None:
+            best_combination = await self._search_batched(contracts, is_call, is_put, run.bound)
+        else:
+            best_combination = self._search(contracts, is_call, is_put, run.bound)
+        if best_combination is None:
+            if run.bound is not None:
+                run.pruned_tickers.add(ticker)
+            return None
 
-        # Find expiration dates for the selected options
-        expiration_date_call = options_df.loc[
-            (options_df['strike_price'] == best_combination.call.strike_price) &
-            (options_df['contract_type'] == 'call'),
-            'expiration_date'
-        ].values[0]
-        expiration_date_put = options_df.loc[
-            (options_df['strike_price'] == best_combination.put.strike_price) &
-            (options_df['contract_type'] == 'put'),
-            'expiration_date'
-        ].values[0]
+        # The contracts behind the selected options, for their expirations and greeks
+        call_row = self._leg_row(contracts, is_call, best_combination.call)
+        put_row = self._leg_row(contracts, is_put, best_combination.put)
+        expiration_date_call = contracts['expiration_date'][call_row]
+        expiration_date_put = contracts['expiration_date'][put_row]
 
         # Use a weighted IV for the strangle IV
         total_premium = best_combination.call.premium + best_combination.put.premium
@@ -88,94 +329,156 @@ class StrangleFinder:
         else:
             return None
 
-        # Create Strangle object
-        best_strangle = Strangle(
+        run.best_normalized_difference[ticker] = best_combination.normalized_difference
+        if run.bound is not None:
+            run.bound.offer(best_combination.normalized_difference)
+
+        # Store the best strangle as a row of the scenario's results set
+        strangle = run.results.append(
             ticker=ticker,
-            company_name=company_name,
-            stock_price=options_df['stock_price'].iloc[0],
+            company_name=None,  # filled in after ranking, see enrichment.Enricher
+            stock_price=float(contracts['stock_price'][0]),
             expiration_date_call=expiration_date_call,
             expiration_date_put=expiration_date_put,
             strike_price_call=best_combination.call.strike_price,
             strike_price_put=best_combination.put.strike_price,
             premium_call=best_combination.call.premium,
             premium_put=best_combination.put.premium,
-            cost_call=best_combination.call.premium * 100.0,
-            cost_put=best_combination.put.premium * 100.0,
             upper_breakeven=best_combination.upper_breakeven,
             lower_breakeven=best_combination.lower_breakeven,
             breakeven_difference=best_combination.breakeven_difference,
             normalized_difference=best_combination.normalized_difference,
             implied_volatility=strangle_iv,
-            num_strangles_considered=len(calls) * len(puts)
+            num_strangles_considered=num_strangles_considered,
+            **{greek: float(contracts[greek][call_row] + contracts[greek][put_row]) for greek in GREEKS}
         )
+        run.found[ticker] = strangle
+        return strangle
 
-        # After instantiation, calculate the optional fields
-        best_strangle.calculate_escape_ratio()
-        best_strangle.calculate_probability_of_profit()
-        best_strangle.calculate_expected_gain()
-
-        return best_strangle
-
-    def _filter_options(self, options_df: pd.DataFrame) -> pd.DataFrame:
-        # Immediately return if critical columns are missing
-        required_columns = ['details', 'underlying_asset', 'last_quote', 'implied_volatility']
-        if not all(col in options_df.columns for col in required_columns):
-            return pd.DataFrame()
-
-        # Filter on implied volatility before extracting other fields
-        options_df = options_df[options_df['implied_volatility'] > 0]
-        if options_df.empty:
-            return pd.DataFrame()
-
-        # Use vectorized assignments to extract required fields from nested dictionaries
-        options_df = options_df.assign(
-            expiration_date=[x.get('expiration_date') for x in options_df['details']],
-            strike_price=[x.get('strike_price') for x in options_df['details']],
-            exercise_style=[x.get('exercise_style') for x in options_df['details']],
-            shares_per_contract=[x.get('shares_per_contract') for x in options_df['details']],
-            contract_type=[x.get('contract_type') for x in options_df['details']],
-            stock_price=[x.get('price') for x in options_df['underlying_asset']],
-            bid=[x.get('bid') for x in options_df['last_quote']],
-            ask=[x.get('ask') for x in options_df['last_quote']],
-            midpoint=[x.get('midpoint') for x in options_df['last_quote']],
-            premium=[x.get('fmv', None) for x in options_df['details']]
-        ).dropna(subset=[
-            'expiration_date', 'strike_price', 'exercise_style', 'shares_per_contract',
-            'contract_type', 'stock_price', 'bid', 'ask', 'midpoint'
-        ])
+    @staticmethod
+    def _leg_row(contracts: Dict[str, np.ndarray], mask: np.ndarray, option: Option) -> int:
+        # First contract of the right type with the option's strike and premium
+        rows = np.flatnonzero(
+            mask & (contracts['strike_price'] == option.strike_price) & (contracts['premium'] == option.premium)
+        )
+        return int(rows[0])
 
-        if options_df.empty:
-            return pd.DataFrame()
-
-        # Fill missing premiums with midpoint
-        options_df['premium'] = pd.to_numeric(options_df['premium'], errors='coerce')
-        options_df['midpoint'] = pd.to_numeric(options_df['midpoint'], errors='coerce')
-        options_df['premium'] = options_df['premium'].fillna(options_df['midpoint'])
-
-        # Store stock price once to avoid repeated access
-        stock_price = options_df['stock_price'].iloc[0]
-
-        # Apply all filtering conditions in a single step
-        options_df = options_df[
-            (options_df['exercise_style'] == 'american') &
-            (options_df['shares_per_contract'] == 100) &
-            (options_df['open_interest'] > 5) &
-            (options_df['premium'] > 0.01 * stock_price) &
-            (options_df['premium'] < 20.0) &
-            (options_df['strike_price'].between(stock_price / 10, stock_price * 10)) &
-            ((options_df['ask'] - options_df['bid']).abs() <= 0.3 * options_df['premium']) &
-            # Ensure premium is reasonably close to the prevailing market quotes
-            (options_df['premium'] >= options_df['bid'] - 0.1 * options_df['midpoint']) &
-            (options_df['premium'] <= options_df['ask'] + 0.1 * options_df['midpoint']) &
-            ~(
-                ((options_df['contract_type'] == 'put') & (options_df['premium'] < (options_df['strike_price'] - stock_price))) |
-                ((options_df['contract_type'] == 'call') & (options_df['premium'] < (stock_price - options_df['strike_price'])))
+    def _search(self, contracts: Dict[str, np.ndarray], is_call: np.ndarray, is_put: np.ndarray,
+                bound: Optional[SearchBound]) -> Optional[StrangleCombination]:
+        calls = [
+            Option(premium, strike_price, implied_volatility, 'call')
+            for premium, strike_price, implied_volatility in zip(
+                contracts['premium'][is_call].tolist(),
+                contracts['strike_price'][is_call].tolist(),
+                contracts['implied_volatility'][is_call].tolist()
             )
         ]
+        puts = [
+            Option(premium, strike_price, implied_volatility, 'put')
+            for premium, strike_price, implied_volatility in zip(
+                contracts['premium'][is_put].tolist(),
+                contracts['strike_price'][is_put].tolist(),
+                contracts['implied_volatility'][is_put].tolist()
+            )
+        ]
+        if bound is None:
+            return find_min_spread(calls, puts)
+        return find_min_spread_bounded(calls, puts, bound.value)
+
+    async def _search_batched(self, contracts: Dict[str, np.ndarray], is_call: np.ndarray, is_put: np.ndarray,
+                              bound: Optional[SearchBound]) -> Optional[StrangleCombination]:
+        # Same search in the batched kernel, which works on the columns directly
+        winner = await self.batcher.search(
+            contracts['premium'][is_call], contracts['strike_price'][is_call],
+            contracts['premium'][is_put], contracts['strike_price'][is_put],
+            bound.value if bound is not None else math.inf
+        )
+        if winner is None:
+            return None
+
+        call = np.flatnonzero(is_call)[winner['call_index']]
+        put = np.flatnonzero(is_put)[winner['put_index']]
+        best_combination = StrangleCombination()
+        best_combination.call = Option(float(contracts['premium'][call]), float(contracts['strike_price'][call]),
+                                       float(contracts['implied_volatility'][call]), 'call')
+        best_combination.put = Option(float(contracts['premium'][put]), float(contracts['strike_price'][put]),
+                                      float(contracts['implied_volatility'][put]), 'put')
+        best_combination.strangle_costs = winner['strangle_costs']
+        best_combination.upper_breakeven = winner['upper_breakeven']
+        best_combination.lower_breakeven = winner['lower_breakeven']
+        best_combination.breakeven_difference = winner['breakeven_difference']
+        best_combination.average_strike_price = 0.5 * (best_combination.call.strike_price +
+                                                       best_combination.put.strike_price)
+        best_combination.normalized_difference = winner['normalized_difference']
+        return best_combination
+
+    def _prepare_columns(self, chain: Dict[str, np.ndarray],
+                         chain_buffer: Optional[ChainColumns] = None) -> Dict[str, np.ndarray]:
+        # Work on a shallow copy so derived columns do not leak back into the chain
+        columns = dict(chain)
+
+        # Fill missing premiums with midpoint (in the worker's scratch columns when there are any)
+        if chain_buffer is not None:
+            premium = chain_buffer.scratch('premium')
+        else:
+            premium = np.empty(len(chain['fmv']))
+        np.copyto(premium, chain['fmv'])
+        np.copyto(premium, chain['midpoint'], where=np.isnan(chain['fmv']))
+        columns['premium'] = premium
+
+        # Contracts without a vendor IV get one solved from their premium, so they stay in the
+        # search; any the solver cannot price are still removed by the implied_volatility rule
+        if chain_buffer is not None:
+            implied_volatility = chain_buffer.scratch('implied_volatility')
+        else:
+            implied_volatility = np.empty(len(chain['implied_volatility']))
+        np.copyto(implied_volatility, chain['implied_volatility'])
+        missing = ~(implied_volatility > 0)
+        if missing.any():
+            solvable = np.flatnonzero(missing & (chain['expiration_date'] != None) & (premium > 0))  # noqa: E711
+            if len(solvable):
+                seconds = self.calendar.seconds_for(self.calendar.day_indices(chain['expiration_date'][solvable]))
+                implied_volatility[solvable] = solve_implied_volatility(
+                    premium[solvable], chain['stock_price'][solvable], chain['strike_price'][solvable],
+                    seconds, chain['contract_type'][solvable] == 'call'
+                )
+            self.num_iv_missing += int(missing.sum())
+            self.num_iv_solved += int((implied_volatility[missing] > 0).sum())
+        columns['implied_volatility'] = implied_volatility
+        return columns
+
+    def _filter_options(self, run: ScenarioRun, columns: Dict[str, np.ndarray],
+                        chain_buffer: Optional[ChainColumns] = None) -> Optional[Dict[str, np.ndarray]]:
+        # Apply every configured rule in one fused pass
+        keep = chain_buffer.scratch('keep', dtype=bool) if chain_buffer is not None else None
+        keep = run.contract_filter.apply(columns, out=keep)
+
+        # A scenario narrower than the downloaded window drops the expirations outside its own
+        min_days, max_days = union_window([r.scenario for r in self.runs])
+        if (run.scenario.min_days, run.scenario.max_days) != (min_days, max_days):
+            if 'expiration_day' not in columns:
+                columns['expiration_day'] = self._expiration_days(columns['expiration_date'])
+            days = columns['expiration_day']
+            keep &= (days >= run.scenario.min_days) & (days <= run.scenario.max_days)
+        if not keep.any():
+            return None
 
         # Define columns to return
         columns_to_return = ['stock_price', 'expiration_date', 'strike_price', 'contract_type', 'premium', 'implied_volatility']
 
-        return options_df[columns_to_return]
+        contracts = {name: columns[name][keep] for name in columns_to_return}
 
+        # Greeks for every surviving contract in one call
+        seconds = self.calendar.seconds_for(self.calendar.day_indices(contracts['expiration_date']))
+        contracts.update(calculate_greeks(
+            contracts['stock_price'], contracts['strike_price'], contracts['implied_volatility'],
+            seconds, contracts['contract_type'] == 'call'
+        ))
+        return contracts
 
+    def _expiration_days(self, expiration_date: np.ndarray) -> np.ndarray:
+        # Day indices of the expirations, -1 where a contract has none
+        days = np.full(len(expiration_date), -1, dtype=np.int32)
+        present = np.flatnonzero(expiration_date != None)  # noqa: E711
+        days[present] = self.calendar.day_indices(expiration_date[present])
+        return days
@@ -0,0 +1,501 @@
+# strangle_numpy.py
+
+import math
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+# Pure-NumPy stand-in for the compiled strangle_module, with the same names, arguments
+# and results, for machines without a C++ build.  lazy_imports.import_strangle_module
+# picks it when the extension is missing (or when EDGEWALKER_BACKEND=numpy).  The
+# arithmetic follows the C++ operation for operation, so the pair searches pick the same
+# pairs with identical figures; functions of exp, log and erf can differ in the last bits.
+# utility/backend_parity.py checks the two against each other and times them.
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+BACKEND = 'numpy'
+
+SECONDS_PER_YEAR = 31536000.0
+BASE_STRANGLE_COST = 2 * (0.53 + 0.55) / 100.0
+INV_SQRT_2 = 0.70710678118654752440
+INV_SQRT_2PI = 0.39894228040143267794
+SQRT_2PI = 2.50662827463100050242
+
+# The pair search evaluates calls against all puts this many pairs at a time, so a very
+# long chain never needs more than a few blocks of temporaries
+PAIR_BLOCK = 1 << 18
+
+# erf and erfc from W. J. Cody's rational approximations (SPECFUN CALERF), accurate to a
+# few units in the last place: one rational function for |x| <= 0.46875, one up to 4 and
+# an asymptotic one beyond, evaluated for whole arrays at once
+_ERF_A = (3.16112374387056560e00, 1.13864154151050156e02, 3.77485237685302021e02,
+          3.20937758913846947e03, 1.85777706184603153e-1)
+_ERF_B = (2.36012909523441209e01, 2.44024637934444173e02, 1.28261652607737228e03,
+          2.84423683343917062e03)
+_ERF_C = (5.64188496988670089e-1, 8.88314979438837594e00, 6.61191906371416295e01,
+          2.98635138197400131e02, 8.81952221241769090e02, 1.71204761263407058e03,
+          2.05107837782607147e03, 1.23033935479799725e03, 2.15311535474403846e-8)
+_ERF_D = (1.57449261107098347e01, 1.17693950891312499e02, 5.37181101862009858e02,
+          1.62138957456669019e03, 3.29079923573345963e03, 4.36261909014324716e03,
+          3.43936767414372164e03, 1.23033935480374942e03)
+_ERF_P = (3.05326634961232344e-1, 3.60344899949804439e-1, 1.25781726111229246e-1,
+          1.60837851487422766e-2, 6.58749161529837803e-4, 1.63153871373020978e-2)
+_ERF_Q = (2.56852019228982242e00, 1.87295284992346725e00, 5.27905102951428412e-1,
+          6.05183413124413191e-2, 2.33520497626869185e-3)
+_INV_SQRT_PI = 5.6418958354775628695e-1
+
+def _erf_small(x: np.ndarray) -> np.ndarray:
+    # erf(x) for |x| <= 0.46875
+    # (Horner steps in place: at these sizes allocating temporaries costs more than the arithmetic)
+    square = x * x
+    numerator = _ERF_A[4] * square
+    denominator = square.copy()
+    for i in range(3):
+        numerator += _ERF_A[i]
+        numerator *= square
+        denominator += _ERF_B[i]
+        denominator *= square
+    numerator += _ERF_A[3]
+    denominator += _ERF_B[3]
+    numerator *= x
+    numerator /= denominator
+    return numerator
+
+def _erfc_middle(y: np.ndarray) -> np.ndarray:
+    # erfc(y) / exp(-y*y) for 0.46875 < y <= 4
+    numerator = _ERF_C[8] * y
+    denominator = y.copy()
+    for i in range(7):
+        numerator += _ERF_C[i]
+        numerator *= y
+        denominator += _ERF_D[i]
+        denominator *= y
+    numerator += _ERF_C[7]
+    denominator += _ERF_D[7]
+    numerator /= denominator
+    return numerator
+
+def _erfc_tail(y: np.ndarray) -> np.ndarray:
+    # erfc(y) / exp(-y*y) for y > 4
+    inverse_square = 1.0 / (y * y)
+    numerator = _ERF_P[5] * inverse_square
+    denominator = inverse_square.copy()
+    for i in range(4):
+        numerator += _ERF_P[i]
+        numerator *= inverse_square
+        denominator += _ERF_Q[i]
+        denominator *= inverse_square
+    numerator += _ERF_P[4]
+    denominator += _ERF_Q[4]
+    numerator /= denominator
+    numerator *= inverse_square
+    return (_INV_SQRT_PI - numerator) / y
+
+def _erf_parts(x: np.ndarray):
+    """
+    erf(x) where |x| <= 0.46875 (`small`), and erfc(|x|) everywhere else, each region
+    evaluated only on its own elements.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.abs(x)
+    small = y <= 0.46875
+    middle = ~small & (y <= 4.0)
+    tail = (y > 4.0) & (y < 26.543)  # erfc underflows beyond
+
+    values = np.zeros(x.shape)  # also NaN-free zeros for |x| >= 26.543
+    values[small] = _erf_small(x[small])
+    values[middle] = _erfc_middle(y[middle])
+    values[tail] = _erfc_tail(y[tail])
+
+    # Times exp(-y*y), split so the rounding of y*y does not cost accuracy
+    scaled = middle | tail
+    y_scaled = y[scaled]
+    rounded = np.trunc(y_scaled * 16.0) / 16.0
+    values[scaled] *= np.exp(-rounded * rounded) * np.exp(-(y_scaled - rounded) * (y_scaled + rounded))
+    values[np.isnan(x)] = np.nan
+    return x, small, values
+
+def _erf(x: np.ndarray) -> np.ndarray:
+    x, small, values = _erf_parts(x)
+    large = ~small
+    values[large] = np.copysign((0.5 - values[large]) + 0.5, x[large])
+    return values
+
+def _erfc(x: np.ndarray) -> np.ndarray:
+    x, small, values = _erf_parts(x)
+    values[small] = 1.0 - values[small]
+    negative = ~small & (x < 0)
+    values[negative] = 2.0 - values[negative]
+    return values
+
+def _float_arrays(*values) -> List[np.ndarray]:
+    return np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in values))
+
+def _whole_seconds(seconds: np.ndarray) -> np.ndarray:
+    # The C++ takes seconds as an int; anything that does not convert counts as expired
+    return np.where(np.isfinite(seconds), np.trunc(seconds), 0.0)
+
+def _same_length(name: str, *arrays: np.ndarray) -> None:
+    if any(array.size != arrays[0].size for array in arrays):
+        raise ValueError(f"{name}: every input must have the same length")
+
+# --- strangle analytics ------------------------------------------------------------------
+
+def escape_ratio(stock_price, upper_breakeven, lower_breakeven) -> np.ndarray:
+    """Escape ratio for arrays of strangles"""
+    stock_price, upper_breakeven, lower_breakeven = _float_arrays(stock_price, upper_breakeven, lower_breakeven)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        to_upper = np.abs(stock_price - upper_breakeven)
+        to_lower = np.abs(stock_price - lower_breakeven)
+        return np.where(to_lower < to_upper, to_lower, to_upper) / stock_price
+
+def probability_of_profit(stock_price, upper_breakeven, lower_breakeven, implied_volatility,
+                          seconds_to_expiration) -> np.ndarray:
+    """Probability of profit for arrays of strangles"""
+    stock_price, upper_breakeven, lower_breakeven, implied_volatility, seconds_to_expiration = _float_arrays(
+        stock_price, upper_breakeven, lower_breakeven, implied_volatility, seconds_to_expiration
+    )
+    seconds = _whole_seconds(seconds_to_expiration)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        move_to_upper_breakeven = (upper_breakeven - stock_price) / stock_price
+        move_to_lower_breakeven = (stock_price - lower_breakeven) / stock_price
+        sigma = implied_volatility * np.sqrt(seconds / SECONDS_PER_YEAR)
+        z_up = move_to_upper_breakeven / sigma
+        z_down = move_to_lower_breakeven / sigma
+        probability_up = 1.0 - 0.5 * (1.0 + _erf(z_up / math.sqrt(2.0)))
+        probability_down = 0.5 * (1.0 + _erf(-z_down / math.sqrt(2.0)))
+    return np.where((seconds <= 0) | (sigma <= 0), 0.0, probability_up + probability_down)
+
+def expected_gain(stock_price, upper_strike, lower_strike, implied_volatility, seconds_to_expiration,
+                  total_premium_per_share, brokerage_fees_per_share) -> np.ndarray:
+    """Expected gain for arrays of strangles"""
+    (stock_price, upper_strike, lower_strike, implied_volatility, seconds_to_expiration,
+     total_premium_per_share, brokerage_fees_per_share) = _float_arrays(
+        stock_price, upper_strike, lower_strike, implied_volatility, seconds_to_expiration,
+        total_premium_per_share, brokerage_fees_per_share
+    )
+    seconds = _whole_seconds(seconds_to_expiration)
+    sqrt_2 = math.sqrt(2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = implied_volatility * np.sqrt(seconds / SECONDS_PER_YEAR)
+
+        d_1 = (np.log(stock_price / upper_strike) + 0.5 * sigma * sigma) / sigma
+        d_2 = d_1 - sigma
+        call_payoff_per_share = (stock_price * 0.5 * (1 + _erf(d_1 / sqrt_2)) -
+                                 upper_strike * 0.5 * (1 + _erf(d_2 / sqrt_2)))
+
+        d_1_put = (np.log(stock_price / lower_strike) + 0.5 * sigma * sigma) / sigma
+        d_2_put = d_1_put - sigma
+        put_payoff_per_share = (lower_strike * 0.5 * (1 + _erf(-d_2_put / sqrt_2)) -
+                                stock_price * 0.5 * (1 + _erf(-d_1_put / sqrt_2)))
+
+        loss_per_share = -(total_premium_per_share + brokerage_fees_per_share)
+        expected_gain_per_share = loss_per_share + call_payoff_per_share + put_payoff_per_share
+    return np.where((seconds <= 0) | (sigma <= 0), 0.0, expected_gain_per_share * 100)
+
+class Strangle:
+    """Scalar analytics of one strangle, as bound from strangle.cpp"""
+
+    def __init__(self, stock_price: float, upper_breakeven: float, lower_breakeven: float):
+        self.stock_price = stock_price
+        self.upper_breakeven = upper_breakeven
+        self.lower_breakeven = lower_breakeven
+
+    def calculate_escape_ratio(self) -> float:
+        return float(escape_ratio(self.stock_price, self.upper_breakeven, self.lower_breakeven))
+
+    @staticmethod
+    def calculate_probability_of_profit(stock_price, upper_breakeven, lower_breakeven,
+                                        implied_volatility, seconds_to_expiration) -> float:
+        return float(probability_of_profit(stock_price, upper_breakeven, lower_breakeven,
+                                           implied_volatility, seconds_to_expiration))
+
+    @staticmethod
+    def calculate_expected_gain(stock_price, upper_strike, lower_strike, implied_volatility,
+                                seconds_to_expiration, total_premium_per_share,
+                                brokerage_fees_per_share) -> float:
+        return float(expected_gain(stock_price, upper_strike, lower_strike, implied_volatility,
+                                   seconds_to_expiration, total_premium_per_share, brokerage_fees_per_share))
+
+# --- pair search -------------------------------------------------------------------------
+
+class Option:
+    """One option contract, as in find_min_spread.h"""
+
+    __slots__ = ('premium', 'strike_price', 'implied_volatility', 'contract_type')
+
+    def __init__(self, premium: float = 0.0, strike_price: float = 0.0,
+                 implied_volatility: float = 0.0, contract_type: str = ''):
+        self.premium = premium
+        self.strike_price = strike_price
+        self.implied_volatility = implied_volatility
+        self.contract_type = contract_type
+
+class StrangleCombination:
+    """The best call and put of a chain and what the pair costs, as in find_min_spread.h"""
+
+    __slots__ = ('call', 'put', 'strangle_costs', 'upper_breakeven', 'lower_breakeven',
+                 'breakeven_difference', 'average_strike_price', 'normalized_difference')
+
+    def __init__(self):
+        self.call = Option()
+        self.put = Option()
+        self.strangle_costs = math.nan
+        self.upper_breakeven = math.nan
+        self.lower_breakeven = math.nan
+        self.breakeven_difference = math.nan
+        self.average_strike_price = math.nan
+        self.normalized_difference = math.nan
+
+def _best_pair(call_premium: np.ndarray, call_strike: np.ndarray, put_premium: np.ndarray,
+               put_strike: np.ndarray, max_normalized_difference: float) -> Optional[tuple]:
+    """
+    (call position, put position) of the pair with the smallest normalized difference
+    strictly below max_normalized_difference, taking the first in (call, put) order among
+    equal minima, or None.  Calls are taken a block at a time against every put.
+    """
+    num_calls, num_puts = len(call_premium), len(put_premium)
+    if num_calls == 0 or num_puts == 0:
+        return None
+
+    best, best_value = None, max_normalized_difference
+    rows = max(1, PAIR_BLOCK // num_puts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, num_calls, rows):
+            cp = call_premium[start:start + rows, None]
+            cs = call_strike[start:start + rows, None]
+            strangle_costs = cp + put_premium + BASE_STRANGLE_COST
+            upper_breakeven = cs + strangle_costs
+            lower_breakeven = put_strike - strangle_costs
+            normalized_difference = np.abs(upper_breakeven - lower_breakeven) / (0.5 * (cs + put_strike))
+            # NaN never wins a comparison in the C++ loop
+            normalized_difference[np.isnan(normalized_difference)] = np.inf
+
+            k = int(np.argmin(normalized_difference))
+            value = normalized_difference.flat[k]
+            if value < best_value:
+                best_value = value
+                best = (start + k // num_puts, k % num_puts)
+    return best
+
+def _pair_fields(call_premium: float, call_strike: float, put_premium: float, put_strike: float) -> tuple:
+    # One pair's figures in plain floats, with the same operations as the search
+    strangle_costs = call_premium + put_premium + BASE_STRANGLE_COST
+    upper_breakeven = call_strike + strangle_costs
+    lower_breakeven = put_strike - strangle_costs
+    breakeven_difference = abs(upper_breakeven - lower_breakeven)
+    average_strike_price = 0.5 * (call_strike + put_strike)
+    return (strangle_costs, upper_breakeven, lower_breakeven, breakeven_difference,
+            average_strike_price, breakeven_difference / average_strike_price)
+
+def _search_options(calls: List[Option], puts: List[Option],
+                    max_normalized_difference: float) -> Optional[StrangleCombination]:
+    columns = [
+        np.fromiter((getattr(option, field) for option in options), dtype=np.float64, count=len(options))
+        for options in (calls, puts) for field in ('premium', 'strike_price')
+    ]
+    pair = _best_pair(*columns, max_normalized_difference)
+    if pair is None:
+        return None
+
+    call, put = calls[pair[0]], puts[pair[1]]
+    combination = StrangleCombination()
+    combination.call, combination.put = call, put
+    (combination.strangle_costs, combination.upper_breakeven, combination.lower_breakeven,
+     combination.breakeven_difference, combination.average_strike_price,
+     combination.normalized_difference) = _pair_fields(call.premium, call.strike_price,
+                                                        put.premium, put.strike_price)
+    return combination
+
+def find_min_spread(calls: List[Option], puts: List[Option]) -> StrangleCombination:
+    """Find the best strangle with minimum normalized difference"""
+    return _search_options(calls, puts, np.finfo(np.float64).max) or StrangleCombination()
+
+def find_min_spread_bounded(calls: List[Option], puts: List[Option],
+                            max_normalized_difference: float) -> Optional[StrangleCombination]:
+    """Find the best strangle with normalized difference below a bound (None if there is none)"""
+    if not max_normalized_difference > 0:
+        return None
+    return _search_options(calls, puts, max_normalized_difference)
+
+def find_min_spread_batch(call_premium, call_strike, call_offsets, put_premium, put_strike, put_offsets,
+                          max_normalized_difference, num_threads: int = 0) -> dict:
+    """
+    Best strangle of many tickers at once, from flat contract columns and per-ticker offsets.
+    Tickers are searched one after another; num_threads is accepted for compatibility.
+    """
+    call_premium, call_strike, put_premium, put_strike, max_normalized_difference = (
+        np.ascontiguousarray(values, dtype=np.float64).ravel()
+        for values in (call_premium, call_strike, put_premium, put_strike, max_normalized_difference)
+    )
+    call_offsets = np.ascontiguousarray(call_offsets, dtype=np.int64).ravel()
+    put_offsets = np.ascontiguousarray(put_offsets, dtype=np.int64).ravel()
+
+    num_tickers = len(max_normalized_difference)
+    if len(call_offsets) != num_tickers + 1 or len(put_offsets) != num_tickers + 1:
+        raise ValueError("offsets must have one more entry than there are tickers")
+    if len(call_premium) != len(call_strike) or len(put_premium) != len(put_strike):
+        raise ValueError("premium and strike columns must have the same length")
+    if num_tickers and ((call_offsets < 0).any() or (np.diff(call_offsets) < 0).any() or
+                        (put_offsets < 0).any() or (np.diff(put_offsets) < 0).any()):
+        raise ValueError("offsets must be non-negative and non-decreasing")
+    if call_offsets[num_tickers] > len(call_premium) or put_offsets[num_tickers] > len(put_premium):
+        raise ValueError("offsets run past the end of the contract columns")
+
+    winners = {'call_index': np.full(num_tickers, -1, dtype=np.int64),
+               'put_index': np.full(num_tickers, -1, dtype=np.int64)}
+    fields = ('strangle_costs', 'upper_breakeven', 'lower_breakeven', 'breakeven_difference', 'normalized_difference')
+    for name in fields:
+        winners[name] = np.full(num_tickers, np.nan)
+
+    for t in range(num_tickers):
+        if not max_normalized_difference[t] > 0:
+            continue
+        calls = slice(call_offsets[t], call_offsets[t + 1])
+        puts = slice(put_offsets[t], put_offsets[t + 1])
+        pair = _best_pair(call_premium[calls], call_strike[calls], put_premium[puts], put_strike[puts],
+                          max_normalized_difference[t])
+        if pair is None:
+            continue
+        i, j = pair
+        values = _pair_fields(float(call_premium[calls][i]), float(call_strike[calls][i]),
+                              float(put_premium[puts][j]), float(put_strike[puts][j]))
+        winners['call_index'][t], winners['put_index'][t] = i, j
+        for name, value in zip(fields, values[:4] + values[5:]):
+            winners[name][t] = value
+    return winners
+
+def batch_instruction_set() -> str:
+    """Instruction set the batched search dispatches to on this CPU"""
+    return BACKEND
+
+# --- Black-Scholes -----------------------------------------------------------------------
+
+def _normal_cdf(z: np.ndarray) -> np.ndarray:
+    return 0.5 * _erfc(-z * INV_SQRT_2)
+
+def _normal_pdf(z: np.ndarray) -> np.ndarray:
+    return INV_SQRT_2PI * np.exp(-0.5 * z * z)
+
+def _valid_inputs(stock_price: np.ndarray, strike_price: np.ndarray, years: np.ndarray) -> np.ndarray:
+    return (np.isfinite(stock_price) & np.isfinite(strike_price) & np.isfinite(years) &
+            (stock_price > 0) & (strike_price > 0) & (years > 0))
+
+def _price_and_vega(stock_price, strike_price, sigma, years, is_call, discount) -> tuple:
+    sqrt_t = np.sqrt(years)
+    sigma_sqrt_t = sigma * sqrt_t
+    d_1 = (np.log(stock_price / (strike_price * discount)) + 0.5 * sigma_sqrt_t * sigma_sqrt_t) / sigma_sqrt_t
+    d_2 = d_1 - sigma_sqrt_t
+    price = np.where(
+        is_call,
+        stock_price * _normal_cdf(d_1) - strike_price * discount * _normal_cdf(d_2),
+        strike_price * discount * _normal_cdf(-d_2) - stock_price * _normal_cdf(-d_1),
+    )
+    return price, stock_price * _normal_pdf(d_1) * sqrt_t
+
+def greeks(stock_price, strike_price, implied_volatility, seconds_to_expiration, is_call,
+           rate: float = 0.0) -> dict:
+    """Per-share delta, gamma, vega (per vol point) and theta (per day) for arrays of contracts"""
+    stock_price, strike_price, implied_volatility, seconds_to_expiration = (
+        np.asarray(values, dtype=np.float64).ravel()
+        for values in (stock_price, strike_price, implied_volatility, seconds_to_expiration)
+    )
+    is_call = np.asarray(is_call).astype(np.uint8).ravel() != 0
+    _same_length('greeks', stock_price, strike_price, implied_volatility, seconds_to_expiration, is_call)
+
+    years = seconds_to_expiration / SECONDS_PER_YEAR
+    valid = (_valid_inputs(stock_price, strike_price, years) & (implied_volatility > 0) &
+             np.isfinite(implied_volatility))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        sqrt_t = np.sqrt(years)
+        sigma_sqrt_t = implied_volatility * sqrt_t
+        discount = np.exp(-rate * years)
+        d_1 = (np.log(stock_price / strike_price) +
+               (rate + 0.5 * implied_volatility * implied_volatility) * years) / sigma_sqrt_t
+        d_2 = d_1 - sigma_sqrt_t
+        density = _normal_pdf(d_1)
+
+        delta = np.where(is_call, _normal_cdf(d_1), _normal_cdf(d_1) - 1.0)
+        gamma = density / (stock_price * sigma_sqrt_t)
+        vega = stock_price * density * sqrt_t / 100.0
+
+        decay = -stock_price * density * implied_volatility / (2.0 * sqrt_t)
+        carry = rate * strike_price * discount
+        theta = np.where(is_call, decay - carry * _normal_cdf(d_2), decay + carry * _normal_cdf(-d_2)) / 365.0
+
+    return {name: np.where(valid, values, np.nan)
+            for name, values in (('delta', delta), ('gamma', gamma), ('vega', vega), ('theta', theta))}
+
+def implied_volatility(premium, stock_price, strike_price, seconds_to_expiration, is_call,
+                       rate: float = 0.0) -> np.ndarray:
+    """Implied volatility solved from premium for arrays of contracts (NaN where none exists)"""
+    premium, stock_price, strike_price, seconds_to_expiration = (
+        np.asarray(values, dtype=np.float64).ravel()
+        for values in (premium, stock_price, strike_price, seconds_to_expiration)
+    )
+    is_call = np.asarray(is_call).astype(np.uint8).ravel() != 0
+    _same_length('implied_volatility', premium, stock_price, strike_price, seconds_to_expiration, is_call)
+
+    result = np.full(len(premium), np.nan)
+    years = seconds_to_expiration / SECONDS_PER_YEAR
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # A premium outside the no-arbitrage range has no volatility that explains it
+        discount = np.exp(-rate * years)
+        intrinsic = np.where(is_call, np.maximum(stock_price - strike_price * discount, 0.0),
+                             np.maximum(strike_price * discount - stock_price, 0.0))
+        upper = np.where(is_call, stock_price, strike_price * discount)
+        solvable = (_valid_inputs(stock_price, strike_price, years) & np.isfinite(premium) &
+                    math.isfinite(rate) & (premium > intrinsic) & (premium < upper))
+
+        # The safeguarded Newton iteration of greeks.cpp, run on every unsolved contract at
+        # once; each one leaves the working set as soon as it converges or gives up
+        index = np.flatnonzero(solvable)
+        premium, stock_price, strike_price = premium[index], stock_price[index], strike_price[index]
+        years, is_call, discount = years[index], is_call[index], discount[index]
+        sigma = np.minimum(np.maximum(SQRT_2PI / np.sqrt(years) * premium / stock_price, 0.05), 3.0)
+        low = np.zeros(len(index))
+        high = np.full(len(index), np.inf)
+        tolerance = 1e-10 * premium + 1e-14
+
+        for _ in range(100):
+            if not len(index):
+                break
+            price, vega = _price_and_vega(stock_price, strike_price, sigma, years, is_call, discount)
+            error = price - premium
+            converged = np.abs(error) <= tolerance
+            result[index[converged]] = sigma[converged]
+
+            # The price rises with volatility, so the sign of the error narrows the bracket
+            high = np.where(error > 0, sigma, high)
+            low = np.where(error > 0, low, sigma)
+
+            # Newton where it stays inside the bracket; otherwise bisect, or double while
+            # there is no upper end yet
+            newton = sigma - error / vega
+            next_sigma = np.where(
+                np.isinf(high),
+                np.where(vega > 0, np.where(2.0 * sigma < newton, 2.0 * sigma, newton), 2.0 * sigma),
+                np.where(~(vega > 0) | ~((newton > low) & (newton < high)), 0.5 * (low + high), newton),
+            )
+            bracketed = ~converged & (high - low <= 1e-12 * sigma)
+            result[index[bracketed]] = 0.5 * (low + high)[bracketed]
+            gave_up = ~converged & ~bracketed & (low > 100.0)  # beyond 10,000% volatility
+
+            keep = ~(converged | bracketed | gave_up)
+            index, sigma = index[keep], next_sigma[keep]
+            low, high, tolerance = low[keep], high[keep], tolerance[keep]
+            premium, stock_price, strike_price = premium[keep], stock_price[keep], strike_price[keep]
+            years, is_call, discount = years[keep], is_call[keep], discount[keep]
+    return result
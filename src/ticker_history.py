@@ -0,0 +1,160 @@
+# ticker_history.py
+
+import os
+import json
+import logging
+import statistics
+from typing import Dict, List, Optional
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Per-ticker measurements from earlier runs, next to tickers.json
+DEFAULT_HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ticker_history.json')
+
+class TickerHistory:
+    """
+    What earlier runs learned about each ticker: how many chain pages it returned and
+    how long it held a concurrency slot (timed only when no request had to be retried).
+    Used to schedule the biggest jobs first.
+    The best normalized difference each ticker reached is kept for warm-starting the
+    search bound, and how often each ticker's best strangle made the cut, for ranking
+    tickers by expected value when a run has a deadline.
+
+    Times and hit rates are smoothed (exponentially weighted) so one slow run does not dominate.
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_FILE, smoothing: float = 0.5):
+        self.path = path
+        self.smoothing = smoothing
+        self.tickers: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_HISTORY_FILE) -> 'TickerHistory':
+        history = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    history.tickers = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Warning: ignoring unreadable ticker history {path}: {e}")
+        return history
+
+    def save(self) -> None:
+        # Write to a temporary file first so an interrupted save cannot corrupt the history
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(self.tickers, f, separators=(',', ':'), sort_keys=True)
+        os.replace(temporary_path, self.path)
+
+    def record(self, ticker: str, pages: int, seconds: Optional[float]) -> None:
+        # seconds is None when the fetch was not cleanly timed; the page count is still kept
+        entry = self.tickers.get(ticker)
+        if entry is None:
+            entry = self.tickers[ticker] = {'pages': pages, 'runs': 0}
+        entry['pages'] = pages
+        if seconds is not None:
+            if 'seconds' in entry:
+                seconds = self.smoothing * seconds + (1 - self.smoothing) * entry['seconds']
+            entry['seconds'] = round(seconds, 4)
+        entry['runs'] = entry.get('runs', 0) + 1
+
+    def record_best(self, ticker: str, normalized_difference: Optional[float]) -> None:
+        # None: the ticker produced nothing that beat the bound (pruned, or no usable contracts),
+        # so its best is unknown and the run counts as a miss
+        entry = self.tickers.get(ticker)
+        if entry is None:
+            return
+        hit = 0.0 if normalized_difference is None else 1.0
+        if 'hit_rate' in entry:
+            hit = self.smoothing * hit + (1 - self.smoothing) * entry['hit_rate']
+        entry['hit_rate'] = round(hit, 4)
+        if normalized_difference is None:
+            entry.pop('best', None)
+        else:
+            entry['best'] = round(normalized_difference, 6)
+
+    def warm_start_bound(self, tickers: List[str], top_n: int) -> Optional[float]:
+        # Last run's N-th best normalized difference among these tickers, if N are known
+        bests = sorted(self.tickers[t]['best'] for t in tickers if 'best' in self.tickers.get(t, {}))
+        return bests[top_n - 1] if top_n and len(bests) >= top_n else None
+
+    def seconds_per_page(self, tickers: List[str]) -> Optional[float]:
+        # Median processing time per chain page among these tickers, if any were timed
+        rates = [
+            self.tickers[t]['seconds'] / self.tickers[t]['pages'] for t in tickers
+            if 'seconds' in self.tickers.get(t, {}) and self.tickers[t].get('pages')
+        ]
+        return statistics.median(rates) if rates else None
+
+    def expected_seconds(self, ticker: str, default: Optional[float] = None,
+                         seconds_per_page: Optional[float] = None) -> Optional[float]:
+        # Measured time if there is one, else an estimate from the page count
+        entry = self.tickers.get(ticker)
+        if entry is None:
+            return default
+        if 'seconds' in entry:
+            return entry['seconds']
+        if entry.get('pages') and seconds_per_page is not None:
+            return entry['pages'] * seconds_per_page
+        return default
+
+    def longest_first(self, tickers: List[str]) -> List[str]:
+        """
+        Order tickers by expected processing time, longest first (LPT scheduling).
+
+        Starting the big chains early stops one late, huge ticker from stretching the run;
+        the many small ones then fill the remaining slots.  A ticker with a page count but
+        no timing is estimated at the median time per page, tickers with no history are
+        assumed to take the median known time, and ties go to the larger chain.
+        """
+        known = [self.tickers[t]['seconds'] for t in tickers if 'seconds' in self.tickers.get(t, {})]
+        default = statistics.median(known) if known else 0.0
+        seconds_per_page = self.seconds_per_page(tickers)
+
+        def pages(ticker: str) -> int:
+            return self.tickers.get(ticker, {}).get('pages', 0)
+
+        return sorted(tickers, key=lambda t: (-self.expected_seconds(t, default, seconds_per_page), -pages(t), t))
+
+    def hit_rate(self, ticker: str, default: float) -> float:
+        entry = self.tickers.get(ticker)
+        if entry is None:
+            return default
+        if 'hit_rate' in entry:
+            return entry['hit_rate']
+        return 1.0 if 'best' in entry else default
+
+    def most_valuable_first(self, tickers: List[str]) -> List[str]:
+        """
+        Order tickers by expected value per second of work, highest first, for runs that may
+        be cut short by a deadline.
+
+        A ticker's value is the chance it yields a reportable strangle (its smoothed hit rate)
+        divided by its expected processing time, so quick, reliable tickers come first and a
+        deadline cuts the least promising work.  Tickers with no history get the mean known
+        hit rate and the median known time; ties go to the better previous best.
+        """
+        known_rates = [self.tickers[t]['hit_rate'] for t in tickers if 'hit_rate' in self.tickers.get(t, {})]
+        default_rate = statistics.mean(known_rates) if known_rates else 0.5
+        known_seconds = [self.tickers[t]['seconds'] for t in tickers if 'seconds' in self.tickers.get(t, {})]
+        default_seconds = statistics.median(known_seconds) if known_seconds else 1.0
+        seconds_per_page = self.seconds_per_page(tickers)
+
+        def value(ticker: str) -> float:
+            seconds = max(self.expected_seconds(ticker, default_seconds, seconds_per_page), 1e-3)
+            return self.hit_rate(ticker, default_rate) / seconds
+
+        def best(ticker: str) -> float:
+            return self.tickers.get(ticker, {}).get('best', float('inf'))
+
+        return sorted(tickers, key=lambda t: (-value(t), best(t), t))
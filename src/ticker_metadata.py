@@ -0,0 +1,145 @@
+# ticker_metadata.py
+
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Configure basic logging.  show warning or higher for external modules.
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(message)s'
+)
+
+# Create a logger for this module
+logger = logging.getLogger(__name__)
+
+# Show info level logger events for this module
+logger.setLevel(logging.INFO)
+
+# Local store of reference data for the ticker universe, next to tickers.json
+DEFAULT_METADATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ticker_metadata.json')
+
+# Ticker ranges paged through concurrently when refreshing (ticker.gte <= symbol < ticker.lt)
+UNIVERSE_SHARDS = ['', 'B', 'D', 'F', 'I', 'L', 'N', 'Q', 'S', 'U', 'X', None]
+
+def short_company_name(name: str, max_words: int = 3) -> str:
+    # Reports show at most the first few words of a company name
+    return ' '.join(name.split()[:max_words])
+
+class TickerMetadata:
+    """
+    Compact local store of ticker reference data: name, type and primary exchange, plus the
+    date a ticker was first missing from the active listing (None while it is listed).
+
+    Stored as JSON with one short list per ticker (in the order of `fields`), written
+    atomically.  Scans read company names from here instead of calling the API per ticker.
+    """
+
+    fields = ('name', 'type', 'exchange', 'delisted')
+    listing_fields = fields[:3]
+
+    def __init__(self, path: str = DEFAULT_METADATA_FILE):
+        self.path = path
+        self.updated: Optional[str] = None
+        self.records: Dict[str, List[Optional[str]]] = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_METADATA_FILE) -> 'TickerMetadata':
+        store = cls(path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                stored_fields = tuple(data.get('fields', ()))
+                if stored_fields and cls.fields[:len(stored_fields)] == stored_fields:
+                    # Stores written before a field was added get None for it
+                    padding = [None] * (len(cls.fields) - len(stored_fields))
+                    store.records = {
+                        ticker: record + padding for ticker, record in data.get('tickers', {}).items()
+                    }
+                    store.updated = data.get('updated')
+            except (OSError, ValueError) as e:
+                logger.warning(f"Warning: ignoring unreadable ticker metadata {path}: {e}")
+        return store
+
+    def save(self) -> None:
+        data = {'fields': list(self.fields), 'updated': self.updated, 'tickers': self.records}
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'), sort_keys=True)
+        os.replace(temporary_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.records
+
+    def company_name(self, ticker: str) -> Optional[str]:
+        record = self.records.get(ticker)
+        if record is None or not record[0]:
+            return None
+        return short_company_name(record[0])
+
+    def update(self, records: Dict[str, List[Optional[str]]]) -> Tuple[int, int, int]:
+        """
+        Merge a fresh listing of the active universe (`listing_fields` per ticker), ticker by
+        ticker.  Returns (added, changed, removed).  New tickers are added, listed tickers whose
+        name, type or exchange moved are updated, and tickers missing from the listing are
+        marked delisted rather than dropped, so their names stay available.  A delisted ticker
+        that reappears counts as changed.
+        """
+        today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        added = changed = removed = 0
+        for ticker, listing in records.items():
+            record = list(listing) + [None]
+            current = self.records.get(ticker)
+            if current is None:
+                added += 1
+            elif current != record:
+                changed += 1
+            else:
+                continue
+            self.records[ticker] = record
+
+        for ticker, record in self.records.items():
+            if ticker not in records and record[3] is None:
+                record[3] = today
+                removed += 1
+
+        self.updated = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        return added, changed, removed
+
+async def refresh_universe(market_data_client, store: TickerMetadata, concurrency: int = 6) -> List[str]:
+    """
+    Page through the active stock listing in alphabetical shards concurrently, merge the
+    results into the metadata store and return the sorted list of active tickers.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    shard_params = []
+    for lower, upper in zip(UNIVERSE_SHARDS[:-1], UNIVERSE_SHARDS[1:]):
+        params = {"market": "stocks", "active": "true", "limit": 1000}
+        if lower:
+            params["ticker.gte"] = lower
+        if upper:
+            params["ticker.lt"] = upper
+        shard_params.append(params)
+
+    shards = await asyncio.gather(*(
+        market_data_client.list_tickers(params, semaphore=semaphore) for params in shard_params
+    ))
+
+    records = {}
+    for results in shards:
+        for item in results:
+            records[item['ticker']] = [item.get('name'), item.get('type'), item.get('primary_exchange')]
+
+    added, changed, removed = store.update(records)
+    logger.info(
+        f"Ticker universe: {len(records):,} active "
+        f"({added:,} added, {changed:,} changed, {removed:,} removed)"
+    )
+    return sorted(records)
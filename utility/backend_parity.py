@@ -0,0 +1,248 @@
+"""
+Check the pure-NumPy strangle_module backend (src/strangle_numpy.py) against the compiled
+one, function by function, then time the two side by side.
+
+    python3 utility/backend_parity.py                 # parity checks and benchmarks
+    python3 utility/backend_parity.py --no-benchmark  # parity checks only
+    python3 utility/backend_parity.py --size 200000   # larger analytics arrays
+
+Needs a build of the C++ module (see src/cpp/README.txt).  Exits with status 1 if any
+check fails.
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+import importlib
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+# Use the EdgeWalker modules in ../src
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(src_path)
+
+from lazy_imports import import_strangle_module
+
+SECONDS_PER_YEAR = 31536000.0
+
+def random_chain(rng: np.random.Generator, num_calls: int, num_puts: int) -> Tuple[np.ndarray, ...]:
+    # Strikes on a grid around the stock price, premiums rounded to the cent like quotes
+    price = rng.uniform(5, 500)
+    call_strike = np.round(price * rng.uniform(0.6, 1.6, num_calls), 1)
+    put_strike = np.round(price * rng.uniform(0.4, 1.4, num_puts), 1)
+    call_premium = np.round(price * rng.uniform(0.001, 0.2, num_calls), 2)
+    put_premium = np.round(price * rng.uniform(0.001, 0.2, num_puts), 2)
+    return call_premium, call_strike, put_premium, put_strike
+
+def analytics_inputs(rng: np.random.Generator, size: int) -> dict:
+    stock_price = rng.uniform(5, 500, size)
+    half_width = stock_price * rng.uniform(0.01, 0.4, size)
+    seconds = rng.integers(-3600, 2 * 31536000, size).astype(np.float64)
+    implied_volatility = rng.uniform(0.05, 2.0, size)
+    implied_volatility[::97] = np.nan  # contracts without a quoted volatility
+    return {
+        'stock_price': stock_price,
+        'upper_breakeven': stock_price + half_width,
+        'lower_breakeven': stock_price - half_width * rng.uniform(0.5, 1.5, size),
+        'implied_volatility': implied_volatility,
+        'seconds_to_expiration': seconds,
+    }
+
+class Parity:
+    def __init__(self):
+        self.failures: List[str] = []
+
+    def check(self, name: str, native, numpy_result, rtol: float = 0.0, atol: float = 1e-300) -> None:
+        # Passes when every difference is within atol + rtol * |native| (by default, results
+        # that underflow to subnormals only need to agree absolutely)
+        native, numpy_result = np.asarray(native, dtype=np.float64), np.asarray(numpy_result, dtype=np.float64)
+        same_nan = np.array_equal(np.isnan(native), np.isnan(numpy_result))
+        both = ~np.isnan(native) & ~np.isnan(numpy_result)
+        difference = np.abs(native[both] - numpy_result[both])
+        scale = np.maximum(np.abs(native[both]), 1e-300)
+        worst = float((difference / scale).max()) if difference.size else 0.0
+        worst_absolute = float(difference.max()) if difference.size else 0.0
+        exact = int((native[both] == numpy_result[both]).sum())
+        ok = same_nan and bool(np.all(difference <= atol + rtol * np.abs(native[both])))
+        print(f"  {'ok  ' if ok else 'FAIL'} {name:<46} {exact:>9,} of {both.sum():>9,} identical, "
+              f"worst difference {worst:.2e} relative, {worst_absolute:.2e} absolute"
+              f"{'' if same_nan else ', NaN masks differ'}")
+        if not ok:
+            self.failures.append(name)
+
+def check_parity(native, numpy_backend, rng: np.random.Generator, size: int) -> Parity:
+    parity = Parity()
+
+    print("Strangle analytics")
+    inputs = analytics_inputs(rng, size)
+    for name, arguments in (
+        ('escape_ratio', ('stock_price', 'upper_breakeven', 'lower_breakeven')),
+        ('probability_of_profit', ('stock_price', 'upper_breakeven', 'lower_breakeven',
+                                   'implied_volatility', 'seconds_to_expiration')),
+    ):
+        values = [inputs[argument] for argument in arguments]
+        # erf differs from the C library's in the last bit, and 1 - erf cancels, so
+        # probabilities are compared absolutely (to a few units in the last place of 1)
+        parity.check(name, getattr(native, name)(*values), getattr(numpy_backend, name)(*values),
+                     atol=1e-15 if name == 'probability_of_profit' else 1e-300)
+
+    # Expected gain sums payoff terms of up to ~$50,000 into results that can be near zero.
+    # The default build (STRANGLE_NATIVE=ON, -march=native) fuses multiply-adds, which moves
+    # results by a few 1e-12 relative and a few 1e-11 dollars absolute; allow 1e-11 and 1e-10.
+    gain_inputs = (inputs['stock_price'], inputs['upper_breakeven'], inputs['lower_breakeven'],
+                   inputs['implied_volatility'], inputs['seconds_to_expiration'],
+                   rng.uniform(0.1, 20, size), 0.0216)
+    parity.check('expected_gain', native.expected_gain(*gain_inputs), numpy_backend.expected_gain(*gain_inputs),
+                 rtol=1e-11, atol=1e-10)
+
+    print("Pair search")
+    for num_calls, num_puts, bound in ((1, 1, np.inf), (40, 35, np.inf), (300, 280, 0.05), (900, 1100, 0.02)):
+        mismatches = 0
+        for trial in range(20):
+            chain = random_chain(rng, num_calls, num_puts)
+            results = []
+            for backend in (native, numpy_backend):
+                calls = [backend.Option(p, s, 0.3, 'call') for p, s in zip(chain[0].tolist(), chain[1].tolist())]
+                puts = [backend.Option(p, s, 0.3, 'put') for p, s in zip(chain[2].tolist(), chain[3].tolist())]
+                if np.isinf(bound):
+                    best = backend.find_min_spread(calls, puts)
+                else:
+                    best = backend.find_min_spread_bounded(calls, puts, bound)
+                results.append(None if best is None else (
+                    best.call.strike_price, best.call.premium, best.put.strike_price, best.put.premium,
+                    best.strangle_costs, best.upper_breakeven, best.lower_breakeven,
+                    best.breakeven_difference, best.average_strike_price, best.normalized_difference))
+            if results[0] != results[1]:
+                mismatches += 1
+        ok = mismatches == 0
+        print(f"  {'ok  ' if ok else 'FAIL'} find_min_spread {num_calls:>4} x {num_puts:>4}, bound {bound:<4}"
+              f"    {20 - mismatches:>2} of 20 chains identical")
+        if not ok:
+            parity.failures.append(f"find_min_spread {num_calls}x{num_puts}")
+
+    num_tickers = 200
+    chains = [random_chain(rng, rng.integers(0, 300), rng.integers(0, 300)) for _ in range(num_tickers)]
+    batch = (
+        np.concatenate([chain[0] for chain in chains]), np.concatenate([chain[1] for chain in chains]),
+        np.concatenate([[0], np.cumsum([len(chain[0]) for chain in chains])]),
+        np.concatenate([chain[2] for chain in chains]), np.concatenate([chain[3] for chain in chains]),
+        np.concatenate([[0], np.cumsum([len(chain[2]) for chain in chains])]),
+        np.where(rng.random(num_tickers) < 0.5, np.inf, rng.uniform(0.0, 0.05, num_tickers)),
+    )
+    native_winners, numpy_winners = native.find_min_spread_batch(*batch), numpy_backend.find_min_spread_batch(*batch)
+    for name in native_winners:
+        parity.check(f"find_min_spread_batch.{name}", native_winners[name], numpy_winners[name])
+
+    print("Black-Scholes")
+    stock_price = rng.uniform(5, 500, size)
+    strike_price = stock_price * rng.uniform(0.5, 1.5, size)
+    seconds = rng.uniform(3600, 2 * SECONDS_PER_YEAR, size)
+    volatility = rng.uniform(0.05, 2.5, size)
+    is_call = rng.random(size) < 0.5
+    native_greeks = native.greeks(stock_price, strike_price, volatility, seconds, is_call, 0.04)
+    numpy_greeks = numpy_backend.greeks(stock_price, strike_price, volatility, seconds, is_call, 0.04)
+    # (theta sums terms that can cancel to near zero, so it also gets an absolute floor)
+    for name in native_greeks:
+        parity.check(f"greeks.{name}", native_greeks[name], numpy_greeks[name], rtol=1e-12, atol=1e-14)
+
+    # Premiums from known volatilities, plus some no volatility can explain.  The two solvers
+    # may stop at different points inside the price tolerance (1e-10 of the premium), which
+    # moves the volatility by that over vega, hence the looser bounds
+    premium = black_scholes_premiums(stock_price, strike_price, volatility, seconds, is_call)
+    premium[::53] *= -1
+    parity.check('implied_volatility',
+                 native.implied_volatility(premium, stock_price, strike_price, seconds, is_call),
+                 numpy_backend.implied_volatility(premium, stock_price, strike_price, seconds, is_call),
+                 rtol=1e-6, atol=1e-6)
+    return parity
+
+def black_scholes_premiums(stock_price: np.ndarray, strike_price: np.ndarray, volatility: np.ndarray,
+                           seconds: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    # Independent of both backends, so the solvers are tested against known volatilities
+    cdf = lambda z: 0.5 * math.erfc(-z / math.sqrt(2))
+    premiums = []
+    for s, k, v, t, c in zip(stock_price.tolist(), strike_price.tolist(), volatility.tolist(),
+                             (seconds / SECONDS_PER_YEAR).tolist(), is_call.tolist()):
+        sigma_sqrt_t = v * math.sqrt(t)
+        d_1 = (math.log(s / k) + 0.5 * sigma_sqrt_t ** 2) / sigma_sqrt_t
+        d_2 = d_1 - sigma_sqrt_t
+        premiums.append(s * cdf(d_1) - k * cdf(d_2) if c else k * cdf(-d_2) - s * cdf(-d_1))
+    return np.array(premiums)
+
+def best_of(function: Callable, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def benchmark(native, numpy_backend, rng: np.random.Generator, size: int) -> None:
+    inputs = analytics_inputs(rng, size)
+    analytics = (inputs['stock_price'], inputs['upper_breakeven'], inputs['lower_breakeven'],
+                 inputs['implied_volatility'], inputs['seconds_to_expiration'])
+    chains = [random_chain(rng, 250, 250) for _ in range(100)]
+    option_chains = {
+        backend: [([backend.Option(p, s, 0.3, 'call') for p, s in zip(c[0].tolist(), c[1].tolist())],
+                   [backend.Option(p, s, 0.3, 'put') for p, s in zip(c[2].tolist(), c[3].tolist())]) for c in chains]
+        for backend in (native, numpy_backend)
+    }
+    batch = (
+        np.concatenate([c[0] for c in chains]), np.concatenate([c[1] for c in chains]),
+        np.arange(0, 250 * 101, 250, dtype=np.int64),
+        np.concatenate([c[2] for c in chains]), np.concatenate([c[3] for c in chains]),
+        np.arange(0, 250 * 101, 250, dtype=np.int64),
+        np.full(100, 0.05),
+    )
+    stock_price = rng.uniform(5, 500, 20000)
+    strike_price = stock_price * rng.uniform(0.5, 1.5, 20000)
+    seconds = rng.uniform(3600, SECONDS_PER_YEAR, 20000)
+    is_call = rng.random(20000) < 0.5
+    volatility = rng.uniform(0.1, 1.0, 20000)
+    premium = black_scholes_premiums(stock_price, strike_price, volatility, seconds, is_call)
+
+    cases = [
+        (f"probability_of_profit ({size:,})", lambda b: b.probability_of_profit(*analytics)),
+        (f"expected_gain ({size:,})", lambda b: b.expected_gain(*analytics[:1], analytics[1], analytics[2],
+                                                                analytics[3], analytics[4], 5.0, 0.0216)),
+        (f"escape_ratio ({size:,})", lambda b: b.escape_ratio(*analytics[:3])),
+        ("find_min_spread (100 x 250x250)", lambda b: [b.find_min_spread(c, p) for c, p in option_chains[b]]),
+        ("find_min_spread_bounded (100 x 250x250)",
+         lambda b: [b.find_min_spread_bounded(c, p, 0.05) for c, p in option_chains[b]]),
+        ("find_min_spread_batch (100 x 250x250)", lambda b: b.find_min_spread_batch(*batch, 1)),
+        ("greeks (20,000)", lambda b: b.greeks(stock_price, strike_price, volatility, seconds, is_call)),
+        ("implied_volatility (20,000)", lambda b: b.implied_volatility(premium, stock_price, strike_price, seconds, is_call)),
+    ]
+    print(f"\n{'':<42}{'native':>12}{'numpy':>12}{'native speedup':>16}")
+    for name, case in cases:
+        native_seconds = best_of(lambda: case(native))
+        numpy_seconds = best_of(lambda: case(numpy_backend), repeats=3)
+        print(f"{name:<42}{native_seconds * 1000:>9.2f} ms{numpy_seconds * 1000:>9.2f} ms"
+              f"{numpy_seconds / native_seconds:>15.1f}x")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Parity checks and benchmarks of the strangle_module backends')
+    parser.add_argument('--size', type=int, default=50000, help='strangles per analytics array')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-benchmark', action='store_true', help='only run the parity checks')
+    args = parser.parse_args(argv)
+
+    native = import_strangle_module('native')
+    numpy_backend = importlib.import_module('strangle_numpy')
+    rng = np.random.default_rng(args.seed)
+
+    parity = check_parity(native, numpy_backend, rng, args.size)
+    if parity.failures:
+        print(f"\n{len(parity.failures)} parity failures: {', '.join(parity.failures)}")
+    else:
+        print("\nThe NumPy backend matches the native module.")
+
+    if not args.no_benchmark:
+        benchmark(native, numpy_backend, rng, args.size)
+    return 1 if parity.failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+"""
+Local stand-in for the parts of the Polygon REST API that EdgeWalker uses, for load and
+fault-injection testing without spending API quota.
+
+Serves
+    /v3/snapshot/options/{ticker}                   options chain snapshot, next_url pagination
+    /v3/reference/tickers                           ticker listing, next_url pagination
+    /v3/reference/tickers/{ticker}                  ticker details
+    /v2/snapshot/locale/us/markets/stocks/tickers   whole-market stock snapshot
+    /stocks                                         websocket trade feed (T.* subscriptions)
+    /stats                                          request and fault counters
+
+Chains are synthetic (deterministic per ticker) or recorded: with --recorded DIR, a file
+DIR/{TICKER}.json (or .json.gz) holding a list of snapshot results is served instead.
+
+Example: serve the tickers.json universe with realistic latency and a few faults, then
+point a scan at it (any API key is accepted).
+
+    python3 utility/polygon_standin.py --latency lognormal:0.08,0.6 --burst-every 30 \\
+        --burst-length 2 --drop-rate 0.005 --slow-rate 0.01 --slow-seconds 4
+    POLYGONIO_API_KEY=test python3 src/main.py --base-url http://127.0.0.1:8123
+
+The /stocks websocket streams random-walk trades for subscribed tickers at --trades-per-second
+on each connection, to load-test the dashboard (--socket-lifetime drops connections at random
+to exercise reconnects):
+
+    POLYGON_WS_URL=ws://127.0.0.1:8123/stocks python3 src/dashboard.py
+"""
+
+import os
+import sys
+import gzip
+import json
+import math
+import time
+import zlib
+import base64
+import random
+import asyncio
+import argparse
+from collections import Counter
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+# Use the EdgeWalker modules in ../src
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(src_path)
+
+from ticker_metadata import DEFAULT_METADATA_FILE, TickerMetadata
+
+tickers_file = os.path.join(src_path, "tickers.json")
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Latency distribution from a spec: fixed:SECONDS, uniform:LOW,HIGH or
+    lognormal:MEDIAN,SIGMA (a long right tail, like real API latency).
+    """
+    kind, _, values = spec.partition(':')
+    numbers = [float(v) for v in values.split(',')] if values else []
+    if kind == 'fixed':
+        return lambda rng: numbers[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(numbers[0], numbers[1])
+    if kind == 'lognormal':
+        return lambda rng: rng.lognormvariate(math.log(numbers[0]), numbers[1])
+    raise argparse.ArgumentTypeError(f"unknown latency distribution: {spec}")
+
+def _normal_cdf(x: float) -> float:
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+def _black_scholes(call: bool, stock_price: float, strike: float, years: float, iv: float) -> float:
+    if years <= 0 or iv <= 0:
+        return max(0.0, (stock_price - strike) if call else (strike - stock_price))
+    d1 = (math.log(stock_price / strike) + 0.5 * iv * iv * years) / (iv * math.sqrt(years))
+    d2 = d1 - iv * math.sqrt(years)
+    if call:
+        return stock_price * _normal_cdf(d1) - strike * _normal_cdf(d2)
+    return strike * _normal_cdf(-d2) - stock_price * _normal_cdf(-d1)
+
+def _ticker_rng(ticker: str, salt: int) -> random.Random:
+    # Stable across runs and processes (str hashes are salted per process)
+    return random.Random(zlib.crc32(ticker.encode()) ^ salt)
+
+def stock_price(ticker: str, seed: int) -> float:
+    return round(_ticker_rng(ticker, seed).lognormvariate(math.log(40), 1.0), 2)
+
+def synthetic_chain(ticker: str, seed: int, as_of: date) -> List[dict]:
+    """A plausible options chain: monthly and weekly expirations, a strike ladder, BS prices."""
+    rng = _ticker_rng(ticker, seed)
+    price = stock_price(ticker, seed)
+    base_iv = rng.uniform(0.2, 1.2)
+    step = 0.5 if price < 25 else 1.0 if price < 100 else 5.0 if price < 500 else 10.0
+
+    # Fridays: weeklies for two months, then third-Friday monthlies for a year and a half
+    first_friday = as_of + timedelta(days=(4 - as_of.weekday()) % 7 or 7)
+    expirations = [first_friday + timedelta(weeks=w) for w in range(9)]
+    for months_ahead in range(3, 19):
+        year = as_of.year + (as_of.month - 1 + months_ahead) // 12
+        month = (as_of.month - 1 + months_ahead) % 12 + 1
+        first = date(year, month, 1)
+        expirations.append(first + timedelta(days=(4 - first.weekday()) % 7 + 14))
+
+    strikes = []
+    strike = max(step, round(price * 0.5 / step) * step)
+    while strike <= price * 1.5:
+        strikes.append(round(strike, 2))
+        strike += step
+
+    results = []
+    for expiration in expirations:
+        years = (expiration - as_of).days / 365.0
+        for strike in strikes:
+            for contract_type in ('call', 'put'):
+                # Volatility smile plus noise
+                iv = base_iv * (1 + 0.4 * abs(math.log(strike / price))) * rng.uniform(0.95, 1.05)
+                value = _black_scholes(contract_type == 'call', price, strike, years, iv)
+                half_spread = max(0.01, value * rng.uniform(0.01, 0.08))
+                bid = round(max(0.0, value - half_spread), 2)
+                ask = round(value + half_spread, 2)
+                code = f"{expiration:%y%m%d}{'C' if contract_type == 'call' else 'P'}{int(round(strike * 1000)):08d}"
+                result = {
+                    'details': {
+                        'contract_type': contract_type,
+                        'exercise_style': 'american',
+                        'expiration_date': expiration.isoformat(),
+                        'shares_per_contract': 100,
+                        'strike_price': strike,
+                        'ticker': f"O:{ticker}{code}",
+                    },
+                    'implied_volatility': round(iv, 4) if rng.random() > 0.03 else None,
+                    'open_interest': int(rng.expovariate(1 / 400)),
+                    'last_quote': {'bid': bid, 'ask': ask, 'midpoint': round((bid + ask) / 2, 3)},
+                    'underlying_asset': {'price': price, 'ticker': ticker},
+                }
+                if rng.random() < 0.8:
+                    result['details']['fmv'] = round(value, 3)
+                results.append(result)
+    return results
+
+# Query parameters the options snapshot can filter on: field path, comparison
+OPTION_FILTERS = {
+    'strike_price': (('details', 'strike_price'), float),
+    'expiration_date': (('details', 'expiration_date'), str),
+    'contract_type': (('details', 'contract_type'), str),
+}
+COMPARE = {
+    '': lambda a, b: a == b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+}
+
+def _encode_cursor(offset: int, query: Dict[str, str]) -> str:
+    payload = json.dumps({'offset': offset, 'query': query}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def _decode_cursor(cursor: str) -> dict:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+class FaultPlan:
+    """Latency and failures injected into every response."""
+
+    def __init__(self, latency: Callable[[random.Random], float], burst_every: float, burst_length: float,
+                 rate_limit_rate: float, drop_rate: float, error_rate: float,
+                 slow_rate: float, slow_seconds: float, seed: int):
+        self.latency = latency
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.rate_limit_rate = rate_limit_rate
+        self.drop_rate = drop_rate
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.rng = random.Random(seed)
+        self.started = time.monotonic()
+
+    def in_burst(self) -> bool:
+        # 429 for everyone during the first burst_length seconds of every burst_every seconds
+        if not self.burst_every:
+            return False
+        return (time.monotonic() - self.started) % self.burst_every < self.burst_length
+
+class StandIn:
+    def __init__(self, universe: List[str], faults: FaultPlan, seed: int = 0,
+                 recorded: Optional[str] = None, metadata: Optional[TickerMetadata] = None,
+                 page_limit: int = 250, trades_per_second: float = 50.0, socket_lifetime: float = 0.0):
+        self.universe = sorted(universe)
+        self.faults = faults
+        self.seed = seed
+        self.recorded = recorded
+        self.metadata = metadata
+        self.page_limit = page_limit
+        self.trades_per_second = trades_per_second
+        self.socket_lifetime = socket_lifetime
+        self.as_of = date.today()
+        self.stats = Counter()
+        self._chain = lru_cache(maxsize=512)(self._load_chain)
+
+    def _load_chain(self, ticker: str) -> List[dict]:
+        if self.recorded:
+            for name in (f"{ticker}.json", f"{ticker}.json.gz"):
+                path = os.path.join(self.recorded, name)
+                if os.path.exists(path):
+                    opener = gzip.open if name.endswith('.gz') else open
+                    with opener(path, 'rt') as f:
+                        data = json.load(f)
+                    return data['results'] if isinstance(data, dict) else data
+            return []
+        return synthetic_chain(ticker, self.seed, self.as_of)
+
+    # --- fault injection -------------------------------------------------------------
+
+    @web.middleware
+    async def inject_faults(self, request: web.Request, handler):
+        if request.path in ('/stats', '/stocks'):
+            return await handler(request)
+        self.stats['requests'] += 1
+        faults = self.faults
+
+        await asyncio.sleep(faults.latency(faults.rng))
+
+        if 'apiKey' not in request.query:
+            self.stats['401'] += 1
+            return web.json_response({'status': 'ERROR', 'error': 'Unknown API Key'}, status=401)
+        if faults.in_burst() or faults.rng.random() < faults.rate_limit_rate:
+            self.stats['429'] += 1
+            return web.json_response(
+                {'status': 'ERROR', 'error': 'You have exceeded the maximum requests per minute.'},
+                status=429, headers={'Retry-After': '1'}
+            )
+        if faults.rng.random() < faults.error_rate:
+            self.stats['5xx'] += 1
+            return web.json_response({'status': 'ERROR', 'error': 'Internal error'}, status=502)
+        if faults.rng.random() < faults.drop_rate:
+            # Drop the connection without answering
+            self.stats['dropped'] += 1
+            request.transport.close()
+            raise asyncio.CancelledError()
+        if faults.rng.random() < faults.slow_rate:
+            self.stats['slow'] += 1
+            await asyncio.sleep(faults.slow_seconds)
+
+        response = await handler(request)
+        self.stats['200'] += 1
+        return response
+
+    def _respond(self, request: web.Request, data: dict) -> web.Response:
+        # Compress like the real API when the client asks for it
+        body = json.dumps(data, separators=(',', ':')).encode()
+        self.stats['bytes_decoded'] += len(body)
+        headers = {'Content-Type': 'application/json'}
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        self.stats['bytes_sent'] += len(body)
+        return web.Response(body=body, headers=headers)
+
+    def _next_url(self, request: web.Request, offset: int, query: Dict[str, str]) -> str:
+        return f"{request.url.origin()}{request.path}?cursor={_encode_cursor(offset, query)}"
+
+    @staticmethod
+    def _query(request: web.Request) -> Dict[str, str]:
+        return {key: value for key, value in request.query.items() if key not in ('apiKey', 'cursor')}
+
+    # --- endpoints -------------------------------------------------------------------
+
+    async def options_snapshot(self, request: web.Request) -> web.Response:
+        ticker = request.match_info['ticker']
+        query, offset = self._query(request), 0
+        if 'cursor' in request.query:
+            cursor = _decode_cursor(request.query['cursor'])
+            query, offset = cursor['query'], cursor['offset']
+
+        results = self._chain(ticker)
+        for key, value in query.items():
+            field, _, op = key.partition('.')
+            if field not in OPTION_FILTERS or op not in COMPARE:
+                continue
+            (outer, inner), kind = OPTION_FILTERS[field]
+            threshold, compare = kind(value), COMPARE[op]
+            results = [r for r in results if compare(r[outer][inner], threshold)]
+
+        limit = min(int(query.get('limit', 10)), self.page_limit)
+        page = results[offset:offset + limit]
+        data = {'status': 'OK', 'request_id': f"standin-{self.stats['requests']}", 'results': page}
+        if offset + limit < len(results):
+            data['next_url'] = self._next_url(request, offset + limit, query)
+        self.stats['option_pages'] += 1
+        return self._respond(request, data)
+
+    def _details(self, ticker: str) -> dict:
+        record = self.metadata.records.get(ticker) if self.metadata is not None else None
+        name, kind, exchange = record[:3] if record else (f"{ticker} Holdings Inc.", 'CS', 'XNAS')
+        return {'ticker': ticker, 'name': name, 'type': kind, 'primary_exchange': exchange,
+                'market': 'stocks', 'active': True}
+
+    async def ticker_listing(self, request: web.Request) -> web.Response:
+        query, offset = self._query(request), 0
+        if 'cursor' in request.query:
+            cursor = _decode_cursor(request.query['cursor'])
+            query, offset = cursor['query'], cursor['offset']
+
+        tickers = self.universe
+        if 'ticker.gte' in query:
+            tickers = [t for t in tickers if t >= query['ticker.gte']]
+        if 'ticker.lt' in query:
+            tickers = [t for t in tickers if t < query['ticker.lt']]
+
+        limit = min(int(query.get('limit', 100)), 1000)
+        data = {'status': 'OK', 'results': [self._details(t) for t in tickers[offset:offset + limit]]}
+        if offset + limit < len(tickers):
+            data['next_url'] = self._next_url(request, offset + limit, query)
+        return self._respond(request, data)
+
+    async def ticker_details(self, request: web.Request) -> web.Response:
+        return self._respond(request, {'status': 'OK', 'results': self._details(request.match_info['ticker'])})
+
+    async def stock_snapshot(self, request: web.Request) -> web.Response:
+        tickers = []
+        for ticker in self.universe:
+            price = stock_price(ticker, self.seed)
+            tickers.append({'ticker': ticker, 'lastTrade': {'p': price}, 'day': {'c': price}, 'prevDay': {'c': price}})
+        return self._respond(request, {'status': 'OK', 'count': len(tickers), 'tickers': tickers})
+
+    async def trade_feed(self, request: web.Request) -> web.WebSocketResponse:
+        # Polygon's stocks socket protocol: connected, auth, subscribe, then batches of trade events
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json([{'ev': 'status', 'status': 'connected', 'message': 'Connected Successfully'}])
+        self.stats['sockets'] += 1
+        prices: Dict[str, float] = {}
+        rng = random.Random(self.seed)
+
+        async def expire():
+            # Each connection is dropped after a random lifetime, to exercise reconnects
+            lifetime = random.Random(f"{self.seed}-{self.stats['sockets']}").expovariate(1 / self.socket_lifetime)
+            await asyncio.sleep(lifetime)
+            self.stats['sockets_dropped'] += 1
+            await ws.close(code=1012, message=b'stand-in restart')
+
+        async def stream():
+            # Trades go out in 10 ms batches, like the real feed's frames
+            interval, owed = 0.01, 0.0
+            while True:
+                await asyncio.sleep(interval)
+                owed += self.trades_per_second * interval
+                count = int(owed)
+                owed -= count
+                if not prices or not count:
+                    continue
+                now_ms = int(time.time() * 1000)
+                events = []
+                for ticker in rng.choices(list(prices), k=count):
+                    prices[ticker] = round(prices[ticker] * math.exp(rng.gauss(0, 0.0005)), 2)
+                    events.append({'ev': 'T', 'sym': ticker, 'p': prices[ticker],
+                                   's': rng.choice([1, 10, 100, 200]), 't': now_ms})
+                self.stats['trades'] += len(events)
+                await ws.send_str(json.dumps(events, separators=(',', ':')))
+
+        streamer = None
+        expiry = asyncio.ensure_future(expire()) if self.socket_lifetime > 0 else None
+        try:
+            async for message in ws:
+                request_data = json.loads(message.data)
+                if request_data.get('action') == 'auth':
+                    await ws.send_json([{'ev': 'status', 'status': 'auth_success', 'message': 'authenticated'}])
+                elif request_data.get('action') == 'subscribe':
+                    for channel in request_data.get('params', '').split(','):
+                        if channel.startswith('T.'):
+                            prices.setdefault(channel[2:], stock_price(channel[2:], self.seed))
+                            self.stats['subscriptions'] += 1
+                    if streamer is None:
+                        streamer = asyncio.ensure_future(stream())
+        finally:
+            if streamer is not None:
+                streamer.cancel()
+            if expiry is not None:
+                expiry.cancel()
+        return ws
+
+    async def show_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.stats, uptime=round(time.monotonic() - self.faults.started, 1)))
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.inject_faults])
+        app.router.add_get('/v3/snapshot/options/{ticker}', self.options_snapshot)
+        app.router.add_get('/v3/reference/tickers', self.ticker_listing)
+        app.router.add_get('/v3/reference/tickers/{ticker}', self.ticker_details)
+        app.router.add_get('/v2/snapshot/locale/us/markets/stocks/tickers', self.stock_snapshot)
+        app.router.add_get('/stocks', self.trade_feed)
+        app.router.add_get('/stats', self.show_stats)
+        return app
+
+def load_universe(num_tickers: Optional[int]) -> List[str]:
+    # Every ticker in tickers.json, so any collection can be scanned; or N made-up symbols
+    if num_tickers is None and os.path.exists(tickers_file):
+        with open(tickers_file, 'r') as f:
+            data = json.load(f)
+        return sorted({ticker for collection in data.values() for ticker in collection})
+    return [f"T{i:05d}" for i in range(num_tickers or 11000)]
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Local Polygon API stand-in for load and fault testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8123)
+    parser.add_argument('--seed', type=int, default=0, help='seed for synthetic chains and faults')
+    parser.add_argument('--num-tickers', type=int, default=None,
+                        help='serve N synthetic tickers instead of the tickers.json universe')
+    parser.add_argument('--recorded', metavar='DIR', default=None,
+                        help='serve recorded chains from DIR/{TICKER}.json[.gz] instead of synthetic ones')
+    parser.add_argument('--latency', type=parse_latency, default=parse_latency('fixed:0'),
+                        help='fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA (seconds)')
+    parser.add_argument('--burst-every', type=float, default=0.0, metavar='SECONDS',
+                        help='start a 429 burst this often (default: never)')
+    parser.add_argument('--burst-length', type=float, default=1.0, metavar='SECONDS',
+                        help='how long each 429 burst lasts')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='chance of a stray 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='chance of a 502')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='chance of dropping the connection')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='chance of a slow page')
+    parser.add_argument('--slow-seconds', type=float, default=5.0, help='extra delay of a slow page')
+    parser.add_argument('--trades-per-second', type=float, default=50.0,
+                        help='trade events per second on each /stocks websocket connection')
+    parser.add_argument('--socket-lifetime', type=float, default=0.0, metavar='SECONDS',
+                        help='drop each /stocks connection after a random lifetime of this mean (default: never)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    faults = FaultPlan(
+        latency=args.latency, burst_every=args.burst_every, burst_length=args.burst_length,
+        rate_limit_rate=args.rate_limit_rate, drop_rate=args.drop_rate, error_rate=args.error_rate,
+        slow_rate=args.slow_rate, slow_seconds=args.slow_seconds, seed=args.seed
+    )
+    metadata = TickerMetadata.load(DEFAULT_METADATA_FILE)
+    standin = StandIn(load_universe(args.num_tickers), faults, seed=args.seed,
+                      recorded=args.recorded, metadata=metadata, trades_per_second=args.trades_per_second,
+                      socket_lifetime=args.socket_lifetime)
+    print(f"Serving {len(standin.universe):,} tickers on http://{args.host}:{args.port}")
+    try:
+        web.run_app(standin.app(), host=args.host, port=args.port, print=None)
+    finally:
+        print(json.dumps(dict(standin.stats), indent=2))
+
+if __name__ == "__main__":
+    main()
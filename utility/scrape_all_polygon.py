@@ -1,44 +1,18 @@
-import requests
 import os
+import sys
 import json
+import asyncio
 
-# Set up your API key from environment variables
-polygonio_api_key = os.getenv("POLYGONIO_API_KEY")
-filename = "../src/tickers.json"
-
-def fetch_all_tickers():
-    base_url = "https://api.polygon.io/v3/reference/tickers"
-    params = {
-        "market": "stocks",
-        "active": "true",
-        "limit": 1000,
-        "apiKey": polygonio_api_key
-    }
-
-    tickers = []
-    next_url = None
-
-    while True:
-        # Append the API key to the next_url if it exists
-        url = next_url or base_url
-        if next_url:
-            url = f"{next_url}&apiKey={polygonio_api_key}"
-
-        response = requests.get(url, params=None if next_url else params)
-        data = response.json()
+# Use the EdgeWalker modules in ../src
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(src_path)
 
-        if response.status_code != 200 or "results" not in data:
-            print(f"Error fetching data: {data}")
-            break
+from market_data_client import MarketDataClient
+from ticker_metadata import TickerMetadata, refresh_universe
 
-        tickers.extend([item["ticker"] for item in data["results"]])
-
-        # Get the next URL for pagination, if any
-        next_url = data.get("next_url")
-        if not next_url:
-            break
-
-    return tickers
+# Set up your API key from environment variables
+polygonio_api_key = os.getenv("POLYGONIO_API_KEY")
+filename = os.path.join(src_path, "tickers.json")
 
 def add_all_polygon_collection(new_tickers):
     # Load existing data if the file exists
@@ -57,11 +31,20 @@ def save_tickers_to_json(data):
     with open(filename, "w") as f:
         json.dump(data, f, indent=4)
 
+async def refresh():
+    # Page through the listing concurrently and update the local metadata store
+    # (name, type, exchange) that scans use instead of per-ticker API calls
+    client = MarketDataClient(api_key=polygonio_api_key)
+    store = TickerMetadata.load()
+    new_tickers = await refresh_universe(client, store)
+    store.save()
+    return new_tickers
+
 def main():
     # Fetch, organize, and save the tickers
-    new_tickers = fetch_all_tickers()
+    new_tickers = asyncio.run(refresh())
     updated_data = add_all_polygon_collection(new_tickers)
     save_tickers_to_json(updated_data)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()